@@ -0,0 +1,189 @@
+# python -m pytest src/benchmarks/bench_subtask.py --benchmark-json=out.json
+# dataset sizes: DGS_BENCH_ROWS=1000,1000000,10000000 DGS_BENCH_COLUMNS=4,64
+# compare with a saved run: --benchmark-autosave / --benchmark-compare
+import functools
+import importlib.util
+import os
+import pathlib
+import sys
+import tracemalloc
+from typing import Any, Callable
+
+import numpy
+import pandas
+import pytest
+import sklearn.tree
+
+import src.task_executor.processing as processing
+
+SUBTASK_PATH = (
+    pathlib.Path(__file__).parent.parent / 'env_controller' / 'tasks' /
+    'grid_search' / 'subtasks' / 'grid_search' / 'src' / 'subtask.py'
+)
+ROWS = [
+    int(rows)
+    for rows in os.environ.get('DGS_BENCH_ROWS', '1000,100000').split(',')
+]
+COLUMNS = [
+    int(columns)
+    for columns in os.environ.get('DGS_BENCH_COLUMNS', '4,16').split(',')
+]
+CATEGORIES = 5
+TARGET_COLUMN = 'target'
+GRID = [
+    {'criterion': criterion, 'max_depth': max_depth}
+    for criterion in ('gini', 'entropy')
+    for max_depth in (2, 4, 8)
+]
+
+
+def load_subtask_module() -> Any:
+    spec = importlib.util.spec_from_file_location('subtask', SUBTASK_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+subtask = load_subtask_module()
+
+
+@functools.lru_cache(maxsize=1)
+def make_dataframe(rows: int, columns: int) -> pandas.DataFrame:
+    rng = numpy.random.default_rng(42)
+    numeric = columns - columns // 2
+    data: dict[str, Any] = {
+        f'num_{i}': rng.normal(size=rows) for i in range(numeric)
+    }
+    for i in range(columns // 2):
+        data[f'cat_{i}'] = rng.integers(0, CATEGORIES, size=rows)
+    data[TARGET_COLUMN] = rng.integers(0, 2, size=rows)
+    return pandas.DataFrame(data)
+
+
+def make_dataset_config(
+    df: pandas.DataFrame, path: str,
+) -> 'subtask.DatasetConfig':
+    return subtask.DatasetConfig(
+        path=path,
+        target_column=TARGET_COLUMN,
+        columns_to_scale=[c for c in df.columns if c.startswith('num_')],
+        columns_to_get_dummies=[
+            c for c in df.columns if c.startswith('cat_')
+        ],
+    )
+
+
+def measure_peak_memory(function: Callable, *args: Any) -> int:
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def record(
+    benchmark, function: Callable, args: tuple, items: int, unit: str,
+):
+    if benchmark.stats is None:
+        return
+    benchmark.extra_info[f'{unit}_per_second'] = (
+        items / benchmark.stats.stats.mean
+    )
+    benchmark.extra_info['peak_memory_bytes'] = measure_peak_memory(
+        function, *args,
+    )
+
+
+@pytest.fixture(params=ROWS, ids=lambda rows: f'rows={rows}')
+def rows(request) -> int:
+    return request.param
+
+
+@pytest.fixture(params=COLUMNS, ids=lambda columns: f'columns={columns}')
+def columns(request) -> int:
+    return request.param
+
+
+@pytest.fixture
+def dataframe(rows: int, columns: int) -> pandas.DataFrame:
+    return make_dataframe(rows, columns)
+
+
+@pytest.fixture
+def prepared(dataframe: pandas.DataFrame) -> pandas.DataFrame:
+    config = make_dataset_config(dataframe, 'data.csv')
+    return subtask.preprocess_df(dataframe.copy(), config)
+
+
+@pytest.mark.benchmark(group='preprocess_df')
+def test_preprocess_df(benchmark, dataframe: pandas.DataFrame):
+    config = make_dataset_config(dataframe, 'data.csv')
+    benchmark.pedantic(
+        subtask.preprocess_df,
+        setup=lambda: ((dataframe.copy(), config), {}),
+        rounds=5,
+    )
+    record(
+        benchmark, subtask.preprocess_df, (dataframe.copy(), config),
+        len(dataframe), 'rows',
+    )
+
+
+@pytest.mark.benchmark(group='separate_data')
+def test_separate_data(benchmark, prepared: pandas.DataFrame):
+    benchmark(subtask.separate_data, prepared, TARGET_COLUMN)
+    record(
+        benchmark, subtask.separate_data, (prepared, TARGET_COLUMN),
+        len(prepared), 'rows',
+    )
+
+
+@pytest.mark.benchmark(group='get_model_score')
+def test_get_model_score(benchmark, prepared: pandas.DataFrame):
+    separated = subtask.separate_data(prepared, TARGET_COLUMN)
+    args = (sklearn.tree.DecisionTreeClassifier, separated, GRID[-1])
+    benchmark(subtask.get_model_score, *args)
+    record(benchmark, subtask.get_model_score, args, 1, 'fits')
+
+
+@pytest.mark.benchmark(group='get_models_scores')
+def test_get_models_scores(benchmark, prepared: pandas.DataFrame):
+    config = subtask.Input(
+        model_type=subtask.ModelType.DECISION_TREE_CLASSIFIER.name,
+        dataset_config=make_dataset_config(prepared, 'data.csv'),
+        subtask_params=GRID,
+    )
+    benchmark.pedantic(
+        subtask.get_models_scores, args=(config, prepared), rounds=3,
+    )
+    record(
+        benchmark, subtask.get_models_scores, (config, prepared),
+        len(GRID), 'fits',
+    )
+
+
+@pytest.mark.benchmark(group='process_subtasks_request')
+def test_process_subtasks_request(
+    benchmark, dataframe: pandas.DataFrame, tmp_path: pathlib.Path,
+):
+    path = tmp_path / 'data.csv'
+    dataframe.to_csv(path, index=False)
+    config = make_dataset_config(dataframe, str(path))
+    request = processing.SubtasksRequestFabric(
+        model_type=processing.ModelType.DECISION_TREE_CLASSIFIER,
+        dataset_config=processing.DatasetConfig(
+            path=path,
+            target_column=config.target_column,
+            columns_to_scale=config.columns_to_scale,
+            columns_to_get_dummies=config.columns_to_get_dummies,
+        ),
+    ).create(GRID)
+    benchmark.pedantic(
+        processing.process_subtasks_request, args=(request,), rounds=3,
+    )
+    record(
+        benchmark, processing.process_subtasks_request, (request,),
+        len(GRID), 'fits',
+    )
@@ -0,0 +1,302 @@
+import asyncio
+import contextlib
+import dataclasses
+import datetime
+import importlib.util
+import ipaddress
+import json
+import pathlib
+import types
+from typing import Any, Iterator, Optional
+from unittest import mock
+import uuid
+
+import uvicorn
+
+import src.benchmarks.fakes as fakes
+import src.common.backend.tracing as tracing
+import src.data_controller.backend.torrent_service as torrent
+import src.env_controller.backend.docker_service as docker
+import src.env_controller.backend.image_store as image_store
+import src.env_controller.backend.process_service as process
+import src.env_controller.models.core as env_models
+import src.node_controller.backend.network_service as network
+import src.node_controller.models.core as node_models
+import src.task_controller.backend.services as task_services
+import src.task_executor.backend.services as executor_services
+
+LOCALHOST = ipaddress.IPv4Address('127.0.0.1')
+SERVER_STARTUP_DELAY = 0.01
+
+
+@dataclasses.dataclass
+class Service:
+    name: str
+    module: types.ModuleType
+    port: int
+    server: uvicorn.Server
+    task: Optional[asyncio.Task] = None
+
+
+@dataclasses.dataclass
+class Host:
+    env_controller: Service
+    data_controller: Service
+
+
+@contextlib.contextmanager
+def fake_backends(
+    backend: env_models.ExecutionBackend = env_models.ExecutionBackend.DOCKER,
+) -> Iterator[None]:
+    docker_service = (
+        process.ProcessService
+        if backend == env_models.ExecutionBackend.PROCESS
+        else fakes.FakeDockerService
+    )
+    with (
+        mock.patch.object(network, 'NetworkService', fakes.FakeNetworkService),
+        mock.patch.object(docker, 'DockerService', docker_service),
+        mock.patch.object(torrent, 'TorrentService', fakes.FakeTorrentService),
+    ):
+        yield
+
+
+def load_server(
+    name: str,
+    backend: env_models.ExecutionBackend = env_models.ExecutionBackend.DOCKER,
+) -> types.ModuleType:
+    spec = importlib.util.find_spec(f'src.{name}.backend.server')
+    module = importlib.util.module_from_spec(spec)
+    with fake_backends(backend):
+        spec.loader.exec_module(module)
+    return module
+
+
+@contextlib.contextmanager
+def relocate(service: Any, **paths: pathlib.Path) -> Iterator[None]:
+    overrides = {
+        name: property(lambda self, path=path: path)
+        for name, path in paths.items()
+    }
+    cls = type(service)
+    service.__class__ = type(cls.__name__, (cls,), overrides)
+    try:
+        yield
+    finally:
+        service.__class__ = cls
+
+
+@contextlib.contextmanager
+def poll_interval(interval: float) -> Iterator[None]:
+    with contextlib.ExitStack() as stack:
+        for module in (task_services, executor_services):
+            for name in dir(module):
+                if name.endswith('_POLLING_DELAY'):
+                    stack.enter_context(
+                        mock.patch.object(module, name, interval),
+                    )
+        yield
+
+
+def write_node_config(
+    path: pathlib.Path, node_uid: uuid.UUID, role: node_models.NodeRole,
+    port: int,
+):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                'node_uid': str(node_uid),
+                'role': role.value,
+                'use_upnp': False,
+                'public_ip': str(LOCALHOST),
+                'public_port': port,
+            },
+            indent=2,
+        )
+    )
+
+
+class Cluster:
+    def __init__(
+        self,
+        workdir: pathlib.Path,
+        executors: int,
+        workload: fakes.Workload,
+    ):
+        self.workdir = workdir
+        self.executors_number = executors
+        self.workload = workload
+        self.services: list[Service] = []
+        self.task_controller: Optional[Service] = None
+        self.patches = contextlib.ExitStack()
+
+    @property
+    def task_controller_port(self) -> int:
+        return self.task_controller.port
+
+    async def start(self):
+        try:
+            await self._start()
+        except BaseException:
+            await self.stop()
+            raise
+
+    async def _start(self):
+        controller_host = self._create_host(self.workdir / 'creator')
+        executors = [
+            self._create_executor(self.workdir / f'executor_{i}')
+            for i in range(self.executors_number)
+        ]
+        self.task_controller = self._create_task_controller(
+            self.workdir / 'creator', controller_host, executors,
+        )
+        self.patches.enter_context(
+            mock.patch.object(
+                task_services, 'IMAGE_REGISTRY',
+                env_models.Registry(self.workload.registry),
+            )
+        )
+        self.patches.enter_context(
+            mock.patch.multiple(
+                tracing, _storage=tracing._storage,
+                _exporter=tracing._exporter,
+            )
+        )
+        tracing.configure('benchmark', storage=self.workdir / 'traces')
+        for service in self.services:
+            service.task = asyncio.create_task(service.server.serve())
+        for service in self.services:
+            while not service.server.started:
+                await asyncio.sleep(SERVER_STARTUP_DELAY)
+
+    async def stop(self):
+        for service in self.services:
+            service.server.should_exit = True
+        try:
+            await asyncio.gather(
+                *(service.task for service in self.services if service.task),
+            )
+        finally:
+            self.patches.close()
+
+    async def __aenter__(self) -> 'Cluster':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def _add_service(self, name: str) -> Service:
+        module = load_server(
+            name, env_models.ExecutionBackend(self.workload.backend),
+        )
+        port = network.NetworkService.get_free_local_port()
+        config = uvicorn.Config(
+            module.app,
+            host=str(LOCALHOST),
+            port=port,
+            lifespan='off',
+            log_level='warning',
+            access_log=False,
+        )
+        service = Service(
+            name=name, module=module, port=port,
+            server=uvicorn.Server(config),
+        )
+        self.services.append(service)
+        return service
+
+    def _create_host(self, folder: pathlib.Path) -> Host:
+        env_controller = self._add_service('env_controller')
+        env = env_controller.module
+        env.db.db_name = str(folder / 'env_controller.sqlite')
+        if isinstance(env.execution_service, fakes.FakeDockerService):
+            env.execution_service.client = fakes.FakeDockerClient(
+                self.workload,
+            )
+        env.execution_service.image_store = image_store.ImageStore(
+            folder / 'images',
+        )
+        self.patches.enter_context(
+            relocate(env.subtasks_service, runtime_dir=folder / 'runtime'),
+        )
+        data_controller = self._add_service('data_controller')
+        data = data_controller.module
+        data.db.db_name = str(folder / 'data_controller.sqlite')
+        data.torrent_service.client = fakes.FakeQbittorrentClient(
+            self.workload,
+        )
+        self.patches.enter_context(
+            relocate(
+                data.torrent_service,
+                dataset_storage=folder / 'datasets',
+                torrent_files_storage=folder / 'torrents',
+            )
+        )
+        data.torrent_service.torrent_files_storage.mkdir(parents=True)
+        return Host(
+            env_controller=env_controller, data_controller=data_controller,
+        )
+
+    def _create_executor(self, folder: pathlib.Path) -> node_models.Node:
+        host = self._create_host(folder)
+        executor = self._add_service('task_executor')
+        module = executor.module
+        module.db.db_name = str(folder / 'task_executor.sqlite')
+        module.node_db.db_name = str(folder / 'node_controller.sqlite')
+        self.patches.enter_context(
+            relocate(
+                module.subtasks_service,
+                config_path=folder / 'config' / 'config.json',
+                subtasks_configs_folder=folder / 'subtasks',
+            )
+        )
+        self._connect_host(module.subtasks_service, host)
+        node = node_models.Node(
+            node_uid=uuid.uuid4(),
+            ipv4_address=LOCALHOST,
+            port=executor.port,
+            role=node_models.NodeRole.EXECUTOR,
+            status=node_models.NodeStatus.ACTIVE,
+            last_ping=datetime.datetime.now(),
+        )
+        write_node_config(
+            module.subtasks_service.config_path,
+            node.node_uid, node.role, node.port,
+        )
+        return node
+
+    def _create_task_controller(
+        self,
+        folder: pathlib.Path,
+        host: Host,
+        executors: list[node_models.Node],
+    ) -> Service:
+        controller = self._add_service('task_controller')
+        module = controller.module
+        module.db.db_name = str(folder / 'task_controller.sqlite')
+        module.node_db.db_name = str(folder / 'node_controller.sqlite')
+        self.patches.enter_context(
+            relocate(
+                module.tasks_service,
+                config_path=folder / 'config' / 'config.json',
+            )
+        )
+        self._connect_host(module.tasks_service, host)
+        write_node_config(
+            module.tasks_service.config_path,
+            uuid.uuid4(), node_models.NodeRole.CREATOR, controller.port,
+        )
+        for executor in executors:
+            module.node_repository.create_entity(executor)
+        return controller
+
+    @staticmethod
+    def _connect_host(service: Any, host: Host):
+        service.env_controller_client.set_server(
+            ipv4_address=LOCALHOST, port=host.env_controller.port,
+        )
+        service.data_controller_client.set_server(
+            ipv4_address=LOCALHOST, port=host.data_controller.port,
+        )
@@ -0,0 +1,392 @@
+import dataclasses
+import io
+import ipaddress
+import json
+import os
+import pathlib
+import queue
+import random
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+import uuid
+
+import docker.errors as docker_errors
+import torrentool.api
+
+import src.data_controller.backend.repositories as data_repositories
+import src.data_controller.backend.torrent_service as torrent
+import src.env_controller.backend.docker_service as docker
+import src.env_controller.backend.image_store as image_store
+import src.env_controller.backend.repositories as env_repositories
+import src.node_controller.backend.network_service as network
+
+CONTAINER_INPUT = '/usr/src/app/input'
+CONTAINER_OUTPUT = '/usr/src/app/output'
+IMAGE_ARCHIVE_MANIFEST = 'manifest.json'
+IMAGE_ARCHIVE_LAYER = 'layer'
+KILLED_EXIT_CODE = 137
+SUBPROCESS_POLLING_DELAY = 0.05
+
+
+class FakeNetworkService(network.NetworkService):
+    def __init__(self):
+        self.device = None
+
+    @staticmethod
+    def get_local_ip() -> ipaddress.IPv4Address:
+        return ipaddress.IPv4Address('127.0.0.1')
+
+
+@dataclasses.dataclass
+class Workload:
+    kind: str = 'synthetic'
+    container_seconds: float = 0.0
+    fit_seconds: float = 0.0
+    image_seconds: float = 0.0
+    bandwidth: Optional[float] = None
+    registry: str = 'docker_hub'
+    backend: str = 'docker'
+
+
+@dataclasses.dataclass
+class FakeImage:
+    id: str
+    path: pathlib.Path
+    tag: Optional[str] = None
+
+    def save(self, named: bool = False) -> Iterator[bytes]:
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w') as archive:
+            manifest = json.dumps(
+                {
+                    'id': self.id,
+                    'path': str(self.path),
+                    'tag': self.tag if named else None,
+                }
+            ).encode()
+            info = tarfile.TarInfo(IMAGE_ARCHIVE_MANIFEST)
+            info.size = len(manifest)
+            archive.addfile(info, io.BytesIO(manifest))
+            archive.add(self.path, arcname=IMAGE_ARCHIVE_LAYER)
+        yield buffer.getvalue()
+
+
+class FakeImages:
+    def __init__(self, workload: Workload):
+        self.workload = workload
+        self.images: dict[str, FakeImage] = {}
+
+    def build(self, path: str, tag: str) -> tuple[FakeImage, list]:
+        time.sleep(self.workload.image_seconds)
+        image = FakeImage(
+            id=f'sha256:{tag}', path=pathlib.Path(path), tag=tag,
+        )
+        self.images[tag] = image
+        return image, []
+
+    def push(self, repository: str):
+        time.sleep(self.workload.image_seconds)
+        FakeRegistry.push(repository, self.images[repository])
+
+    def get(self, name: str) -> FakeImage:
+        if name not in self.images:
+            raise docker_errors.ImageNotFound(name)
+        return self.images[name]
+
+    def get_registry_data(self, name: str) -> FakeImage:
+        try:
+            return FakeRegistry.pull(name)
+        except KeyError:
+            raise docker_errors.NotFound(name)
+
+    def pull(self, repository: str) -> FakeImage:
+        time.sleep(self.workload.image_seconds)
+        image = FakeRegistry.pull(repository)
+        self.images[repository] = image
+        return image
+
+    def load(self, data: BinaryIO) -> list[FakeImage]:
+        with tarfile.open(fileobj=data, mode='r|') as archive:
+            for member in archive:
+                if member.name == IMAGE_ARCHIVE_MANIFEST:
+                    manifest = json.load(archive.extractfile(member))
+        image = FakeImage(
+            id=manifest['id'],
+            path=pathlib.Path(manifest['path']),
+            tag=manifest['tag'],
+        )
+        self.images[image.tag] = image
+        return [image]
+
+
+class FakeContainer:
+    def __init__(self, events: queue.Queue):
+        self.id = uuid.uuid4().hex * 2
+        self.status = 'created'
+        self.attrs: dict[str, Any] = {'State': {'ExitCode': None}}
+        self.events = events
+        self.killed = threading.Event()
+
+    def start(self, work: Callable[[threading.Event], None]):
+        self.status = 'running'
+        threading.Thread(target=self._run, args=(work,), daemon=True).start()
+
+    def reload(self):
+        pass
+
+    def kill(self):
+        self.killed.set()
+
+    def remove(self, force: bool = False):
+        pass
+
+    def _run(self, work: Callable[[threading.Event], None]):
+        try:
+            work(self.killed)
+            exit_code = 0
+        except Exception:
+            exit_code = 1
+        if self.killed.is_set():
+            exit_code = KILLED_EXIT_CODE
+        self.attrs['State']['ExitCode'] = exit_code
+        self.status = 'exited'
+        self.events.put(
+            {
+                'Type': 'container',
+                'Action': 'die',
+                'time': int(time.time()),
+                'Actor': {
+                    'ID': self.id,
+                    'Attributes': {'exitCode': str(exit_code)},
+                },
+            }
+        )
+
+
+class FakeContainers:
+    def __init__(
+        self, images: FakeImages, workload: Workload, events: queue.Queue,
+    ):
+        self.images = images
+        self.workload = workload
+        self.events = events
+
+    def run(
+        self,
+        image: str,
+        volumes: dict[str, dict],
+        environment: Optional[dict[str, str]] = None,
+        detach: bool = False,
+        cpuset_cpus: Optional[str] = None,
+        mem_limit: Optional[int] = None,
+    ) -> FakeContainer | bytes:
+        mounts = {
+            volume['bind']: pathlib.Path(host_path)
+            for host_path, volume in volumes.items()
+        }
+        input_path = mounts[CONTAINER_INPUT]
+        output_path = mounts[CONTAINER_OUTPUT]
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        def work(killed: threading.Event):
+            if killed.wait(self.workload.container_seconds):
+                return
+            if self.workload.kind == 'real':
+                self._run_subtask(
+                    self.images.images[image].path,
+                    input_path,
+                    output_path,
+                    environment or {},
+                    killed,
+                )
+            else:
+                self._run_synthetic(input_path, output_path, killed)
+
+        if not detach:
+            work(threading.Event())
+            return b''
+        container = FakeContainer(self.events)
+        container.start(work)
+        return container
+
+    def _run_synthetic(
+        self,
+        input_path: pathlib.Path,
+        output_path: pathlib.Path,
+        killed: threading.Event,
+    ):
+        config = json.loads((input_path / 'config.json').read_text())
+        result = []
+        for params in config['subtask_params']:
+            if killed.wait(self.workload.fit_seconds):
+                return
+            result.append({'params': params, 'f1_score': random.random()})
+        (output_path / 'result.json').write_text(
+            json.dumps({'result': result}),
+        )
+
+    @staticmethod
+    def _run_subtask(
+        image_path: pathlib.Path,
+        input_path: pathlib.Path,
+        output_path: pathlib.Path,
+        environment: dict[str, str],
+        killed: threading.Event,
+    ):
+        with tempfile.TemporaryDirectory() as workdir:
+            workdir = pathlib.Path(workdir)
+            (workdir / 'input').symlink_to(input_path)
+            (workdir / 'output').symlink_to(output_path)
+            process = subprocess.Popen(
+                [sys.executable, str(image_path / 'src' / 'subtask.py')],
+                cwd=workdir,
+                env={**os.environ, **environment},
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            while process.poll() is None:
+                if killed.wait(SUBPROCESS_POLLING_DELAY):
+                    process.kill()
+                    process.wait()
+                    return
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(
+                    process.returncode, process.args,
+                )
+
+
+class FakeDockerClient:
+    def __init__(self, workload: Workload):
+        self.events_queue: queue.Queue = queue.Queue()
+        self.images = FakeImages(workload)
+        self.containers = FakeContainers(
+            self.images, workload, self.events_queue,
+        )
+
+    def events(
+        self,
+        since: Optional[int] = None,
+        decode: bool = False,
+        filters: Optional[dict] = None,
+    ) -> Iterator[dict]:
+        while True:
+            yield self.events_queue.get()
+
+
+class FakeRegistry:
+    lock = threading.Lock()
+    images: dict[str, FakeImage] = {}
+
+    @classmethod
+    def push(cls, tag: str, image: FakeImage):
+        with cls.lock:
+            cls.images[tag] = image
+
+    @classmethod
+    def pull(cls, tag: str) -> FakeImage:
+        with cls.lock:
+            return cls.images[tag]
+
+
+class FakeDockerService(docker.DockerService):
+    def __init__(
+        self,
+        image_repository: env_repositories.ImageRepository,
+        subtask_repository: env_repositories.SubtaskRepository,
+    ):
+        super().__init__(image_repository, subtask_repository)
+        self.image_store = image_store.ImageStore(
+            pathlib.Path(tempfile.mkdtemp()),
+        )
+
+    def _create_client(self) -> FakeDockerClient:
+        return FakeDockerClient(Workload())
+
+
+class FakeSwarm:
+    lock = threading.Lock()
+    seeds: dict[str, pathlib.Path] = {}
+
+    @classmethod
+    def seed(cls, info_hash: str, path: pathlib.Path):
+        with cls.lock:
+            cls.seeds[info_hash] = path
+
+    @classmethod
+    def find(cls, info_hash: str) -> pathlib.Path:
+        with cls.lock:
+            return cls.seeds[info_hash]
+
+
+class FakeQbittorrentClient:
+    def __init__(self, workload: Workload):
+        self.workload = workload
+        self.lock = threading.Lock()
+        self.progress: dict[str, float] = {}
+
+    def download_from_file(self, file_buffer: bytes, save_path: Any):
+        new_torrent = torrentool.api.Torrent.from_string(file_buffer)
+        FakeSwarm.seed(
+            new_torrent.info_hash, pathlib.Path(save_path) / new_torrent.name,
+        )
+        with self.lock:
+            self.progress[new_torrent.name] = 1
+
+    def download_from_link(self, link: str, savepath: Any):
+        info_hash = link.split('btih:', 1)[1].split('&', 1)[0].lower()
+        source = FakeSwarm.find(info_hash)
+        with self.lock:
+            self.progress[source.name] = 0
+        thread = threading.Thread(
+            target=self._transfer,
+            args=(source, pathlib.Path(savepath) / source.name),
+        )
+        thread.start()
+
+    def _transfer(self, source: pathlib.Path, destination: pathlib.Path):
+        if self.workload.bandwidth:
+            size = sum(
+                file.stat().st_size
+                for file in source.rglob('*')
+                if file.is_file()
+            )
+            time.sleep(size / self.workload.bandwidth)
+        shutil.copytree(source, destination, dirs_exist_ok=True)
+        with self.lock:
+            self.progress[source.name] = 1
+
+    def delete(self, info_hash: str):
+        with self.lock:
+            self.progress.pop(FakeSwarm.find(info_hash).name, None)
+
+    def torrents(self, **filters: Any) -> list[dict]:
+        with self.lock:
+            return [
+                {'name': name, 'progress': progress}
+                for name, progress in self.progress.items()
+            ]
+
+    def sync_main_data(self, rid: int = 0) -> dict:
+        with self.lock:
+            return {
+                'rid': rid + 1,
+                'full_update': True,
+                'torrents': {
+                    name: {'name': name, 'progress': progress}
+                    for name, progress in self.progress.items()
+                },
+            }
+
+
+class FakeTorrentService(torrent.TorrentService):
+    def __init__(
+        self, dataset_repository: data_repositories.DatasetRepository,
+    ):
+        super().__init__(dataset_repository)
+        self.client = FakeQbittorrentClient(Workload())
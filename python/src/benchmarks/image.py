@@ -0,0 +1,173 @@
+# python -m src.benchmarks.image --variants full slim --output image.json
+# without --registry pull time is measured as a docker load of a saved image
+import argparse
+import dataclasses
+import datetime
+import json
+import pathlib
+import platform
+import sys
+import tempfile
+import time
+from typing import Optional
+
+import docker
+import docker.models.images
+
+import src.benchmarks.pipeline as pipeline
+
+SUBTASK_PATH = (
+    pathlib.Path(__file__).parent.parent / 'env_controller' / 'tasks' /
+    'grid_search' / 'subtasks' / 'grid_search'
+)
+VARIANTS = {
+    'full': 'Dockerfile.full',
+    'slim': 'Dockerfile',
+}
+IMAGE_REPOSITORY = 'dgs-benchmark/grid_search'
+COLD_START_COMMAND = ['python', '-c', 'import subtask']
+
+
+@dataclasses.dataclass
+class ImageResult:
+    variant: str
+    dockerfile: str
+    size: int
+    layers: int
+    build_time: float
+    pull_time: dict[str, float]
+    cold_start: dict[str, float]
+
+
+def build_image(
+    client: docker.DockerClient, variant: str, no_cache: bool,
+) -> tuple[docker.models.images.Image, float]:
+    start = time.perf_counter()
+    image, _ = client.images.build(
+        path=str(SUBTASK_PATH),
+        dockerfile=VARIANTS[variant],
+        tag=f'{IMAGE_REPOSITORY}:{variant}',
+        nocache=no_cache,
+        rm=True,
+    )
+    return image, time.perf_counter() - start
+
+
+def measure_load(
+    client: docker.DockerClient, tag: str, rounds: int,
+) -> list[float]:
+    durations = []
+    with tempfile.TemporaryFile() as archive:
+        image = client.images.get(tag)
+        for chunk in image.save(named=True):
+            archive.write(chunk)
+        for _ in range(rounds):
+            client.images.remove(image.id, force=True)
+            archive.seek(0)
+            start = time.perf_counter()
+            image = client.images.load(archive)[0]
+            durations.append(time.perf_counter() - start)
+    return durations
+
+
+def measure_pull(
+    client: docker.DockerClient, tag: str, registry: str, rounds: int,
+) -> list[float]:
+    remote_tag = f'{registry}/{tag}'
+    image = client.images.get(tag)
+    image.tag(remote_tag)
+    client.images.push(remote_tag)
+    durations = []
+    for _ in range(rounds):
+        client.images.remove(image.id, force=True)
+        start = time.perf_counter()
+        image = client.images.pull(remote_tag)
+        durations.append(time.perf_counter() - start)
+        image.tag(tag)
+    return durations
+
+
+def measure_cold_start(
+    client: docker.DockerClient, tag: str, rounds: int,
+) -> list[float]:
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        client.containers.run(tag, COLD_START_COMMAND, remove=True)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def run_variant(
+    client: docker.DockerClient,
+    variant: str,
+    rounds: int,
+    registry: Optional[str],
+    no_cache: bool,
+) -> ImageResult:
+    image, build_time = build_image(client, variant, no_cache)
+    tag = f'{IMAGE_REPOSITORY}:{variant}'
+    if registry is None:
+        pull_times = measure_load(client, tag, rounds)
+    else:
+        pull_times = measure_pull(client, tag, registry, rounds)
+    image = client.images.get(tag)
+    return ImageResult(
+        variant=variant,
+        dockerfile=VARIANTS[variant],
+        size=image.attrs['Size'],
+        layers=len(image.history()),
+        build_time=build_time,
+        pull_time=pipeline.summarize_latencies(pull_times),
+        cold_start=pipeline.summarize_latencies(
+            measure_cold_start(client, tag, rounds),
+        ),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='compare size, pull and cold start of subtask images',
+    )
+    parser.add_argument(
+        '--variants', nargs='+', choices=list(VARIANTS),
+        default=list(VARIANTS),
+    )
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument(
+        '--registry', default=None,
+        help='registry host to push to and pull from, e.g. localhost:5000',
+    )
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--output', type=pathlib.Path, default=None)
+    args = parser.parse_args()
+    client = docker.from_env()
+    results = []
+    for variant in args.variants:
+        result = run_variant(
+            client, variant, args.rounds, args.registry, args.no_cache,
+        )
+        print(
+            f'{variant}: {result.size / 2 ** 20:.0f} MiB, '
+            f'pull p50 {result.pull_time["p50"]:.2f}s, '
+            f'cold start p50 {result.cold_start["p50"]:.2f}s',
+            file=sys.stderr,
+        )
+        results.append(dataclasses.asdict(result))
+    report = {
+        'benchmark': 'image',
+        'created_at': datetime.datetime.now().isoformat(),
+        'commit': pipeline.get_commit(),
+        'python': platform.python_version(),
+        'registry': args.registry,
+        'results': results,
+    }
+    data = json.dumps(report, indent=2)
+    if args.output is None:
+        print(data)
+    else:
+        args.output.write_text(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import datetime
+import io
+import itertools
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+import uuid
+
+import src.benchmarks.cluster as cluster
+import src.benchmarks.fakes as fakes
+import src.common.backend.tracing as tracing
+import src.task_controller.client.client as task_client
+import src.task_controller.models.core as task_models
+
+DATASET_PATH = (
+    pathlib.Path(__file__).parent.parent /
+    'task_executor' / 'data' / 'Employee.csv'
+)
+DATASET_CONFIG = {
+    'path': DATASET_PATH.name,
+    'target_column': 'LeaveOrNot',
+    'columns_to_scale': ['JoiningYear', 'Age', 'ExperienceInCurrentDomain'],
+    'columns_to_get_dummies': [
+        'Education', 'Gender', 'PaymentTier', 'City', 'EverBenched',
+    ],
+}
+CRITERIONS = ['gini', 'entropy', 'log_loss']
+TASK_POLLING_DELAY = 0.01
+TASK_PHASES = [
+    'executor_discovery',
+    'publishing_resources',
+    'subtasks_sending',
+    'subtasks_execution',
+    'results_collection',
+    'result_processing',
+]
+FINISHED_STATUSES = {
+    task_models.TaskStatus.SUCCESS, task_models.TaskStatus.ERROR,
+}
+
+
+@dataclasses.dataclass
+class Case:
+    executors: int
+    grid_size: int
+    poll_interval: float
+    tasks: int
+    concurrency: int
+
+
+@dataclasses.dataclass
+class CaseResult:
+    case: Case
+    succeeded: int
+    failed: int
+    wall_time: float
+    throughput: float
+    latency: dict[str, float]
+    phases: dict[str, float]
+
+
+def make_task_params(grid_size: int) -> dict:
+    return {
+        'model_type': 'DECISION_TREE_CLASSIFIER',
+        'dataset_config': DATASET_CONFIG,
+        'subtasks_params': [
+            {'criterion': CRITERIONS[i % len(CRITERIONS)], 'max_depth': 1 + i}
+            for i in range(grid_size)
+        ],
+    }
+
+
+def summarize_latencies(latencies: list[float]) -> dict[str, float]:
+    if not latencies:
+        return {}
+    latencies = sorted(latencies)
+    return {
+        'mean': statistics.fmean(latencies),
+        'min': latencies[0],
+        'p50': latencies[int(0.5 * (len(latencies) - 1))],
+        'p95': latencies[int(0.95 * (len(latencies) - 1))],
+        'max': latencies[-1],
+    }
+
+
+def summarize_phases(traces: pathlib.Path) -> dict[str, float]:
+    durations: dict[str, list[float]] = {}
+    for span in tracing.read_spans(traces.glob('*.jsonl')):
+        if span.name in TASK_PHASES:
+            durations.setdefault(span.name, []).append(span.duration)
+    return {
+        name: statistics.fmean(durations[name])
+        for name in TASK_PHASES
+        if name in durations
+    }
+
+
+async def run_task(
+    client: task_client.TaskControllerClient,
+    semaphore: asyncio.Semaphore,
+    params: dict,
+    timeout: float,
+) -> Optional[float]:
+    async with semaphore:
+        start = time.perf_counter()
+        task_uid = await client.create_task(
+            task_type=task_models.TaskType.GRID_SEARCH,
+            params=params,
+            dataset_path=DATASET_PATH,
+        )
+        try:
+            status = await asyncio.wait_for(
+                wait_task(client, task_uid), timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            return None
+        if status != task_models.TaskStatus.SUCCESS:
+            return None
+        return time.perf_counter() - start
+
+
+async def wait_task(
+    client: task_client.TaskControllerClient, task_uid: uuid.UUID,
+) -> task_models.TaskStatus:
+    task = await client.get_task(task_uid)
+    while task.status not in FINISHED_STATUSES:
+        await asyncio.sleep(TASK_POLLING_DELAY)
+        task = await client.get_task(task_uid)
+    return task.status
+
+
+async def run_case(
+    case: Case, workload: fakes.Workload, timeout: float,
+) -> CaseResult:
+    params = make_task_params(case.grid_size)
+    with (
+        cluster.poll_interval(case.poll_interval),
+        tempfile.TemporaryDirectory() as workdir,
+    ):
+        workdir = pathlib.Path(workdir)
+        async with cluster.Cluster(
+            workdir, executors=case.executors, workload=workload,
+        ) as running_cluster:
+            client = task_client.TaskControllerClient().set_server(
+                ipv4_address=cluster.LOCALHOST,
+                port=running_cluster.task_controller_port,
+            )
+            semaphore = asyncio.Semaphore(case.concurrency)
+            start = time.perf_counter()
+            latencies = await asyncio.gather(
+                *(
+                    run_task(client, semaphore, params, timeout)
+                    for _ in range(case.tasks)
+                )
+            )
+            wall_time = time.perf_counter() - start
+        phases = summarize_phases(workdir / 'traces')
+    succeeded = [latency for latency in latencies if latency is not None]
+    return CaseResult(
+        case=case,
+        succeeded=len(succeeded),
+        failed=len(latencies) - len(succeeded),
+        wall_time=wall_time,
+        throughput=len(succeeded) / wall_time if wall_time > 0 else 0,
+        latency=summarize_latencies(succeeded),
+        phases=phases,
+    )
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=pathlib.Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(
+    cases: list[Case], workload: fakes.Workload, timeout: float,
+    verbose: bool,
+) -> dict:
+    results = []
+    for case in cases:
+        output = contextlib.nullcontext() if verbose else (
+            contextlib.redirect_stdout(io.StringIO())
+        )
+        with output:
+            result = await run_case(case, workload, timeout)
+        print(
+            f'executors={case.executors} grid={case.grid_size} '
+            f'poll={case.poll_interval}: '
+            f'{result.throughput:.2f} tasks/s, '
+            f'p50 {result.latency.get("p50", float("nan")):.3f}s, '
+            f'{result.failed} failed',
+            file=sys.stderr,
+        )
+        results.append(dataclasses.asdict(result))
+    return {
+        'benchmark': 'pipeline',
+        'created_at': datetime.datetime.now().isoformat(),
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'workload': dataclasses.asdict(workload),
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='benchmark task pipeline on in-process cluster',
+    )
+    parser.add_argument('--executors', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--grid-size', type=int, nargs='+', default=[12])
+    parser.add_argument(
+        '--poll-interval', type=float, nargs='+', default=[0.05],
+    )
+    parser.add_argument('--tasks', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument(
+        '--workload', choices=['synthetic', 'real'], default='synthetic',
+    )
+    parser.add_argument('--container-seconds', type=float, default=0.0)
+    parser.add_argument('--fit-seconds', type=float, default=0.0)
+    parser.add_argument('--image-seconds', type=float, default=0.0)
+    parser.add_argument(
+        '--bandwidth', type=float, default=None,
+        help='simulated dataset transfer speed, bytes per second',
+    )
+    parser.add_argument(
+        '--registry', choices=['docker_hub', 'peer'], default='docker_hub',
+        help='where the creator publishes task images',
+    )
+    parser.add_argument(
+        '--backend', choices=['docker', 'process'], default='docker',
+        help='process runs the real subtask in a local process pool',
+    )
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--output', type=pathlib.Path, default=None)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    cases = [
+        Case(
+            executors=executors,
+            grid_size=grid_size,
+            poll_interval=poll_interval,
+            tasks=args.tasks,
+            concurrency=args.concurrency,
+        )
+        for executors, grid_size, poll_interval in itertools.product(
+            args.executors, args.grid_size, args.poll_interval,
+        )
+    ]
+    workload = fakes.Workload(
+        kind=args.workload,
+        container_seconds=args.container_seconds,
+        fit_seconds=args.fit_seconds,
+        image_seconds=args.image_seconds,
+        bandwidth=args.bandwidth,
+        registry=args.registry,
+        backend=args.backend,
+    )
+    report = asyncio.run(
+        run_benchmark(cases, workload, args.timeout, args.verbose),
+    )
+    data = json.dumps(report, indent=2)
+    if args.output is None:
+        print(data)
+    else:
+        args.output.write_text(data)
+
+
+if __name__ == '__main__':
+    main()
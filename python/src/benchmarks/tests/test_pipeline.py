@@ -0,0 +1,32 @@
+import asyncio
+
+import src.benchmarks.fakes as fakes
+import src.benchmarks.pipeline as pipeline
+import src.common.backend.tracing as tracing
+import src.task_controller.backend.services as task_services
+import src.task_executor.backend.services as executor_services
+
+
+def test_pipeline_runs_on_in_process_cluster():
+    defaults = (
+        task_services.SUBTASKS_RUNNING_POLLING_DELAY,
+        executor_services.CONTAINER_RUNNING_POLLING_DELAY,
+        task_services.IMAGE_REGISTRY,
+        tracing._storage,
+    )
+    case = pipeline.Case(
+        executors=2, grid_size=5, poll_interval=0.01, tasks=2, concurrency=2,
+    )
+    result = asyncio.run(
+        pipeline.run_case(case, fakes.Workload(), timeout=30),
+    )
+    assert result.succeeded == 2
+    assert result.failed == 0
+    assert result.throughput > 0
+    assert set(result.phases) == set(pipeline.TASK_PHASES)
+    assert defaults == (
+        task_services.SUBTASKS_RUNNING_POLLING_DELAY,
+        executor_services.CONTAINER_RUNNING_POLLING_DELAY,
+        task_services.IMAGE_REGISTRY,
+        tracing._storage,
+    )
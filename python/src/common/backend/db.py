@@ -1,10 +1,30 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
+import pathlib
+import threading
+import time
+
 import sqlalchemy as sql
+import sqlalchemy.dialects.sqlite as sqlite
 import sqlalchemy.orm as orm
-from typing import Type
+from typing import Any, Callable, Iterable, Iterator, Type
 from typing import Optional
 
+import src.common.backend.metrics as metrics
 import src.node_controller.models.db as db_models
 
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+    'cache_size': -16000,
+}
+UPSERT_BATCH_SIZE = 500
+
 
 class DB:
     def __init__(self, db_name: str, base: Type[orm.DeclarativeBase]):
@@ -12,17 +32,162 @@ class DB:
         self.base = base
         self.engine: Optional[sql.Engine] = None
         self.session: Optional[orm.Session] = None
+        self.lock = threading.Lock()
+        self.current_session: contextvars.ContextVar = (
+            contextvars.ContextVar(f'session_{id(self)}', default=None)
+        )
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='db',
+        )
 
     def create_session(self) -> orm.Session:
-        if not self.engine:
-            self.engine = sql.create_engine(
-                f'sqlite:///{self.db_name}', echo=True,
-            )
-            self.base.metadata.create_all(self.engine)
-            self.session = orm.sessionmaker(
-                self.engine, expire_on_commit=False
-            )
+        with self.lock:
+            if not self.engine:
+                engine = sql.create_engine(f'sqlite:///{self.db_name}')
+                self._configure_connections(engine)
+                self._instrument_engine(engine)
+                self.base.metadata.create_all(engine)
+                self._migrate(engine)
+                self.session = orm.sessionmaker(
+                    engine, expire_on_commit=False
+                )
+                self.engine = engine
         return self.session()
 
+    @contextlib.contextmanager
+    def begin(self) -> Iterator[orm.Session]:
+        session = self.current_session.get()
+        if session is not None:
+            yield session
+            return
+        with self.create_session() as session, session.begin():
+            token = self.current_session.set(session)
+            try:
+                yield session
+            finally:
+                self.current_session.reset(token)
+
+    async def run(self, function: Callable, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(context.run, function, *args, **kwargs),
+        )
+
     def drop_database(self):
         self.base.metadata.drop_all(self.engine)
+
+    def _migrate(self, engine: sql.Engine):
+        inspector = sql.inspect(engine)
+        with engine.begin() as connection:
+            for table in self.base.metadata.sorted_tables:
+                existing = {
+                    column['name']
+                    for column in inspector.get_columns(table.name)
+                }
+                for column in table.columns:
+                    if column.name in existing or not column.nullable:
+                        continue
+                    column_type = column.type.compile(engine.dialect)
+                    connection.execute(
+                        sql.text(
+                            f'ALTER TABLE {table.name} '
+                            f'ADD COLUMN {column.name} {column_type}'
+                        )
+                    )
+        for table in self.base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(engine, checkfirst=True)
+
+    @staticmethod
+    def _configure_connections(engine: sql.Engine):
+        @sql.event.listens_for(engine, 'connect')
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+            cursor.close()
+
+    def _instrument_engine(self, engine: sql.Engine):
+        database = pathlib.Path(self.db_name).stem
+
+        @sql.event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany,
+        ):
+            conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+        @sql.event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(
+            conn, cursor, statement, parameters, context, executemany,
+        ):
+            start = conn.info['query_start'].pop()
+            operation = statement.lstrip().split(' ', 1)[0].upper()
+            metrics.DB_QUERY_DURATION.labels(
+                database=database, operation=operation,
+            ).observe(time.perf_counter() - start)
+
+        @sql.event.listens_for(engine, 'handle_error')
+        def handle_error(context):
+            if context.connection is None:
+                return
+            query_start = context.connection.info.get('query_start')
+            if query_start:
+                query_start.pop()
+
+
+class AsyncRepository:
+    def __init__(self, repository: Any):
+        self.repository = repository
+
+    def __getattr__(self, name: str) -> Callable:
+        method = getattr(self.repository, name)
+
+        async def run(*args: Any, **kwargs: Any) -> Any:
+            return await self.repository.db.run(method, *args, **kwargs)
+
+        return run
+
+
+def upsert(session: orm.Session, entities: Iterable[orm.DeclarativeBase]):
+    entities = list(entities)
+    rows = [
+        {
+            column.name: getattr(entity, column.key)
+            for column in entity.__table__.columns
+        }
+        for entity in entities
+    ]
+    if not rows:
+        return
+    table = entities[0].__table__
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = sqlite.insert(table).values(
+            rows[start:start + UPSERT_BATCH_SIZE],
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(table.primary_key.columns),
+            set_={
+                column.name: stmt.excluded[column.name]
+                for column in table.columns
+                if not column.primary_key
+            },
+        )
+        session.execute(stmt)
+
+
+def paginate(
+    session: orm.Session,
+    stmt: sql.Select,
+    model: Type[orm.DeclarativeBase],
+    cursor: Optional[int],
+    limit: int,
+) -> tuple[list[orm.DeclarativeBase], Optional[int]]:
+    rowid = sql.literal_column(f'{model.__tablename__}.rowid')
+    stmt = stmt.add_columns(rowid).order_by(rowid.desc()).limit(limit + 1)
+    if cursor is not None:
+        stmt = stmt.where(rowid < cursor)
+    rows = session.execute(stmt).all()
+    next_cursor = rows[limit - 1][1] if len(rows) > limit else None
+    return [row[0] for row in rows[:limit]], next_cursor
@@ -0,0 +1,74 @@
+import enum
+import fcntl
+import os
+import pathlib
+import shutil
+from typing import Iterable
+
+FICLONE = 0x40049409
+
+
+class StagingMethod(enum.Enum):
+    HARDLINK = 'hardlink'
+    REFLINK = 'reflink'
+    COPY = 'copy'
+
+
+def stage_file(
+    src_path: pathlib.Path, dst_path: pathlib.Path, hardlink: bool = True,
+) -> StagingMethod:
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    dst_path.unlink(missing_ok=True)
+    if hardlink:
+        try:
+            os.link(src_path, dst_path)
+            return StagingMethod.HARDLINK
+        except OSError:
+            pass
+    try:
+        clone_file(src_path, dst_path)
+        return StagingMethod.REFLINK
+    except OSError:
+        dst_path.unlink(missing_ok=True)
+    shutil.copy(src_path, dst_path)
+    return StagingMethod.COPY
+
+
+def clone_file(src_path: pathlib.Path, dst_path: pathlib.Path):
+    with src_path.open('rb') as src, dst_path.open('wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copymode(src_path, dst_path)
+
+
+def stage_files(
+    paths: Iterable[tuple[pathlib.Path, pathlib.Path]], hardlink: bool = True,
+) -> dict[StagingMethod, int]:
+    methods = {method: 0 for method in StagingMethod}
+    for src_path, dst_path in paths:
+        methods[stage_file(src_path, dst_path, hardlink=hardlink)] += 1
+    return methods
+
+
+def stage_tree(
+    src_path: pathlib.Path, dst_path: pathlib.Path, hardlink: bool = True,
+) -> dict[StagingMethod, int]:
+    if src_path.is_file():
+        return stage_files(
+            [(src_path, dst_path / src_path.name)], hardlink=hardlink,
+        )
+    return stage_files(
+        (
+            (file, dst_path / file.relative_to(src_path))
+            for file in src_path.rglob('*')
+            if file.is_file()
+        ),
+        hardlink=hardlink,
+    )
+
+
+def describe_staging(methods: dict[StagingMethod, int]) -> str:
+    return ', '.join(
+        f'{count} by {method.value}'
+        for method, count in methods.items()
+        if count
+    )
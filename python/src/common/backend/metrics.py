@@ -0,0 +1,125 @@
+import time
+
+import fastapi
+import prometheus_client
+import starlette.requests
+import starlette.responses
+
+LONG_RUNNING_BUCKETS = (
+    0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0,
+    3600.0,
+)
+DB_QUERY_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0,
+)
+
+HTTP_REQUEST_DURATION = prometheus_client.Histogram(
+    'dgs_http_request_duration_seconds',
+    'HTTP request latency per route',
+    ['service', 'method', 'route', 'status_code'],
+)
+SUBTASKS_IN_FLIGHT = prometheus_client.Gauge(
+    'dgs_subtasks_in_flight',
+    'Subtasks currently being prepared or executed',
+    ['service'],
+)
+QUEUE_DEPTH = prometheus_client.Gauge(
+    'dgs_queue_depth',
+    'Number of items waiting in an internal queue',
+    ['service', 'queue'],
+)
+CONTAINER_RUN_DURATION = prometheus_client.Histogram(
+    'dgs_container_run_duration_seconds',
+    'Wall-clock duration of subtask containers',
+    ['status'],
+    buckets=LONG_RUNNING_BUCKETS,
+)
+IMAGE_OPERATION_DURATION = prometheus_client.Histogram(
+    'dgs_image_operation_duration_seconds',
+    'Duration of image build, push and pull operations',
+    ['operation'],
+    buckets=LONG_RUNNING_BUCKETS,
+)
+DATASET_TRANSFER_BYTES = prometheus_client.Counter(
+    'dgs_dataset_transfer_bytes_total',
+    'Bytes of datasets downloaded by this node',
+    ['transport'],
+)
+DATASET_TRANSFER_DURATION = prometheus_client.Histogram(
+    'dgs_dataset_transfer_duration_seconds',
+    'Duration of dataset downloads',
+    ['transport'],
+    buckets=LONG_RUNNING_BUCKETS,
+)
+DATASET_TRANSFER_THROUGHPUT = prometheus_client.Histogram(
+    'dgs_dataset_transfer_throughput_bytes_per_second',
+    'Average throughput of finished dataset downloads',
+    ['transport'],
+    buckets=(
+        2 ** 16, 2 ** 18, 2 ** 20, 2 ** 22, 2 ** 24, 2 ** 26, 2 ** 28, 2 ** 30,
+    ),
+)
+IMAGE_BLOB_BYTES = prometheus_client.Counter(
+    'dgs_image_blob_bytes_total',
+    'Bytes of image blobs fetched from a peer or reused from the local store',
+    ['result'],
+)
+DATASET_CACHE_REQUESTS = prometheus_client.Counter(
+    'dgs_dataset_cache_requests_total',
+    'Dataset download requests served from the local cache or not',
+    ['result'],
+)
+DATASET_CACHE_EVICTED_BYTES = prometheus_client.Counter(
+    'dgs_dataset_cache_evicted_bytes_total',
+    'Bytes of downloaded datasets evicted from the local cache',
+)
+DATASET_CACHE_SIZE = prometheus_client.Gauge(
+    'dgs_dataset_cache_size_bytes',
+    'Bytes of downloaded datasets kept in the local cache',
+)
+DB_QUERY_DURATION = prometheus_client.Histogram(
+    'dgs_db_query_duration_seconds',
+    'SQLite statement execution time',
+    ['database', 'operation'],
+    buckets=DB_QUERY_BUCKETS,
+)
+
+
+def observe_dataset_transfer(
+    transport: str, size: int, duration: float,
+) -> None:
+    DATASET_TRANSFER_BYTES.labels(transport=transport).inc(size)
+    DATASET_TRANSFER_DURATION.labels(transport=transport).observe(duration)
+    if duration > 0:
+        DATASET_TRANSFER_THROUGHPUT.labels(transport=transport).observe(
+            size / duration,
+        )
+
+
+def instrument_app(app: fastapi.FastAPI, service: str) -> None:
+    @app.middleware('http')
+    async def measure_request_latency(
+        request: starlette.requests.Request, call_next,
+    ) -> starlette.responses.Response:
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            route = request.scope.get('route')
+            HTTP_REQUEST_DURATION.labels(
+                service=service,
+                method=request.method,
+                route=route.path if route is not None else 'unmatched',
+                status_code=status_code,
+            ).observe(time.perf_counter() - start)
+
+    @app.get('/metrics', include_in_schema=False)
+    async def metrics() -> starlette.responses.Response:
+        return starlette.responses.Response(
+            content=prometheus_client.generate_latest(),
+            media_type=prometheus_client.CONTENT_TYPE_LATEST,
+        )
@@ -0,0 +1,459 @@
+import argparse
+import asyncio
+import atexit
+import contextlib
+import contextvars
+import dataclasses
+import functools
+import json
+import pathlib
+import queue
+import re
+import secrets
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import fastapi
+import pydantic
+import starlette.requests
+import starlette.responses
+
+TRACEPARENT_HEADER = 'traceparent'
+TRACEPARENT_REGEX = re.compile(
+    r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$',
+)
+TRACES_STORAGE = pathlib.Path(__file__).parent.parent.parent / 'traces'
+
+
+@dataclasses.dataclass
+class SpanContext:
+    trace_id: str
+    span_id: str
+
+
+@dataclasses.dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    name: str
+    service: str
+    start: float
+    end: Optional[float]
+    attributes: dict[str, Any]
+
+    @property
+    def duration(self) -> float:
+        return (self.end or self.start) - self.start
+
+
+@dataclasses.dataclass
+class TimelineEntry:
+    span: Span
+    depth: int
+    offset: float
+    critical: bool
+
+
+class SpanWriter:
+    def __init__(self):
+        self.queue: queue.Queue[tuple[pathlib.Path, Span]] = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def write(self, path: pathlib.Path, span: Span):
+        self._ensure_running()
+        self.queue.put((path, span))
+
+    def flush(self):
+        self.queue.join()
+
+    def _ensure_running(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(
+                target=self._run, name='span-writer', daemon=True,
+            )
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            entries = [self.queue.get()]
+            while True:
+                try:
+                    entries.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._append(entries)
+            except OSError as error:
+                print(f'{len(entries)} spans could not be written: {error!r}')
+            finally:
+                for _ in entries:
+                    self.queue.task_done()
+
+    @staticmethod
+    def _append(entries: list[tuple[pathlib.Path, Span]]):
+        lines: dict[pathlib.Path, list[str]] = {}
+        for path, span in entries:
+            lines.setdefault(path, []).append(
+                json.dumps(dataclasses.asdict(span), default=str) + '\n',
+            )
+        for path, path_lines in lines.items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open('a') as file:
+                file.writelines(path_lines)
+
+
+class JsonFileExporter:
+    def __init__(self, service: str):
+        self.service = service
+
+    def export(self, span: Span):
+        _writer.write(_storage / f'{self.service}.jsonl', span)
+
+
+class TracesRequest(pydantic.BaseModel):
+    trace_id: str = pydantic.Field(pattern=r'^[0-9a-f]{32}$')
+
+
+class TracesResponse(pydantic.BaseModel):
+    spans: list[dict[str, Any]]
+
+
+_current_span: contextvars.ContextVar[Optional[SpanContext]] = (
+    contextvars.ContextVar('current_span', default=None)
+)
+_app_exporter: contextvars.ContextVar[Optional[JsonFileExporter]] = (
+    contextvars.ContextVar('app_exporter', default=None)
+)
+_storage = TRACES_STORAGE
+_exporter: Optional[JsonFileExporter] = None
+_writer = SpanWriter()
+atexit.register(_writer.flush)
+
+
+def configure(service: str, storage: pathlib.Path = TRACES_STORAGE):
+    global _storage, _exporter
+    _storage = storage
+    _exporter = JsonFileExporter(service)
+
+
+def flush():
+    _writer.flush()
+
+
+def get_exporter() -> Optional[JsonFileExporter]:
+    return _app_exporter.get() or _exporter
+
+
+def get_service() -> str:
+    exporter = get_exporter()
+    return exporter.service if exporter is not None else 'unknown'
+
+
+def new_trace_id() -> str:
+    return secrets.token_hex(16)
+
+
+def new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+def current_span() -> Optional[SpanContext]:
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def start_span(
+    name: str, trace_id: Optional[str] = None, **attributes: Any,
+) -> Iterator[Span]:
+    parent = _current_span.get()
+    if trace_id is None:
+        trace_id = parent.trace_id if parent is not None else new_trace_id()
+    span = Span(
+        trace_id=trace_id,
+        span_id=new_span_id(),
+        parent_span_id=(
+            parent.span_id
+            if parent is not None and parent.trace_id == trace_id
+            else None
+        ),
+        name=name,
+        service=get_service(),
+        start=time.time(),
+        end=None,
+        attributes=attributes,
+    )
+    token = _current_span.set(SpanContext(trace_id, span.span_id))
+    try:
+        yield span
+    except BaseException as error:
+        span.attributes['error'] = repr(error)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end = time.time()
+        export_span(span)
+
+
+def record_span(
+    name: str, start: float, end: float, service: Optional[str] = None,
+    **attributes: Any,
+):
+    parent = _current_span.get()
+    if parent is None:
+        return
+    export_span(
+        Span(
+            trace_id=parent.trace_id,
+            span_id=new_span_id(),
+            parent_span_id=parent.span_id,
+            name=name,
+            service=service or get_service(),
+            start=start,
+            end=end,
+            attributes=attributes,
+        )
+    )
+
+
+def export_span(span: Span):
+    exporter = get_exporter()
+    if exporter is not None:
+        exporter.export(span)
+
+
+def bind_context(function: Callable) -> Callable:
+    context = contextvars.copy_context()
+    return functools.partial(context.run, function)
+
+
+def inject_headers() -> dict[str, str]:
+    span = _current_span.get()
+    if span is None:
+        return {}
+    return {TRACEPARENT_HEADER: format_traceparent(span)}
+
+
+def inject_environment() -> dict[str, str]:
+    return {
+        key.upper(): value for key, value in inject_headers().items()
+    }
+
+
+def format_traceparent(span: SpanContext) -> str:
+    return f'00-{span.trace_id}-{span.span_id}-01'
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    if value is None:
+        return None
+    match = TRACEPARENT_REGEX.match(value.strip().lower())
+    if match is None:
+        return None
+    return SpanContext(trace_id=match.group(1), span_id=match.group(2))
+
+
+@contextlib.contextmanager
+def continue_trace(parent: Optional[SpanContext]) -> Iterator[None]:
+    token = _current_span.set(parent)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+@contextlib.contextmanager
+def use_exporter(exporter: JsonFileExporter) -> Iterator[None]:
+    token = _app_exporter.set(exporter)
+    try:
+        yield
+    finally:
+        _app_exporter.reset(token)
+
+
+def instrument_app(app: fastapi.FastAPI, service: str):
+    exporter = JsonFileExporter(service)
+
+    @app.middleware('http')
+    async def trace_request(
+        request: starlette.requests.Request, call_next,
+    ) -> starlette.responses.Response:
+        parent = parse_traceparent(request.headers.get(TRACEPARENT_HEADER))
+        with use_exporter(exporter):
+            if parent is None:
+                return await call_next(request)
+            with continue_trace(parent):
+                with start_span(
+                    f'{request.method} {request.url.path}',
+                    kind='server',
+                ) as span:
+                    response = await call_next(request)
+                    span.attributes['status_code'] = response.status_code
+                    return response
+
+    @app.post('/traces', include_in_schema=False)
+    async def get_traces(request: TracesRequest) -> TracesResponse:
+        spans = await asyncio.to_thread(read_trace, request.trace_id)
+        return TracesResponse(spans=[dataclasses.asdict(s) for s in spans])
+
+
+def read_trace(trace_id: str) -> list[Span]:
+    return read_spans(_storage.glob('*.jsonl'), trace_id)
+
+
+def read_spans(
+    paths: Iterable[pathlib.Path], trace_id: Optional[str] = None,
+) -> list[Span]:
+    flush()
+    spans: list[Span] = []
+    for path in paths:
+        if not path.exists():
+            continue
+        with path.open() as file:
+            for line in file:
+                if trace_id is not None and trace_id not in line:
+                    continue
+                span = Span(**json.loads(line))
+                if trace_id is None or span.trace_id == trace_id:
+                    spans.append(span)
+    return spans
+
+
+def build_timeline(spans: Iterable[Span]) -> list[TimelineEntry]:
+    spans = {span.span_id: span for span in spans}
+    children: dict[Optional[str], list[Span]] = {}
+    for span in spans.values():
+        parent_id = (
+            span.parent_span_id if span.parent_span_id in spans else None
+        )
+        children.setdefault(parent_id, []).append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda s: s.start)
+    roots = children.get(None, [])
+    if not roots:
+        return []
+    trace_start = min(span.start for span in roots)
+    critical: set[str] = set()
+    last_root = max(roots, key=lambda s: s.end or s.start)
+    _mark_critical_path(last_root, children, critical)
+    timeline: list[TimelineEntry] = []
+
+    def visit(span: Span, depth: int):
+        timeline.append(
+            TimelineEntry(
+                span=span,
+                depth=depth,
+                offset=span.start - trace_start,
+                critical=span.span_id in critical,
+            )
+        )
+        for child in children.get(span.span_id, []):
+            visit(child, depth + 1)
+
+    for root in roots:
+        visit(root, 0)
+    return timeline
+
+
+def _mark_critical_path(
+    span: Span, children: dict[Optional[str], list[Span]], critical: set[str],
+):
+    critical.add(span.span_id)
+    cursor = float('inf')
+    for child in sorted(
+        children.get(span.span_id, []),
+        key=lambda s: s.end or s.start,
+        reverse=True,
+    ):
+        if (child.end or child.start) <= cursor:
+            _mark_critical_path(child, children, critical)
+            cursor = child.start
+
+
+def format_timeline(timeline: list[TimelineEntry], width: int = 40) -> str:
+    if not timeline:
+        return 'no spans found'
+    total = max(entry.offset + entry.span.duration for entry in timeline)
+    scale = width / total if total > 0 else 0
+    lines = []
+    for entry in timeline:
+        bar_start = int(entry.offset * scale)
+        bar_length = max(1, int(entry.span.duration * scale))
+        bar = ' ' * bar_start + '#' * bar_length
+        marker = '*' if entry.critical else ' '
+        name = '  ' * entry.depth + entry.span.name
+        lines.append(
+            f'{marker} {entry.offset:9.3f}s {entry.span.duration:9.3f}s '
+            f'|{bar:<{width}}| {entry.span.service}: {name}'
+        )
+    return '\n'.join(lines)
+
+
+def to_otlp(spans: Iterable[Span]) -> dict:
+    by_service: dict[str, list[Span]] = {}
+    for span in spans:
+        by_service.setdefault(span.service, []).append(span)
+    return {
+        'resourceSpans': [
+            {
+                'resource': {
+                    'attributes': [
+                        {
+                            'key': 'service.name',
+                            'value': {'stringValue': service},
+                        },
+                    ],
+                },
+                'scopeSpans': [
+                    {
+                        'scope': {'name': 'distributed_grid_search'},
+                        'spans': [
+                            _span_to_otlp(span)
+                            for span in service_spans
+                        ],
+                    },
+                ],
+            }
+            for service, service_spans in by_service.items()
+        ],
+    }
+
+
+def _span_to_otlp(span: Span) -> dict:
+    return {
+        'traceId': span.trace_id,
+        'spanId': span.span_id,
+        'parentSpanId': span.parent_span_id or '',
+        'name': span.name,
+        'startTimeUnixNano': str(int(span.start * 1e9)),
+        'endTimeUnixNano': str(int((span.end or span.start) * 1e9)),
+        'attributes': [
+            {'key': key, 'value': {'stringValue': str(value)}}
+            for key, value in span.attributes.items()
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='show timeline of a traced task',
+    )
+    parser.add_argument('trace_id')
+    parser.add_argument(
+        'files', nargs='*', type=pathlib.Path,
+        default=sorted(TRACES_STORAGE.glob('*.jsonl')),
+    )
+    parser.add_argument('--otlp', type=pathlib.Path, default=None)
+    args = parser.parse_args()
+    spans = read_spans(args.files, args.trace_id)
+    print(format_timeline(build_timeline(spans)))
+    if args.otlp is not None:
+        args.otlp.write_text(json.dumps(to_otlp(spans), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,11 @@
+import asyncio
 import ipaddress
 from typing import Optional
+import urllib.parse
+
+import aiohttp
+
+import src.common.backend.tracing as tracing
 
 
 class ClientBase:
@@ -16,9 +22,36 @@ class ClientBase:
         assert self.port is not None
         return f'http://{self.ipv4_address}:{self.port}{path}'
 
+    @staticmethod
+    def get_headers() -> dict[str, str]:
+        return tracing.inject_headers()
+
     def set_server(
         self, ipv4_address: ipaddress.IPv4Address, port: int,
     ) -> 'ClientBase':
         self.ipv4_address = ipv4_address
         self.port = port
         return self
+
+    def set_server_url(self, url: str) -> 'ClientBase':
+        parsed = urllib.parse.urlsplit(url)
+        return self.set_server(
+            ipv4_address=ipaddress.IPv4Address(parsed.hostname),
+            port=parsed.port,
+        )
+
+    async def get_traces(self, trace_id: str) -> list[tracing.Span]:
+        url = self.get_server_url('/traces')
+        request_body = tracing.TracesRequest(
+            trace_id=trace_id,
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            try:
+                async with session.post(
+                    url, json=request_body, timeout=3,
+                ) as response:
+                    json = await response.json()
+            except (asyncio.TimeoutError, aiohttp.ClientError):
+                return []
+        response_body = tracing.TracesResponse.model_validate(json)
+        return [tracing.Span(**span) for span in response_body.spans]
@@ -0,0 +1,96 @@
+import asyncio
+import datetime
+import ipaddress
+import pathlib
+import time
+import uuid
+
+import pytest
+import sqlalchemy as sql
+
+import src.common.backend.db as database
+import src.node_controller.backend.repositories as repositories
+import src.node_controller.models.core as core
+import src.node_controller.models.db as db_models
+
+CONST_DATETIME = '2024-05-05T12:47:39.651'
+
+
+def make_node(status: core.NodeStatus) -> core.Node:
+    return core.Node(
+        node_uid=uuid.uuid4(),
+        ipv4_address=ipaddress.IPv4Address('127.0.0.1'),
+        port=55555,
+        role=core.NodeRole.EXECUTOR,
+        status=status,
+        last_ping=datetime.datetime.fromisoformat(CONST_DATETIME),
+    )
+
+
+@pytest.fixture
+def db(tmp_path: pathlib.Path) -> database.DB:
+    return database.DB(
+        db_name=str(tmp_path / 'nodes.sqlite'), base=db_models.Base,
+    )
+
+
+def test_connections_use_wal(db: database.DB):
+    with db.begin() as session:
+        mode = session.execute(sql.text('PRAGMA journal_mode')).scalar()
+    assert mode == 'wal'
+
+
+def test_failed_queries_do_not_leak_timings(db: database.DB):
+    for _ in range(3):
+        with pytest.raises(sql.exc.OperationalError):
+            with db.begin() as session:
+                session.execute(sql.text('SELECT * FROM missing_table'))
+    with db.begin() as session:
+        connection = session.connection()
+        assert not connection.info.get('query_start')
+
+
+def test_upsert_entities_inserts_and_updates(db: database.DB):
+    repository = repositories.NodeRepository(db)
+    nodes = [make_node(core.NodeStatus.ACTIVE) for _ in range(3)]
+    repository.upsert_entities(nodes)
+    nodes[0].status = core.NodeStatus.INACTIVE
+    repository.upsert_entity(nodes[0])
+    for version, node in zip([4, 2, 3], nodes):
+        node.version = version
+    stored = {node.node_uid: node for node in repository.get_entities()}
+    assert stored == {node.node_uid: node for node in nodes}
+
+
+def test_batch_commits_once_and_rolls_back_on_error(db: database.DB):
+    repository = repositories.NodeRepository(db)
+    with db.begin():
+        repository.create_entity(make_node(core.NodeStatus.ACTIVE))
+        repository.create_entity(make_node(core.NodeStatus.ACTIVE))
+    with pytest.raises(RuntimeError):
+        with db.begin():
+            repository.create_entity(make_node(core.NodeStatus.ACTIVE))
+            raise RuntimeError
+    assert len(repository.get_entities()) == 2
+
+
+def test_async_repository_keeps_event_loop_free(db: database.DB):
+    repository = database.AsyncRepository(repositories.NodeRepository(db))
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    async def main() -> list[core.Node]:
+        ticker = asyncio.create_task(tick())
+        await db.run(time.sleep, 0.1)
+        await repository.upsert_entity(make_node(core.NodeStatus.ACTIVE))
+        nodes = await repository.get_entities()
+        ticker.cancel()
+        return nodes
+
+    assert len(asyncio.run(main())) == 1
+    assert ticks > 10
@@ -0,0 +1,29 @@
+import pathlib
+
+import src.common.backend.files as files
+
+
+def test_stage_file_hardlinks_on_same_filesystem(tmp_path: pathlib.Path):
+    src_path = tmp_path / 'dataset' / 'data.csv'
+    src_path.parent.mkdir()
+    src_path.write_text('x,y\n1,0\n')
+    dst_path = tmp_path / 'runtime' / 'input' / 'data.csv'
+    method = files.stage_file(src_path, dst_path)
+    assert method == files.StagingMethod.HARDLINK
+    assert dst_path.stat().st_ino == src_path.stat().st_ino
+
+
+def test_stage_tree_without_hardlinks_keeps_files_independent(
+    tmp_path: pathlib.Path,
+):
+    src_path = tmp_path / 'dataset'
+    (src_path / 'part').mkdir(parents=True)
+    (src_path / 'part' / 'data.csv').write_text('x,y\n1,0\n')
+    dst_path = tmp_path / 'storage'
+    methods = files.stage_tree(src_path, dst_path, hardlink=False)
+    assert methods[files.StagingMethod.HARDLINK] == 0
+    assert sum(methods.values()) == 1
+    staged = dst_path / 'part' / 'data.csv'
+    assert staged.read_text() == 'x,y\n1,0\n'
+    source = src_path / 'part' / 'data.csv'
+    assert staged.stat().st_ino != source.stat().st_ino
@@ -0,0 +1,50 @@
+import pathlib
+
+import fastapi
+import fastapi.testclient
+import prometheus_client
+import sqlalchemy as sql
+
+import src.common.backend.db as database
+import src.common.backend.metrics as metrics
+import src.node_controller.models.db as node_db_models
+
+
+def test_instrumented_app_exposes_route_latency():
+    app = fastapi.FastAPI()
+    metrics.instrument_app(app, service='test_service')
+
+    @app.get('/items/{item_id}')
+    async def get_item(item_id: int):
+        return {'item_id': item_id}
+
+    client = fastapi.testclient.TestClient(app)
+    assert client.get('/items/1').status_code == 200
+    assert client.get('/items/2').status_code == 200
+    count = prometheus_client.REGISTRY.get_sample_value(
+        'dgs_http_request_duration_seconds_count',
+        {
+            'service': 'test_service',
+            'method': 'GET',
+            'route': '/items/{item_id}',
+            'status_code': '200',
+        },
+    )
+    assert count == 2
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert 'dgs_http_request_duration_seconds' in response.text
+
+
+def test_db_query_timings_are_recorded(tmp_path: pathlib.Path):
+    db = database.DB(
+        db_name=str(tmp_path / 'metrics_test.sqlite'),
+        base=node_db_models.Base,
+    )
+    with db.create_session() as session:
+        session.execute(sql.select(node_db_models.Node))
+    count = prometheus_client.REGISTRY.get_sample_value(
+        'dgs_db_query_duration_seconds_count',
+        {'database': 'metrics_test', 'operation': 'SELECT'},
+    )
+    assert count >= 1
@@ -0,0 +1,116 @@
+import pathlib
+import threading
+
+import fastapi
+import fastapi.testclient
+
+import src.common.backend.tracing as tracing
+
+
+def make_span(
+    span_id: str, parent_span_id, start: float, end: float,
+) -> tracing.Span:
+    return tracing.Span(
+        trace_id='0' * 32,
+        span_id=span_id,
+        parent_span_id=parent_span_id,
+        name=span_id,
+        service='test',
+        start=start,
+        end=end,
+        attributes={},
+    )
+
+
+def test_traceparent_roundtrip():
+    context = tracing.SpanContext(trace_id='a' * 32, span_id='b' * 16)
+    header = tracing.format_traceparent(context)
+    assert tracing.parse_traceparent(header) == context
+    assert tracing.parse_traceparent('garbage') is None
+    assert tracing.parse_traceparent(None) is None
+
+
+def test_spans_are_nested_and_exported(tmp_path: pathlib.Path):
+    tracing.configure('test', storage=tmp_path)
+    try:
+        with tracing.start_span('task', trace_id='c' * 32) as root:
+            assert 'c' * 32 in tracing.inject_headers()['traceparent']
+            with tracing.start_span('step') as step:
+                pass
+            thread = threading.Thread(
+                target=tracing.bind_context(
+                    lambda: tracing.record_span('phase', 1.0, 2.0),
+                ),
+            )
+            thread.start()
+            thread.join()
+    finally:
+        tracing.configure('unknown', storage=tmp_path)
+    assert tracing.current_span() is None
+    assert step.parent_span_id == root.span_id
+    spans = tracing.read_spans([tmp_path / 'test.jsonl'], 'c' * 32)
+    assert {span.name for span in spans} == {'task', 'step', 'phase'}
+    assert all(
+        span.parent_span_id == root.span_id
+        for span in spans if span.name != 'task'
+    )
+
+
+def test_co_hosted_apps_label_their_own_spans(tmp_path: pathlib.Path):
+    apps = {service: fastapi.FastAPI() for service in ('first', 'second')}
+    for service, app in apps.items():
+        tracing.instrument_app(app, service=service)
+
+        @app.get('/work')
+        def work():
+            with tracing.start_span('work'):
+                pass
+
+    trace_id = 'd' * 32
+    headers = {
+        'traceparent': tracing.format_traceparent(
+            tracing.SpanContext(trace_id=trace_id, span_id='e' * 16),
+        ),
+    }
+    tracing.configure('test', storage=tmp_path)
+    try:
+        for app in apps.values():
+            client = fastapi.testclient.TestClient(app)
+            assert client.get('/work', headers=headers).status_code == 200
+        response = client.post('/traces', json={'trace_id': trace_id})
+    finally:
+        tracing.configure('unknown', storage=tmp_path)
+    spans = response.json()['spans']
+    assert sorted((span['service'], span['name']) for span in spans) == [
+        ('first', 'GET /work'), ('first', 'work'),
+        ('second', 'GET /work'), ('second', 'work'),
+    ]
+
+
+def test_timeline_marks_critical_path():
+    spans = [
+        make_span('root', None, 0, 10),
+        make_span('discovery', 'root', 0, 2),
+        make_span('publishing', 'root', 2, 5),
+        make_span('image', 'publishing', 2, 3),
+        make_span('dataset', 'publishing', 2, 5),
+        make_span('execution', 'root', 5, 10),
+    ]
+    timeline = tracing.build_timeline(spans)
+    assert [entry.span.name for entry in timeline] == [
+        'root', 'discovery', 'publishing', 'image', 'dataset', 'execution',
+    ]
+    critical = {entry.span.name for entry in timeline if entry.critical}
+    assert critical == {
+        'root', 'discovery', 'publishing', 'dataset', 'execution',
+    }
+    assert [entry.depth for entry in timeline] == [0, 1, 1, 2, 2, 1]
+    assert 'execution' in tracing.format_timeline(timeline)
+
+
+def test_otlp_export_groups_spans_by_service():
+    otlp = tracing.to_otlp([make_span('root', None, 0, 1)])
+    [resource] = otlp['resourceSpans']
+    [span] = resource['scopeSpans'][0]['spans']
+    assert span['spanId'] == 'root'
+    assert span['endTimeUnixNano'] == str(10 ** 9)
@@ -0,0 +1,86 @@
+import gzip
+import pathlib
+import shutil
+from typing import Iterable
+
+import src.common.backend.files as files
+import src.data_controller.models.core as models
+
+COMPRESSIBLE_SUFFIXES = ('.csv',)
+COMPRESSED_SUFFIXES = {
+    models.Compression.GZIP: '.gz',
+    models.Compression.ZSTD: '.zst',
+}
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def get_compressed_path(
+    path: pathlib.Path, compression: models.Compression,
+) -> pathlib.Path:
+    if (
+        compression == models.Compression.NONE or
+        path.suffix not in COMPRESSIBLE_SUFFIXES
+    ):
+        return path
+    return path.with_name(path.name + COMPRESSED_SUFFIXES[compression])
+
+
+def compress_file(
+    src_path: pathlib.Path,
+    dst_path: pathlib.Path,
+    compression: models.Compression,
+):
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    with src_path.open('rb') as src, dst_path.open('wb') as dst:
+        match compression:
+            case models.Compression.GZIP:
+                with gzip.GzipFile(
+                    filename='', mode='wb', fileobj=dst,
+                    compresslevel=GZIP_LEVEL, mtime=0,
+                ) as writer:
+                    shutil.copyfileobj(src, writer, COPY_BUFFER_SIZE)
+            case models.Compression.ZSTD:
+                import zstandard
+                zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(
+                    src, dst, read_size=COPY_BUFFER_SIZE,
+                )
+            case _:
+                raise ValueError(f'unknown compression {compression}')
+
+
+def store_files(
+    paths: Iterable[tuple[pathlib.Path, pathlib.Path]],
+    compression: models.Compression,
+) -> dict[files.StagingMethod | models.Compression, int]:
+    methods = {method: 0 for method in files.StagingMethod}
+    methods[compression] = 0
+    for src_path, dst_path in paths:
+        compressed_path = get_compressed_path(dst_path, compression)
+        if compressed_path == dst_path:
+            method = files.stage_file(src_path, dst_path, hardlink=False)
+            methods[method] += 1
+            continue
+        compress_file(src_path, compressed_path, compression)
+        methods[compression] += 1
+    return methods
+
+
+def store_tree(
+    src_path: pathlib.Path,
+    dst_path: pathlib.Path,
+    compression: models.Compression,
+) -> dict[files.StagingMethod | models.Compression, int]:
+    if src_path.is_file():
+        return store_files(
+            [(src_path, dst_path / src_path.name)], compression,
+        )
+    return store_files(
+        (
+            (file, dst_path / file.relative_to(src_path))
+            for file in src_path.rglob('*')
+            if file.is_file()
+        ),
+        compression,
+    )
@@ -0,0 +1,144 @@
+import collections
+import shutil
+import threading
+from typing import Optional
+import uuid
+
+import src.common.backend.metrics as metrics
+import src.data_controller.backend.http_transfer as http_transfer
+import src.data_controller.backend.repositories as repositories
+import src.data_controller.backend.torrent_service as torrent
+import src.data_controller.models.core as models
+
+DATASET_CACHE_BUDGET = 10 * 1024 ** 3
+EVICTABLE_STATUSES = (
+    models.DatasetStatus.AVAILABLE,
+    models.DatasetStatus.ERROR,
+)
+
+
+class DatasetCache:
+    def __init__(
+        self,
+        dataset_repository: repositories.DatasetRepository,
+        torrent_service: torrent.TorrentService,
+        http_transfer_service: http_transfer.HttpTransferService,
+        budget: int = DATASET_CACHE_BUDGET,
+    ):
+        self.dataset_repository = dataset_repository
+        self.torrent_service = torrent_service
+        self.http_transfer_service = http_transfer_service
+        self.budget = budget
+        self.pins: collections.Counter[uuid.UUID] = collections.Counter()
+        self.recent: collections.OrderedDict[uuid.UUID, None] = (
+            collections.OrderedDict()
+        )
+        self.sizes: Optional[dict[uuid.UUID, int]] = None
+        self.lock = threading.Lock()
+
+    def record_request(self, dataset_uid: uuid.UUID, hit: bool):
+        result = 'hit' if hit else 'miss'
+        metrics.DATASET_CACHE_REQUESTS.labels(result=result).inc()
+        self.touch(dataset_uid)
+
+    def touch(self, dataset_uid: uuid.UUID):
+        with self.lock:
+            self.recent[dataset_uid] = None
+            self.recent.move_to_end(dataset_uid)
+
+    def pin(self, dataset_uid: uuid.UUID):
+        with self.lock:
+            self.pins[dataset_uid] += 1
+
+    def unpin(self, dataset_uid: uuid.UUID):
+        with self.lock:
+            self.pins[dataset_uid] -= 1
+            if self.pins[dataset_uid] <= 0:
+                del self.pins[dataset_uid]
+
+    def is_pinned(self, dataset_uid: uuid.UUID) -> bool:
+        with self.lock:
+            return self.pins[dataset_uid] > 0
+
+    def add(self, dataset: models.Dataset):
+        size = self.torrent_service.get_dataset_size(dataset.path)
+        sizes = self._get_sizes()
+        with self.lock:
+            sizes[dataset.dataset_uid] = size
+
+    def evict(self) -> int:
+        sizes = self._get_sizes()
+        with self.lock:
+            total = sum(sizes.values())
+        evicted = 0
+        if total > self.budget:
+            with self.torrent_service.datasets_lock:
+                for dataset_uid in self._get_eviction_order(sizes):
+                    if total <= self.budget:
+                        break
+                    dataset = self.dataset_repository.get_entity(dataset_uid)
+                    if (
+                        dataset is None or
+                        dataset.origin != models.DatasetOrigin.DOWNLOADED
+                    ):
+                        total -= self._forget(dataset_uid)
+                        continue
+                    if (
+                        dataset.status not in EVICTABLE_STATUSES or
+                        self.is_pinned(dataset_uid)
+                    ):
+                        continue
+                    self._remove(dataset)
+                    size = self._forget(dataset_uid)
+                    total -= size
+                    evicted += size
+        metrics.DATASET_CACHE_SIZE.set(total)
+        if evicted:
+            metrics.DATASET_CACHE_EVICTED_BYTES.inc(evicted)
+            print(
+                f'dataset cache evicted {evicted} bytes, '
+                f'{total} of {self.budget} bytes in use'
+            )
+        return evicted
+
+    def _get_sizes(self) -> dict[uuid.UUID, int]:
+        if self.sizes is not None:
+            return self.sizes
+        sizes = {
+            dataset.dataset_uid: self.torrent_service.get_dataset_size(
+                dataset.path,
+            )
+            for dataset in self.dataset_repository.get_entities()
+            if dataset.origin == models.DatasetOrigin.DOWNLOADED
+        }
+        with self.lock:
+            if self.sizes is None:
+                self.sizes = sizes
+            return self.sizes
+
+    def _forget(self, dataset_uid: uuid.UUID) -> int:
+        with self.lock:
+            return self.sizes.pop(dataset_uid, 0)
+
+    def _get_eviction_order(
+        self, sizes: dict[uuid.UUID, int],
+    ) -> list[uuid.UUID]:
+        with self.lock:
+            untouched = [
+                dataset_uid for dataset_uid in sizes
+                if dataset_uid not in self.recent
+            ]
+            recent = [
+                dataset_uid for dataset_uid in self.recent
+                if dataset_uid in sizes
+            ]
+        return [*untouched, *recent]
+
+    def _remove(self, dataset: models.Dataset):
+        print(f'evicting dataset {dataset.dataset_uid} from cache')
+        self.torrent_service.remove_torrent(dataset)
+        self.http_transfer_service.forget_manifest(dataset.dataset_uid)
+        shutil.rmtree(dataset.path, ignore_errors=True)
+        self.dataset_repository.delete_entity(dataset.dataset_uid)
+        with self.lock:
+            self.recent.pop(dataset.dataset_uid, None)
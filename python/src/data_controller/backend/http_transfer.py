@@ -0,0 +1,335 @@
+import concurrent.futures
+import gzip
+import hashlib
+import json
+import pathlib
+import threading
+import time
+from typing import Optional
+import urllib.parse
+import urllib.request
+import uuid
+
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
+import src.data_controller.backend.repositories as repositories
+import src.data_controller.models.core as models
+import src.data_controller.models.web as web
+
+CHUNK_SIZE = 4 * 1024 * 1024
+TRANSFER_WORKERS = 4
+CHUNK_RETRIES = 3
+HTTP_TIMEOUT = 30
+PARTIAL_SUFFIX = '.part'
+CHECKSUM_ALGORITHM = 'sha256'
+
+
+class LocalChunkSource:
+    def __init__(self, transfer_service: 'HttpTransferService'):
+        self.transfer_service = transfer_service
+
+    def get_manifest(
+        self, dataset_uid: uuid.UUID,
+    ) -> Optional[models.Manifest]:
+        return self.transfer_service.get_manifest(dataset_uid)
+
+    def read_chunk(
+        self, dataset_uid: uuid.UUID, path: str, offset: int, length: int,
+    ) -> bytes:
+        return self.transfer_service.read_chunk(
+            dataset_uid, path, offset, length,
+        )
+
+
+class HttpChunkSource:
+    def __init__(self, url: str, compress: bool = False):
+        self.url = url.rstrip('/')
+        self.compress = compress
+
+    def get_manifest(
+        self, dataset_uid: uuid.UUID,
+    ) -> Optional[models.Manifest]:
+        request_body = web.GetManifestRequest(
+            dataset_uid=dataset_uid,
+        ).model_dump_json()
+        request = urllib.request.Request(
+            f'{self.url}/data/manifest',
+            data=request_body.encode(),
+            headers={
+                'Content-Type': 'application/json',
+                **tracing.inject_headers(),
+            },
+        )
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+            json_body = json.loads(response.read())
+        response_body = web.GetManifestResponse.model_validate(json_body)
+        if response_body.manifest is None:
+            return None
+        return response_body.manifest.to_core()
+
+    def read_chunk(
+        self, dataset_uid: uuid.UUID, path: str, offset: int, length: int,
+    ) -> bytes:
+        query = urllib.parse.urlencode(
+            {'dataset_uid': str(dataset_uid), 'path': path},
+        )
+        request = urllib.request.Request(
+            f'{self.url}/data/chunk?{query}',
+            headers={
+                'Range': f'bytes={offset}-{offset + length - 1}',
+                'Accept-Encoding': 'gzip' if self.compress else 'identity',
+                **tracing.inject_headers(),
+            },
+        )
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+            data = response.read()
+            if response.headers.get('Content-Encoding') == 'gzip':
+                data = gzip.decompress(data)
+        return data
+
+
+class HttpTransferService:
+    def __init__(
+        self,
+        dataset_repository: repositories.DatasetRepository,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.dataset_repository = dataset_repository
+        self.chunk_size = chunk_size
+        self.manifests: dict[uuid.UUID, models.Manifest] = {}
+        self.lock = threading.Lock()
+
+    def get_manifest(
+        self, dataset_uid: uuid.UUID,
+    ) -> Optional[models.Manifest]:
+        with self.lock:
+            if dataset_uid in self.manifests:
+                return self.manifests[dataset_uid]
+        dataset = self.dataset_repository.get_entity(dataset_uid)
+        if dataset is None or dataset.status != models.DatasetStatus.AVAILABLE:
+            return None
+        files = sorted(
+            file for file in dataset.path.rglob('*')
+            if file.is_file() and file.suffix != PARTIAL_SUFFIX
+        )
+        manifest = models.Manifest(
+            dataset_uid=dataset_uid,
+            chunk_size=self.chunk_size,
+            files=[self._describe_file(file, dataset.path) for file in files],
+            base_dataset_uid=dataset.base_uid,
+        )
+        with self.lock:
+            self.manifests[dataset_uid] = manifest
+        return manifest
+
+    def forget_manifest(self, dataset_uid: uuid.UUID):
+        with self.lock:
+            self.manifests.pop(dataset_uid, None)
+
+    def read_chunk(
+        self, dataset_uid: uuid.UUID, path: str, offset: int, length: int,
+    ) -> bytes:
+        dataset = self.dataset_repository.get_entity(dataset_uid)
+        if dataset is None or dataset.status != models.DatasetStatus.AVAILABLE:
+            raise FileNotFoundError(f'dataset {dataset_uid} is not available')
+        root = dataset.path.resolve()
+        file = (root / path).resolve()
+        if not file.is_relative_to(root) or not file.is_file():
+            raise FileNotFoundError(f'dataset {dataset_uid} has no {path}')
+        with file.open('rb') as content:
+            content.seek(offset)
+            return content.read(length)
+
+    def download(
+        self,
+        dataset: models.Dataset,
+        source: LocalChunkSource | HttpChunkSource,
+        manifest: Optional[models.Manifest] = None,
+    ) -> int:
+        start = time.perf_counter()
+        with tracing.start_span(
+            'http_download', dataset_uid=str(dataset.dataset_uid),
+        ):
+            if manifest is None:
+                manifest = source.get_manifest(dataset.dataset_uid)
+            if manifest is None:
+                raise FileNotFoundError(
+                    f'source has no dataset {dataset.dataset_uid}',
+                )
+            dataset.base_uid = manifest.base_dataset_uid
+            local_chunks = self._get_local_chunks(manifest.base_dataset_uid)
+            jobs = []
+            reused = 0
+            for file in manifest.files:
+                file_jobs, file_reused = self._prepare_file(
+                    dataset.path, manifest, file, local_chunks,
+                )
+                jobs.extend(file_jobs)
+                reused += file_reused
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=TRANSFER_WORKERS,
+                thread_name_prefix='chunk',
+            ) as executor:
+                transferred = sum(
+                    executor.map(
+                        lambda job: self._fetch_chunk(
+                            source, dataset.dataset_uid, *job,
+                        ),
+                        jobs,
+                    )
+                )
+            for file in manifest.files:
+                self._complete_file(dataset.path, file)
+        metrics.observe_dataset_transfer(
+            transport='http',
+            size=transferred,
+            duration=time.perf_counter() - start,
+        )
+        print(
+            f'dataset {dataset.dataset_uid} has been downloaded over http: '
+            f'{len(jobs)} chunks, {transferred} bytes, '
+            f'{reused} bytes reused from local versions'
+        )
+        return transferred
+
+    def _get_local_chunks(
+        self, base_uid: Optional[uuid.UUID],
+    ) -> dict[str, tuple[pathlib.Path, int, int]]:
+        chunks = {}
+        visited = set()
+        while base_uid is not None and base_uid not in visited:
+            visited.add(base_uid)
+            manifest = self.get_manifest(base_uid)
+            if manifest is None:
+                break
+            root = self.dataset_repository.get_entity(base_uid).path
+            for file in manifest.files:
+                for index, checksum in enumerate(file.chunks):
+                    offset = index * manifest.chunk_size
+                    length = min(manifest.chunk_size, file.size - offset)
+                    chunks.setdefault(
+                        checksum, (root / file.path, offset, length),
+                    )
+            base_uid = manifest.base_dataset_uid
+        return chunks
+
+    def _describe_file(
+        self, file: pathlib.Path, root: pathlib.Path,
+    ) -> models.FileManifest:
+        checksum = hashlib.new(CHECKSUM_ALGORITHM)
+        chunks = []
+        with file.open('rb') as content:
+            while chunk := content.read(self.chunk_size):
+                checksum.update(chunk)
+                chunks.append(get_chunk_checksum(chunk))
+        return models.FileManifest(
+            path=file.relative_to(root).as_posix(),
+            size=file.stat().st_size,
+            checksum=checksum.hexdigest(),
+            chunks=chunks,
+        )
+
+    @staticmethod
+    def _prepare_file(
+        root: pathlib.Path,
+        manifest: models.Manifest,
+        file: models.FileManifest,
+        local_chunks: dict[str, tuple[pathlib.Path, int, int]],
+    ) -> tuple[list[tuple], int]:
+        target = get_target(root, file.path)
+        if (
+            target.is_file() and target.stat().st_size == file.size and
+            get_checksum(target) == file.checksum
+        ):
+            return [], 0
+        partial = target.with_name(target.name + PARTIAL_SUFFIX)
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        with partial.open('a+b') as content:
+            content.truncate(file.size)
+        jobs = []
+        reused = 0
+        with partial.open('r+b') as content:
+            for index, checksum in enumerate(file.chunks):
+                offset = index * manifest.chunk_size
+                length = min(manifest.chunk_size, file.size - offset)
+                content.seek(offset)
+                data = content.read(length)
+                if get_chunk_checksum(data) == checksum:
+                    continue
+                data = read_local_chunk(local_chunks.get(checksum), length)
+                if data is not None and get_chunk_checksum(data) == checksum:
+                    content.seek(offset)
+                    content.write(data)
+                    reused += length
+                    continue
+                jobs.append((file.path, partial, offset, length, checksum))
+        return jobs, reused
+
+    @staticmethod
+    def _fetch_chunk(
+        source: LocalChunkSource | HttpChunkSource,
+        dataset_uid: uuid.UUID,
+        path: str,
+        partial: pathlib.Path,
+        offset: int,
+        length: int,
+        checksum: str,
+    ) -> int:
+        for attempt in range(1, CHUNK_RETRIES + 1):
+            try:
+                data = source.read_chunk(dataset_uid, path, offset, length)
+            except OSError:
+                if attempt == CHUNK_RETRIES:
+                    raise
+                continue
+            if get_chunk_checksum(data) == checksum:
+                with partial.open('r+b') as content:
+                    content.seek(offset)
+                    content.write(data)
+                return len(data)
+            print(
+                f'chunk {path}@{offset} checksum mismatch, attempt {attempt}',
+            )
+        raise ValueError(f'could not fetch valid chunk {path}@{offset}')
+
+    @staticmethod
+    def _complete_file(root: pathlib.Path, file: models.FileManifest):
+        target = get_target(root, file.path)
+        partial = target.with_name(target.name + PARTIAL_SUFFIX)
+        if not partial.exists():
+            return
+        if get_checksum(partial) != file.checksum:
+            raise ValueError(f'file {file.path} checksum mismatch')
+        partial.replace(target)
+
+
+def get_target(root: pathlib.Path, path: str) -> pathlib.Path:
+    target = (root / path).resolve()
+    if not target.is_relative_to(root.resolve()):
+        raise ValueError(f'file {path} is outside of the dataset folder')
+    return target
+
+
+def read_local_chunk(
+    location: Optional[tuple[pathlib.Path, int, int]], length: int,
+) -> Optional[bytes]:
+    if location is None:
+        return None
+    path, offset, local_length = location
+    if local_length != length:
+        return None
+    try:
+        with path.open('rb') as content:
+            content.seek(offset)
+            return content.read(length)
+    except OSError:
+        return None
+
+
+def get_checksum(path: pathlib.Path) -> str:
+    with path.open('rb') as content:
+        return hashlib.file_digest(content, CHECKSUM_ALGORITHM).hexdigest()
+
+
+def get_chunk_checksum(data: bytes) -> str:
+    return hashlib.new(CHECKSUM_ALGORITHM, data).hexdigest()
@@ -1,3 +1,4 @@
+import pathlib
 from typing import Iterable
 from typing import Optional
 import uuid
@@ -14,22 +15,20 @@ class DatasetRepository:
         self.db = db
 
     def create_entity(self, entity: core.Dataset):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             image: db_models.Dataset = db_models.Dataset.from_core(entity)
             session.add(image)
-            session.commit()
 
     def delete_entity(self, dataset_uid: uuid.UUID):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             dataset: Optional[db_models.Dataset] = session.query(
                 db_models.Dataset,
             ).where(db_models.Dataset.dataset_uid == str(dataset_uid)).first()
             if dataset is not None:
                 session.delete(dataset)
-                session.commit()
 
     def update_entity(self, entity: core.Dataset):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             dataset = db_models.Dataset.from_core(entity)
             stmt = sql.update(
                 db_models.Dataset,
@@ -39,12 +38,15 @@ class DatasetRepository:
                 magnet_link=dataset.magnet_link,
                 path=dataset.path,
                 status=dataset.status,
+                base_uid=dataset.base_uid,
+                source_path=dataset.source_path,
+                compression=dataset.compression,
+                origin=dataset.origin,
             )
             session.execute(stmt)
-            session.commit()
 
     def get_entity(self, dataset_uid: uuid.UUID) -> Optional[core.Dataset]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             dataset: Optional[db_models.Dataset] = session.query(
                 db_models.Dataset
             ).where(db_models.Dataset.dataset_uid == str(dataset_uid)).first()
@@ -52,20 +54,31 @@ class DatasetRepository:
                 return None
             return dataset.to_core()
 
+    def get_latest_entity(
+        self, source_path: pathlib.Path,
+    ) -> Optional[core.Dataset]:
+        with self.db.begin() as session:
+            stmt = sql.select(db_models.Dataset).where(
+                db_models.Dataset.source_path == str(source_path),
+                db_models.Dataset.status == core.DatasetStatus.AVAILABLE.value,
+            ).order_by(sql.literal_column('dataset.rowid').desc()).limit(1)
+            dataset = session.scalars(stmt).first()
+            if dataset is None:
+                return None
+            return dataset.to_core()
+
     def get_entities(self) -> Iterable[core.Dataset]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             stmt = sql.select(db_models.Dataset)
             datasets = session.scalars(stmt).all()
-        return [dataset.to_core() for dataset in datasets]
+            return [dataset.to_core() for dataset in datasets]
 
     def upsert_entity(self, entity: core.Dataset):
-        with self.db.create_session() as session:
-            image: Optional[db_models.Dataset] = session.query(
-                db_models.Dataset
-            ).where(
-                db_models.Dataset.dataset_uid == str(entity.dataset_uid)
-            ).first()
-        if image is None:
-            self.create_entity(entity)
-        else:
-            self.update_entity(entity)
+        self.upsert_entities([entity])
+
+    def upsert_entities(self, entities: Iterable[core.Dataset]):
+        with self.db.begin() as session:
+            database.upsert(
+                session,
+                [db_models.Dataset.from_core(entity) for entity in entities],
+            )
@@ -1,31 +1,61 @@
+import gzip
+import json
 import pathlib
+import re
+from typing import Optional
+import uuid
 
 import fastapi
 
 import src.common.backend.db as database
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
 import src.common.models.web as common_web
+import src.data_controller.backend.compression as compression
+import src.data_controller.backend.dataset_cache as cache
+import src.data_controller.backend.http_transfer as http_transfer
 import src.data_controller.backend.repositories as repositories
 import src.data_controller.backend.services as services
 import src.data_controller.backend.torrent_service as torrent
 import src.data_controller.models.db as db_models
 import src.data_controller.models.web as models
 
+RANGE_REGEX = re.compile(r'^bytes=(\d+)-(\d+)$')
+CHUNK_COMPRESSION_LEVEL = 1
+COMPRESSED_SUFFIXES = tuple(compression.COMPRESSED_SUFFIXES.values())
 
 app = fastapi.FastAPI()
+metrics.instrument_app(app, service='data_controller')
+tracing.instrument_app(app, service='data_controller')
 db_name = str(
     pathlib.Path(__file__).parent.parent / 'db' / 'data_controller.sqlite',
 )
 db = database.DB(db_name=db_name, base=db_models.Base)
 dataset_repository = repositories.DatasetRepository(db)
 torrent_service = torrent.TorrentService(dataset_repository)
-dataset_service = services.DatasetService(dataset_repository, torrent_service)
+http_transfer_service = http_transfer.HttpTransferService(dataset_repository)
+config_path = pathlib.Path(__file__).parent.parent / 'config' / 'config.json'
+config = json.loads(config_path.read_text()) if config_path.exists() else {}
+dataset_cache = cache.DatasetCache(
+    dataset_repository,
+    torrent_service,
+    http_transfer_service,
+    budget=config.get('dataset_cache_budget', cache.DATASET_CACHE_BUDGET),
+)
+dataset_service = services.DatasetService(
+    dataset_repository, torrent_service, http_transfer_service, dataset_cache,
+)
 
 
 @app.post('/data/publish')
-def publish_dataset(
+async def publish_dataset(
     request: models.DataPublishRequest,
 ) -> models.DataPublishResponse:
-    dataset = dataset_service.publish_dataset(request.path)
+    dataset = await dataset_service.publish_dataset(
+        request.path,
+        base_uid=request.base_uid,
+        compression=request.compression,
+    )
     return models.DataPublishResponse(
         status=common_web.ResponseStatus.SUCCESS,
         dataset_uid=dataset.dataset_uid,
@@ -38,7 +68,12 @@ def download_dataset(
     request: models.DataDownloadRequest,
 ) -> models.DataDownloadResponse:
     dataset = dataset_service.download_dataset(
-        request.dataset_uid, request.magnet_link,
+        request.dataset_uid,
+        request.magnet_link,
+        source_url=request.source_url,
+        transport=request.transport,
+        compress=request.compress,
+        pin=request.pin,
     )
     return models.DataDownloadResponse(
         status=common_web.ResponseStatus.SUCCESS,
@@ -46,12 +81,66 @@ def download_dataset(
     )
 
 
+@app.post('/data/unpin')
+def unpin_dataset(
+    request: models.UnpinDataRequest,
+) -> common_web.BaseResponse:
+    dataset_service.unpin_dataset(request.dataset_uid)
+    return common_web.BaseResponse(status=common_web.ResponseStatus.SUCCESS)
+
+
 @app.post('/data')
 def get_dataset(request: models.GetDataRequest) -> models.Dataset:
     dataset = dataset_service.get_dataset(request.dataset_uid)
     return models.Dataset.from_core(dataset)
 
 
+@app.post('/data/manifest')
+def get_dataset_manifest(
+    request: models.GetManifestRequest,
+) -> models.GetManifestResponse:
+    manifest = dataset_service.get_manifest(request.dataset_uid)
+    return models.GetManifestResponse(
+        status=common_web.ResponseStatus.SUCCESS,
+        manifest=(
+            models.Manifest.from_core(manifest)
+            if manifest is not None else None
+        ),
+    )
+
+
+@app.get('/data/chunk')
+def get_dataset_chunk(
+    dataset_uid: uuid.UUID,
+    path: str,
+    range_header: str = fastapi.Header(alias='Range'),
+    accept_encoding: Optional[str] = fastapi.Header(default=None),
+) -> fastapi.Response:
+    match = RANGE_REGEX.match(range_header)
+    if match is None:
+        raise fastapi.HTTPException(status_code=416)
+    start, end = int(match.group(1)), int(match.group(2))
+    try:
+        data = dataset_service.read_chunk(
+            dataset_uid, path, start, end - start + 1,
+        )
+    except FileNotFoundError as error:
+        raise fastapi.HTTPException(status_code=404, detail=str(error))
+    headers = {'Content-Range': f'bytes {start}-{start + len(data) - 1}/*'}
+    if (
+        accept_encoding is not None and 'gzip' in accept_encoding and
+        not path.endswith(COMPRESSED_SUFFIXES)
+    ):
+        data = gzip.compress(data, compresslevel=CHUNK_COMPRESSION_LEVEL)
+        headers['Content-Encoding'] = 'gzip'
+    return fastapi.Response(
+        content=data,
+        status_code=206,
+        headers=headers,
+        media_type='application/octet-stream',
+    )
+
+
 if __name__ == '__main__':
     import uvicorn
 
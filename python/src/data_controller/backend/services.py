@@ -1,6 +1,12 @@
+import asyncio
 import pathlib
+import threading
+from typing import Optional
 import uuid
 
+import src.common.backend.tracing as tracing
+import src.data_controller.backend.dataset_cache as cache
+import src.data_controller.backend.http_transfer as http_transfer
 import src.data_controller.backend.repositories as repositories
 import src.data_controller.backend.torrent_service as torrent
 import src.data_controller.models.core as models
@@ -11,22 +17,154 @@ class DatasetService:
         self,
         dataset_repository: repositories.DatasetRepository,
         torrent_service: torrent.TorrentService,
+        http_transfer_service: http_transfer.HttpTransferService,
+        dataset_cache: cache.DatasetCache,
     ):
         self.dataset_repository = dataset_repository
         self.torrent_service = torrent_service
+        self.http_transfer_service = http_transfer_service
+        self.dataset_cache = dataset_cache
 
-    def publish_dataset(self, dataset_path: pathlib.Path) -> models.Dataset:
-        dataset = self.torrent_service.publish_dataset(dataset_path)
+    async def publish_dataset(
+        self,
+        dataset_path: pathlib.Path,
+        base_uid: Optional[uuid.UUID] = None,
+        compression: models.Compression = models.Compression.NONE,
+    ) -> models.Dataset:
+        dataset_uid = await self.torrent_service.hash_dataset_uid(
+            dataset_path, compression,
+        )
+        dataset = await asyncio.to_thread(
+            tracing.bind_context(self.torrent_service.publish_dataset),
+            dataset_path, base_uid, compression, dataset_uid,
+        )
         return dataset
 
     def download_dataset(
-        self, dataset_uid: uuid.UUID, magnet_link: str,
+        self,
+        dataset_uid: uuid.UUID,
+        magnet_link: Optional[str],
+        source_url: Optional[str] = None,
+        transport: models.Transport = models.Transport.AUTO,
+        compress: bool = False,
+        pin: bool = False,
     ) -> models.Dataset:
-        dataset = self.torrent_service.download_dataset(
-            dataset_uid, magnet_link,
+        with self.torrent_service.datasets_lock:
+            if pin:
+                self.dataset_cache.pin(dataset_uid)
+            dataset = self.dataset_repository.get_entity(dataset_uid)
+            hit = (
+                dataset is not None and
+                dataset.status != models.DatasetStatus.ERROR
+            )
+            self.dataset_cache.record_request(dataset_uid, hit)
+            if hit:
+                return dataset
+            dataset = models.Dataset(
+                dataset_uid=dataset_uid,
+                magnet_link=magnet_link,
+                path=self.torrent_service.dataset_storage / str(dataset_uid),
+                status=models.DatasetStatus.DOWNLOADING,
+                origin=models.DatasetOrigin.DOWNLOADED,
+            )
+            self.dataset_repository.upsert_entity(dataset)
+        source = (
+            http_transfer.HttpChunkSource(source_url, compress=compress)
+            if source_url else None
         )
+        thread = threading.Thread(
+            target=tracing.bind_context(self._download_dataset),
+            args=(dataset, source, transport),
+        )
+        thread.start()
         return dataset
 
+    def _download_dataset(
+        self,
+        dataset: models.Dataset,
+        source: Optional[http_transfer.HttpChunkSource],
+        transport: models.Transport,
+    ):
+        try:
+            self._transfer_dataset(dataset, source, transport)
+        except Exception:
+            dataset.status = models.DatasetStatus.ERROR
+            self.dataset_repository.update_entity(dataset)
+            raise
+        else:
+            dataset.status = models.DatasetStatus.AVAILABLE
+            self.dataset_repository.update_entity(dataset)
+        finally:
+            self.dataset_cache.add(dataset)
+            self.dataset_cache.evict()
+
+    def unpin_dataset(self, dataset_uid: uuid.UUID):
+        self.dataset_cache.unpin(dataset_uid)
+        self.dataset_cache.evict()
+
+    def _transfer_dataset(
+        self,
+        dataset: models.Dataset,
+        source: Optional[http_transfer.HttpChunkSource],
+        transport: models.Transport,
+    ):
+        manifest = None
+        if transport == models.Transport.AUTO and source is not None:
+            try:
+                manifest = source.get_manifest(dataset.dataset_uid)
+            except (OSError, ValueError) as error:
+                print(
+                    f'manifest of dataset {dataset.dataset_uid} '
+                    f'is not available: {error!r}'
+                )
+            if self._has_local_base(manifest):
+                print(
+                    f'dataset {dataset.dataset_uid} is a new version of '
+                    f'{manifest.base_dataset_uid}, downloading delta over http'
+                )
+                self.http_transfer_service.download(dataset, source, manifest)
+                return
+        if (
+            transport != models.Transport.HTTP and
+            dataset.magnet_link is not None
+        ):
+            try:
+                self.torrent_service.download(dataset)
+                return
+            except Exception as error:
+                if transport == models.Transport.TORRENT or source is None:
+                    raise
+                print(
+                    f'torrent download of dataset {dataset.dataset_uid} '
+                    f'failed, falling back to http: {error!r}'
+                )
+        if source is None:
+            raise ValueError(
+                f'dataset {dataset.dataset_uid} has no http source',
+            )
+        self.http_transfer_service.download(dataset, source, manifest)
+
+    def _has_local_base(self, manifest: Optional[models.Manifest]) -> bool:
+        if manifest is None or manifest.base_dataset_uid is None:
+            return False
+        base = self.dataset_repository.get_entity(manifest.base_dataset_uid)
+        return (
+            base is not None and
+            base.status == models.DatasetStatus.AVAILABLE
+        )
+
+    def get_manifest(
+        self, dataset_uid: uuid.UUID,
+    ) -> Optional[models.Manifest]:
+        return self.http_transfer_service.get_manifest(dataset_uid)
+
+    def read_chunk(
+        self, dataset_uid: uuid.UUID, path: str, offset: int, length: int,
+    ) -> bytes:
+        return self.http_transfer_service.read_chunk(
+            dataset_uid, path, offset, length,
+        )
+
     def get_dataset(
         self, dataset_uid: uuid.UUID,
     ) -> models.Dataset:
@@ -0,0 +1,103 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+SYNC_POLLING_DELAY = 0.1
+SYNC_RETRY_MAX_DELAY = 5.0
+SYNC_MAX_FAILURES = 5
+
+
+class TorrentMonitor:
+    def __init__(self, get_client: Callable[[], Any]):
+        self.get_client = get_client
+        self.condition = threading.Condition()
+        self.torrents: dict[str, dict] = {}
+        self.progress: dict[str, float] = {}
+        self.rid = 0
+        self.waiters = 0
+        self.failures = 0
+        self.error: Optional[Exception] = None
+        self.last_error: Optional[Exception] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def get_progress(self, name: str) -> float:
+        with self.condition:
+            return self.progress.get(name, 0)
+
+    def wait(self, name: str, timeout: float):
+        with self.condition:
+            self.waiters += 1
+            self._ensure_running()
+            try:
+                self.condition.wait_for(
+                    lambda: (
+                        self.progress.get(name, 0) >= 1 or
+                        self.error is not None
+                    ),
+                    timeout=timeout,
+                )
+            finally:
+                self.waiters -= 1
+            if self.progress.get(name, 0) >= 1:
+                return
+            if self.last_error is not None:
+                raise self.last_error
+        raise TimeoutError(f'torrent {name} has not completed in {timeout}s')
+
+    def _ensure_running(self):
+        if self.thread is not None:
+            return
+        self.failures = 0
+        self.error = None
+        self.last_error = None
+        self.thread = threading.Thread(
+            target=self._run, name='torrent-monitor', daemon=True,
+        )
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if not self.waiters:
+                    self.thread = None
+                    return
+            delay = SYNC_POLLING_DELAY
+            try:
+                data = self.get_client().sync_main_data(rid=self.rid)
+            except Exception as error:
+                with self.condition:
+                    self.failures += 1
+                    self.last_error = error
+                    delay = min(
+                        SYNC_POLLING_DELAY * 2 ** self.failures,
+                        SYNC_RETRY_MAX_DELAY,
+                    )
+                    print(
+                        f'torrents sync has failed {self.failures} times, '
+                        f'retrying in {delay}s: {error!r}'
+                    )
+                    if self.failures >= SYNC_MAX_FAILURES:
+                        self.error = error
+                        self.condition.notify_all()
+            else:
+                with self.condition:
+                    self.failures = 0
+                    self.error = None
+                    self.last_error = None
+                    self._apply(data)
+                    self.condition.notify_all()
+            time.sleep(delay)
+
+    def _apply(self, data: dict):
+        if data.get('full_update'):
+            self.torrents = {}
+            self.progress = {}
+        self.rid = data.get('rid', self.rid)
+        for info_hash, changes in data.get('torrents', {}).items():
+            torrent = self.torrents.setdefault(info_hash, {})
+            torrent.update(changes)
+            if 'name' in torrent:
+                self.progress[torrent['name']] = torrent.get('progress', 0)
+        for info_hash in data.get('torrents_removed', []):
+            torrent = self.torrents.pop(info_hash, {})
+            self.progress.pop(torrent.get('name'), None)
@@ -1,149 +1,300 @@
+import asyncio
+import collections
+import concurrent.futures
+import hashlib
 import pathlib
-import shutil
+import re
 import threading
 import time
-from typing import Optional
+from typing import Callable, Optional
 import uuid
 
 import torrentool.api
 import qbittorrent
 
+import src.common.backend.files as files
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
+import src.data_controller.backend.compression as compression
 import src.data_controller.backend.repositories as repositories
+import src.data_controller.backend.torrent_monitor as torrent_monitor
 import src.data_controller.models.core as models
 
 DEFAULT_TORRENT_WEB_UI_PORT = 8090
 PUBLISHING_POLLING_TIMEOUT = 10
 DOWNLOADING_POLLING_TIMEOUT = 120
+HASH_ALGORITHM = 'sha256'
+FILE_DIGESTS_CACHE_SIZE = 4096
+HASHING_WORKERS = 2
+MAGNET_INFO_HASH_REGEX = re.compile(r'urn:btih:([0-9A-Fa-f]+)')
 
 
 class TorrentService:
     def __init__(self, dataset_repository: repositories.DatasetRepository):
         self.dataset_repository = dataset_repository
-        self.client = qbittorrent.Client(
-            f'http://127.0.0.1:{DEFAULT_TORRENT_WEB_UI_PORT}'
+        self._client: Optional[qbittorrent.Client] = None
+        self.monitor = torrent_monitor.TorrentMonitor(lambda: self.client)
+        self.datasets_lock = threading.Lock()
+        self.file_digests: collections.OrderedDict[tuple, bytes] = (
+            collections.OrderedDict()
+        )
+        self.file_digests_lock = threading.Lock()
+        self.hashing_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=HASHING_WORKERS, thread_name_prefix='hashing',
         )
 
-    def publish_dataset(self, dataset_path: pathlib.Path) -> models.Dataset:
-        dataset_uid = uuid.uuid4()
+    def publish_dataset(
+        self,
+        dataset_path: pathlib.Path,
+        base_uid: Optional[uuid.UUID] = None,
+        compression_type: models.Compression = models.Compression.NONE,
+        dataset_uid: Optional[uuid.UUID] = None,
+    ) -> models.Dataset:
+        if dataset_uid is None:
+            dataset_uid = self.get_dataset_uid(dataset_path, compression_type)
+        source_path = dataset_path.resolve()
+        with self.datasets_lock:
+            dataset = self.dataset_repository.get_entity(dataset_uid)
+            if dataset is not None:
+                print(f'dataset {dataset_uid} is already published')
+                if dataset.origin != models.DatasetOrigin.PUBLISHED:
+                    dataset.origin = models.DatasetOrigin.PUBLISHED
+                    self.dataset_repository.update_entity(dataset)
+                return dataset
+            if base_uid is None:
+                base = self.dataset_repository.get_latest_entity(source_path)
+                base_uid = base.dataset_uid if base is not None else None
+            dataset_storage_path = self.dataset_storage / str(dataset_uid)
+            dataset = models.Dataset(
+                dataset_uid=dataset_uid,
+                magnet_link=None,
+                path=dataset_storage_path,
+                status=models.DatasetStatus.CREATING,
+                base_uid=base_uid,
+                source_path=source_path,
+                compression=compression_type,
+                origin=models.DatasetOrigin.PUBLISHED,
+            )
+            self.dataset_repository.create_entity(dataset)
+        if base_uid is not None:
+            print(f'dataset {dataset_uid} is a new version of {base_uid}')
         print(f'copying dataset {dataset_uid} files to storage')
-        dataset_storage_path = self.dataset_storage / str(dataset_uid)
-        dataset = models.Dataset(
-            dataset_uid=dataset_uid,
-            magnet_link=None,
-            path=dataset_storage_path,
-            status=models.DatasetStatus.CREATING,
-        )
-        self.dataset_repository.create_entity(dataset)
         thread = threading.Thread(
-            target=self._publish_dataset,
+            target=tracing.bind_context(self._publish_dataset),
             args=(dataset_uid, dataset_path, dataset_storage_path),
         )
         thread.start()
         return dataset
 
-    def download_dataset(
-        self, dataset_uid: uuid.UUID, magnet_link: str,
-    ) -> models.Dataset:
-        dataset = self.dataset_repository.get_entity(dataset_uid)
-        if dataset is not None:
-            return dataset
-        dataset_storage_path = self.dataset_storage / str(dataset_uid)
-        dataset = models.Dataset(
-            dataset_uid=dataset_uid,
-            magnet_link=magnet_link,
-            path=dataset_storage_path,
-            status=models.DatasetStatus.DOWNLOADING,
+    @property
+    def client(self) -> qbittorrent.Client:
+        if self._client is None:
+            self._client = qbittorrent.Client(
+                f'http://127.0.0.1:{DEFAULT_TORRENT_WEB_UI_PORT}'
+            )
+        return self._client
+
+    @client.setter
+    def client(self, client: qbittorrent.Client):
+        self._client = client
+
+    async def hash_dataset_uid(
+        self,
+        dataset_path: pathlib.Path,
+        compression_type: models.Compression = models.Compression.NONE,
+    ) -> uuid.UUID:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.hashing_executor,
+            tracing.bind_context(self.get_dataset_uid),
+            dataset_path,
+            compression_type,
         )
-        self.dataset_repository.create_entity(dataset)
-        thread = threading.Thread(
-            target=self._download_dataset, args=(dataset,),
+
+    def get_dataset_uid(
+        self,
+        dataset_path: pathlib.Path,
+        compression_type: models.Compression = models.Compression.NONE,
+    ) -> uuid.UUID:
+        content_hash = self.hash_dataset(dataset_path, self._get_file_digest)
+        if compression_type != models.Compression.NONE:
+            content_hash = hashlib.new(
+                HASH_ALGORITHM,
+                f'{content_hash}:{compression_type.value}'.encode(),
+            ).hexdigest()
+        return uuid.UUID(bytes=bytes.fromhex(content_hash)[:16], version=4)
+
+    @classmethod
+    def hash_dataset(
+        cls,
+        dataset_path: pathlib.Path,
+        get_file_digest: Optional[Callable[[pathlib.Path], bytes]] = None,
+    ) -> str:
+        get_file_digest = get_file_digest or cls.hash_file
+        root = dataset_path.parent if dataset_path.is_file() else dataset_path
+        digest = hashlib.new(HASH_ALGORITHM)
+        for file in cls._get_dataset_files(dataset_path):
+            digest.update(file.relative_to(root).as_posix().encode())
+            digest.update(get_file_digest(file))
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_file(file: pathlib.Path) -> bytes:
+        with file.open('rb') as content:
+            return hashlib.file_digest(content, HASH_ALGORITHM).digest()
+
+    def _get_file_digest(self, file: pathlib.Path) -> bytes:
+        stat = file.stat()
+        key = (str(file.resolve()), stat.st_mtime_ns, stat.st_size)
+        with self.file_digests_lock:
+            digest = self.file_digests.get(key)
+            if digest is not None:
+                self.file_digests.move_to_end(key)
+                return digest
+        digest = self.hash_file(file)
+        with self.file_digests_lock:
+            self.file_digests[key] = digest
+            while len(self.file_digests) > FILE_DIGESTS_CACHE_SIZE:
+                self.file_digests.popitem(last=False)
+        return digest
+
+    @staticmethod
+    def _get_dataset_files(dataset_path: pathlib.Path) -> list[pathlib.Path]:
+        if dataset_path.is_file():
+            return [dataset_path]
+        return sorted(
+            file for file in dataset_path.rglob('*') if file.is_file()
         )
-        thread.start()
-        return dataset
 
     def _publish_dataset(
         self,
         dataset_uid: uuid.UUID,
         dataset_path: pathlib.Path,
         dataset_storage_path: pathlib.Path
+    ):
+        try:
+            self._seed_dataset(dataset_uid, dataset_path, dataset_storage_path)
+        except Exception:
+            self.dataset_repository.delete_entity(dataset_uid)
+            raise
+
+    def _seed_dataset(
+        self,
+        dataset_uid: uuid.UUID,
+        dataset_path: pathlib.Path,
+        dataset_storage_path: pathlib.Path
     ):
         dataset = self.dataset_repository.get_entity(dataset_uid)
-        self._copy_to_storage(dataset_path, dataset_storage_path)
+        with tracing.start_span('dataset_copy', dataset_uid=str(dataset_uid)):
+            self._copy_to_storage(
+                dataset_path, dataset_storage_path, dataset.compression,
+            )
         print(f'dataset {dataset_uid} files has been copied to storage')
+        dataset.status = models.DatasetStatus.PUBLISHING
+        self.dataset_repository.update_entity(dataset)
+        try:
+            dataset.magnet_link = self._seed_torrent(
+                dataset_uid, dataset_storage_path,
+            )
+        except Exception as error:
+            print(
+                f'dataset {dataset_uid} could not be seeded via torrent, '
+                f'it is served over http only: {error!r}'
+            )
+        dataset.status = models.DatasetStatus.AVAILABLE
+        self.dataset_repository.update_entity(dataset)
+
+    def _seed_torrent(
+        self, dataset_uid: uuid.UUID, dataset_storage_path: pathlib.Path,
+    ) -> str:
         torrent_file_path = (
             self.torrent_files_storage / f'{dataset_uid}.torrent'
         )
         print(f'making torrent file {torrent_file_path.name}')
-        torrent_file = self.make_torrent_file(
-            torrent_file_path, dataset_storage_path,
-        )
+        with tracing.start_span('torrent_creation'):
+            torrent_file = self.make_torrent_file(
+                torrent_file_path, dataset_storage_path,
+            )
         print(f'torrent file {torrent_file.name} has been made')
-        dataset.status = models.DatasetStatus.PUBLISHING
-        self.dataset_repository.update_entity(dataset)
         print(f'publishing dataset {dataset_uid} via local qbittorent client')
-        self.client.download_from_file(
-            torrent_file_path.read_bytes(),
-            save_path=dataset_storage_path.parent,
-        )
-        print(
-            f'dataset {dataset_uid} has been published '
-            'via local qbittorent client',
-        )
-        self._wait_dataset(dataset_uid)
-        dataset.magnet_link = torrent_file.magnet_link
-        dataset.status = models.DatasetStatus.AVAILABLE
-        self.dataset_repository.update_entity(dataset)
+        with tracing.start_span('torrent_seeding'):
+            self.client.download_from_file(
+                torrent_file_path.read_bytes(),
+                save_path=dataset_storage_path.parent,
+            )
+            print(
+                f'dataset {dataset_uid} has been published '
+                'via local qbittorent client',
+            )
+            self._wait_dataset(dataset_uid)
+        return torrent_file.magnet_link
 
-    def _download_dataset(self, dataset: models.Dataset):
-        self.client.download_from_link(
-            dataset.magnet_link, savepath=dataset.path,
+    def download(self, dataset: models.Dataset):
+        transfers = metrics.QUEUE_DEPTH.labels(
+            'data_controller', 'dataset_downloads',
         )
-        self._wait_dataset(
-            dataset.dataset_uid, timeout=DOWNLOADING_POLLING_TIMEOUT,
+        transfers.inc()
+        start = time.perf_counter()
+        try:
+            with tracing.start_span(
+                'torrent_download', dataset_uid=str(dataset.dataset_uid),
+            ):
+                self.client.download_from_link(
+                    dataset.magnet_link, savepath=dataset.path,
+                )
+                self._wait_dataset(
+                    dataset.dataset_uid, timeout=DOWNLOADING_POLLING_TIMEOUT,
+                )
+        finally:
+            transfers.dec()
+        metrics.observe_dataset_transfer(
+            transport='torrent',
+            size=self.get_dataset_size(dataset.path),
+            duration=time.perf_counter() - start,
         )
-        dataset.status = models.DatasetStatus.AVAILABLE
-        self.dataset_repository.update_entity(dataset)
 
     def _wait_dataset(
         self,
         dataset_uid: uuid.UUID,
         timeout: float = PUBLISHING_POLLING_TIMEOUT,
     ):
-        start = time.time()
-        progress = self._get_dataset_progress(dataset_uid)
-        while progress < 1:
-            time.sleep(0.1)
-            progress = self._get_dataset_progress(dataset_uid)
-            if time.time() - start > timeout:
-                raise TimeoutError(f'Could not publish dataset {dataset_uid}')
-
-    def _get_dataset(self, dataset_uid: uuid.UUID) -> Optional[dict]:
-        for torrent in self.client.torrents():
-            if torrent['name'] == str(dataset_uid):
-                return torrent
-        return None
-
-    def _get_dataset_progress(self, dataset_uid: uuid.UUID) -> int | float:
-        dataset = self._get_dataset(dataset_uid)
-        if dataset is None:
-            return 0
-        return dataset['progress']
+        self.monitor.wait(str(dataset_uid), timeout=timeout)
+
+    def remove_torrent(self, dataset: models.Dataset):
+        if dataset.magnet_link is None:
+            return
+        match = MAGNET_INFO_HASH_REGEX.search(dataset.magnet_link)
+        if match is None:
+            return
+        try:
+            self.client.delete(match.group(1).lower())
+        except Exception as error:
+            print(
+                f'torrent of dataset {dataset.dataset_uid} '
+                f'could not be removed: {error!r}'
+            )
+
+    @staticmethod
+    def get_dataset_size(dataset_path: pathlib.Path) -> int:
+        return sum(
+            file.stat().st_size
+            for file in dataset_path.rglob('*')
+            if file.is_file()
+        )
 
     def _copy_to_storage(
-        self, dataset_path: pathlib.Path, dataset_storage_path: pathlib.Path,
+        self,
+        dataset_path: pathlib.Path,
+        dataset_storage_path: pathlib.Path,
+        compression_type: models.Compression = models.Compression.NONE,
     ) -> None:
-        if dataset_path.is_file():
-            dst_path = dataset_storage_path / dataset_path.name
-            dst_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy(dataset_path, dst_path)
-        for src_path in dataset_path.rglob('*'):
-            if not src_path.is_file():
-                continue
-            dst_path = (
-                dataset_storage_path / src_path.relative_to(dataset_path)
-            )
-            dst_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy(src_path, dst_path)
+        methods = compression.store_tree(
+            dataset_path, dataset_storage_path, compression_type,
+        )
+        print(
+            'dataset files has been staged: '
+            f'{files.describe_staging(methods)}'
+        )
 
     @staticmethod
     def make_torrent_file(
@@ -1,4 +1,5 @@
 import pathlib
+from typing import Optional
 import uuid
 
 import aiohttp
@@ -9,26 +10,57 @@ import src.data_controller.models.web as web
 
 
 class DataControllerClient(client_base.ClientBase):
-    async def publish_dataset(self, dataset_path: pathlib.Path) -> uuid.UUID:
+    async def publish_dataset(
+        self,
+        dataset_path: pathlib.Path,
+        base_uid: Optional[uuid.UUID] = None,
+        compression: models.Compression = models.Compression.NONE,
+    ) -> uuid.UUID:
         url = self.get_server_url('/data/publish')
         request_body = web.DataPublishRequest(
-            path=dataset_path,
+            path=dataset_path, base_uid=base_uid, compression=compression,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.DataPublishResponse.model_validate(json)
         return response_body.dataset_uid
 
     async def download_dataset(
-        self, dataset_uid: uuid.UUID, magnet_link: str,
+        self,
+        dataset_uid: uuid.UUID,
+        magnet_link: Optional[str],
+        source_url: Optional[str] = None,
+        transport: models.Transport = models.Transport.AUTO,
+        compress: bool = False,
+        pin: bool = False,
     ) -> None:
         url = self.get_server_url('/data/download')
         request_body = web.DataDownloadRequest(
-            dataset_uid=dataset_uid, magnet_link=magnet_link,
+            dataset_uid=dataset_uid,
+            magnet_link=magnet_link,
+            source_url=source_url,
+            transport=transport,
+            compress=compress,
+            pin=pin,
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
+                await response.json()
+
+    async def unpin_dataset(self, dataset_uid: uuid.UUID) -> None:
+        url = self.get_server_url('/data/unpin')
+        request_body = web.UnpinDataRequest(
+            dataset_uid=dataset_uid,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 await response.json()
 
     async def get_dataset(self, dataset_uid: uuid.UUID) -> models.Dataset:
@@ -37,7 +69,9 @@ class DataControllerClient(client_base.ClientBase):
             dataset_uid=dataset_uid,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.Dataset.model_validate(json)
         return response_body
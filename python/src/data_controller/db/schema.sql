@@ -7,11 +7,15 @@ CREATE TABLE dataset (
     dataset_uid VARCHAR(36) PRIMARY KEY, -- uuid
     magnet_link VARCHAR(256),
     destination VARCHAR(256), -- path to directory
-    dataset_status_id INT
+    dataset_status_id INT,
+    base_uid VARCHAR(36), -- uuid of the version this one appends to
+    source_path VARCHAR(256), -- folder the dataset was published from
+    compression VARCHAR(16) -- none, gzip or zstd
 );
 
 INSERT INTO dataset_status VALUES
     (1, 'creating'),
     (2, 'publishing'),
     (3, 'downloading'),
-    (4, 'available');
+    (4, 'available'),
+    (5, 'error');
@@ -10,6 +10,24 @@ class DatasetStatus(enum.Enum):
     PUBLISHING = 'publishing'
     DOWNLOADING = 'downloading'
     AVAILABLE = 'available'
+    ERROR = 'error'
+
+
+class Transport(enum.Enum):
+    AUTO = 'auto'
+    TORRENT = 'torrent'
+    HTTP = 'http'
+
+
+class DatasetOrigin(enum.Enum):
+    PUBLISHED = 'published'
+    DOWNLOADED = 'downloaded'
+
+
+class Compression(enum.Enum):
+    NONE = 'none'
+    GZIP = 'gzip'
+    ZSTD = 'zstd'
 
 
 @dataclasses.dataclass
@@ -18,3 +36,23 @@ class Dataset:
     magnet_link: Optional[str]
     path: pathlib.Path
     status: DatasetStatus
+    base_uid: Optional[uuid.UUID] = None
+    source_path: Optional[pathlib.Path] = None
+    compression: Compression = Compression.NONE
+    origin: DatasetOrigin = DatasetOrigin.PUBLISHED
+
+
+@dataclasses.dataclass
+class FileManifest:
+    path: str
+    size: int
+    checksum: str
+    chunks: list[str]
+
+
+@dataclasses.dataclass
+class Manifest:
+    dataset_uid: uuid.UUID
+    chunk_size: int
+    files: list[FileManifest]
+    base_dataset_uid: Optional[uuid.UUID] = None
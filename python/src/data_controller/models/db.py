@@ -21,6 +21,12 @@ class Dataset(Base):
     magnet_link: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(256))
     path: orm.Mapped[str] = orm.mapped_column(sql.String(256))
     status: orm.Mapped[str] = orm.mapped_column(sql.String(64))
+    base_uid: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(36))
+    source_path: orm.Mapped[Optional[str]] = orm.mapped_column(
+        sql.String(256), index=True,
+    )
+    compression: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(16))
+    origin: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(16))
 
     @staticmethod
     def from_core(obj: core.Dataset) -> 'Dataset':
@@ -29,6 +35,12 @@ class Dataset(Base):
             magnet_link=obj.magnet_link,
             path=str(obj.path),
             status=obj.status.value,
+            base_uid=str(obj.base_uid) if obj.base_uid is not None else None,
+            source_path=(
+                str(obj.source_path) if obj.source_path is not None else None
+            ),
+            compression=obj.compression.value,
+            origin=obj.origin.value,
         )
 
     def to_core(self) -> core.Dataset:
@@ -36,11 +48,20 @@ class Dataset(Base):
             dataset_uid=uuid.UUID(self.dataset_uid),
             magnet_link=self.magnet_link,
             path=pathlib.Path(self.path),
-            status=[
-                elem
-                for elem in core.DatasetStatus
-                if elem.value == self.status
-            ][0],
+            status=core.DatasetStatus(self.status),
+            base_uid=(
+                uuid.UUID(self.base_uid) if self.base_uid is not None else None
+            ),
+            source_path=(
+                pathlib.Path(self.source_path)
+                if self.source_path is not None else None
+            ),
+            compression=core.Compression(
+                self.compression or core.Compression.NONE.value,
+            ),
+            origin=core.DatasetOrigin(
+                self.origin or core.DatasetOrigin.PUBLISHED.value,
+            ),
         )
 
     def __repr__(self) -> str:
@@ -49,5 +70,9 @@ class Dataset(Base):
             f'dataset_uid={self.dataset_uid!r}, '
             f'magnet_link={self.magnet_link!r}, '
             f'destination={self.path!r}, '
-            f'status={self.path!r})'
+            f'status={self.status!r}, '
+            f'base_uid={self.base_uid!r}, '
+            f'source_path={self.source_path!r}, '
+            f'compression={self.compression!r}, '
+            f'origin={self.origin!r})'
         )
@@ -1,6 +1,8 @@
-import pydantic
+import pathlib
 from typing import Optional
 
+import pydantic
+
 import src.common.models.web as common_web
 import src.data_controller.models.core as core
 
@@ -10,8 +12,10 @@ MAGNET_LINK_REGEX = r'urn:btih:([0-9A-Fa-f\d]+)'
 class Dataset(pydantic.BaseModel):
     dataset_uid: pydantic.UUID4
     magnet_link: Optional[str] = pydantic.Field(pattern=MAGNET_LINK_REGEX)
-    path: pydantic.DirectoryPath
+    path: pathlib.Path
     status: core.DatasetStatus
+    base_uid: Optional[pydantic.UUID4] = None
+    compression: core.Compression = core.Compression.NONE
 
     @staticmethod
     def from_core(obj: core.Dataset) -> 'Dataset':
@@ -20,6 +24,8 @@ class Dataset(pydantic.BaseModel):
             magnet_link=obj.magnet_link,
             path=obj.path,
             status=obj.status,
+            base_uid=obj.base_uid,
+            compression=obj.compression,
         )
 
     def to_core(self) -> core.Dataset:
@@ -28,11 +34,15 @@ class Dataset(pydantic.BaseModel):
             magnet_link=self.magnet_link,
             path=self.path,
             status=self.status,
+            base_uid=self.base_uid,
+            compression=self.compression,
         )
 
 
 class DataPublishRequest(pydantic.BaseModel):
     path: pydantic.FilePath
+    base_uid: Optional[pydantic.UUID4] = None
+    compression: core.Compression = core.Compression.NONE
 
 
 class DataPublishResponse(common_web.BaseResponse):
@@ -41,7 +51,13 @@ class DataPublishResponse(common_web.BaseResponse):
 
 class DataDownloadRequest(pydantic.BaseModel):
     dataset_uid: pydantic.UUID4
-    magnet_link: str = pydantic.Field(pattern=MAGNET_LINK_REGEX)
+    magnet_link: Optional[str] = pydantic.Field(
+        default=None, pattern=MAGNET_LINK_REGEX,
+    )
+    source_url: Optional[str] = None
+    transport: core.Transport = core.Transport.AUTO
+    compress: bool = False
+    pin: bool = False
 
 
 class DataDownloadResponse(common_web.BaseResponse):
@@ -50,3 +66,63 @@ class DataDownloadResponse(common_web.BaseResponse):
 
 class GetDataRequest(pydantic.BaseModel):
     dataset_uid: pydantic.UUID4
+
+
+class UnpinDataRequest(pydantic.BaseModel):
+    dataset_uid: pydantic.UUID4
+
+
+class FileManifest(pydantic.BaseModel):
+    path: str
+    size: int
+    checksum: str
+    chunks: list[str]
+
+    @staticmethod
+    def from_core(obj: core.FileManifest) -> 'FileManifest':
+        return FileManifest(
+            path=obj.path,
+            size=obj.size,
+            checksum=obj.checksum,
+            chunks=obj.chunks,
+        )
+
+    def to_core(self) -> core.FileManifest:
+        return core.FileManifest(
+            path=self.path,
+            size=self.size,
+            checksum=self.checksum,
+            chunks=self.chunks,
+        )
+
+
+class Manifest(pydantic.BaseModel):
+    dataset_uid: pydantic.UUID4
+    chunk_size: int
+    files: list[FileManifest]
+    base_dataset_uid: Optional[pydantic.UUID4] = None
+
+    @staticmethod
+    def from_core(obj: core.Manifest) -> 'Manifest':
+        return Manifest(
+            dataset_uid=obj.dataset_uid,
+            chunk_size=obj.chunk_size,
+            files=[FileManifest.from_core(file) for file in obj.files],
+            base_dataset_uid=obj.base_dataset_uid,
+        )
+
+    def to_core(self) -> core.Manifest:
+        return core.Manifest(
+            dataset_uid=self.dataset_uid,
+            chunk_size=self.chunk_size,
+            files=[file.to_core() for file in self.files],
+            base_dataset_uid=self.base_dataset_uid,
+        )
+
+
+class GetManifestRequest(pydantic.BaseModel):
+    dataset_uid: pydantic.UUID4
+
+
+class GetManifestResponse(common_web.BaseResponse):
+    manifest: Optional[Manifest]
@@ -0,0 +1,28 @@
+import pathlib
+
+import pandas
+
+import src.common.backend.files as files
+import src.data_controller.backend.compression as compression
+import src.data_controller.models.core as core
+
+
+def test_store_tree_compresses_csv_files_only(tmp_path: pathlib.Path):
+    source = tmp_path / 'source'
+    (source / 'part').mkdir(parents=True)
+    content = 'text,label\n' + 'some repeated text,1\n' * 1000
+    (source / 'data.csv').write_text(content)
+    (source / 'part' / 'meta.json').write_text('{}')
+    storage = tmp_path / 'storage'
+    methods = compression.store_tree(
+        source, storage, core.Compression.GZIP,
+    )
+    assert methods[core.Compression.GZIP] == 1
+    assert sum(methods[method] for method in files.StagingMethod) == 1
+    compressed = storage / 'data.csv.gz'
+    assert not (storage / 'data.csv').exists()
+    assert compressed.stat().st_size * 10 < len(content)
+    assert (storage / 'part' / 'meta.json').read_text() == '{}'
+    assert pandas.read_csv(compressed).equals(
+        pandas.read_csv(source / 'data.csv'),
+    )
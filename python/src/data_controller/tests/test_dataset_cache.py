@@ -0,0 +1,101 @@
+import pathlib
+import uuid
+
+import src.common.backend.db as database
+import src.data_controller.backend.dataset_cache as cache
+import src.data_controller.backend.http_transfer as http_transfer
+import src.data_controller.backend.repositories as repositories
+import src.data_controller.backend.torrent_service as torrent
+import src.data_controller.models.core as core
+import src.data_controller.models.db as db_models
+
+DATASET_SIZE = 100
+
+
+def make_dataset(
+    repository: repositories.DatasetRepository,
+    folder: pathlib.Path,
+    origin: core.DatasetOrigin = core.DatasetOrigin.DOWNLOADED,
+) -> core.Dataset:
+    dataset_uid = uuid.uuid4()
+    dataset = core.Dataset(
+        dataset_uid=dataset_uid,
+        magnet_link=None,
+        path=folder / str(dataset_uid),
+        status=core.DatasetStatus.AVAILABLE,
+        origin=origin,
+    )
+    dataset.path.mkdir()
+    (dataset.path / 'data.csv').write_bytes(b'0' * DATASET_SIZE)
+    repository.create_entity(dataset)
+    return dataset
+
+
+def test_evict_removes_least_recently_used_unpinned(tmp_path: pathlib.Path):
+    repository = repositories.DatasetRepository(
+        database.DB(
+            db_name=str(tmp_path / 'data.sqlite'), base=db_models.Base,
+        )
+    )
+    dataset_cache = cache.DatasetCache(
+        repository,
+        torrent.TorrentService(repository),
+        http_transfer.HttpTransferService(repository),
+        budget=int(2.5 * DATASET_SIZE),
+    )
+    published = make_dataset(
+        repository, tmp_path, origin=core.DatasetOrigin.PUBLISHED,
+    )
+    pinned, oldest, newest = (
+        make_dataset(repository, tmp_path) for _ in range(3)
+    )
+    for dataset in (pinned, oldest, newest):
+        dataset_cache.record_request(dataset.dataset_uid, hit=False)
+    dataset_cache.pin(pinned.dataset_uid)
+    assert dataset_cache.evict() == DATASET_SIZE
+    assert repository.get_entity(oldest.dataset_uid) is None
+    assert not oldest.path.exists()
+    for dataset in (published, pinned, newest):
+        assert repository.get_entity(dataset.dataset_uid) is not None
+    dataset_cache.unpin(pinned.dataset_uid)
+    dataset_cache.touch(pinned.dataset_uid)
+    dataset_cache.budget = DATASET_SIZE
+    assert dataset_cache.evict() == DATASET_SIZE
+    assert repository.get_entity(newest.dataset_uid) is None
+    assert repository.get_entity(pinned.dataset_uid) is not None
+
+
+def test_evict_tracks_sizes_instead_of_rescanning(
+    tmp_path: pathlib.Path, monkeypatch,
+):
+    repository = repositories.DatasetRepository(
+        database.DB(
+            db_name=str(tmp_path / 'data.sqlite'), base=db_models.Base,
+        )
+    )
+    torrent_service = torrent.TorrentService(repository)
+    dataset_cache = cache.DatasetCache(
+        repository,
+        torrent_service,
+        http_transfer.HttpTransferService(repository),
+        budget=int(1.5 * DATASET_SIZE),
+    )
+    existing = make_dataset(repository, tmp_path)
+    assert dataset_cache.evict() == 0
+    scanned = []
+    get_dataset_size = torrent_service.get_dataset_size
+    monkeypatch.setattr(
+        torrent_service,
+        'get_dataset_size',
+        lambda path: scanned.append(path) or get_dataset_size(path),
+    )
+    assert dataset_cache.evict() == 0
+    assert scanned == []
+
+    added = make_dataset(repository, tmp_path)
+    dataset_cache.add(added)
+    dataset_cache.touch(added.dataset_uid)
+    assert dataset_cache.evict() == DATASET_SIZE
+    assert scanned == [added.path]
+    assert repository.get_entity(existing.dataset_uid) is None
+    assert dataset_cache.sizes == {added.dataset_uid: DATASET_SIZE}
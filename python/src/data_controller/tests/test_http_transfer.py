@@ -0,0 +1,147 @@
+import pathlib
+import uuid
+
+import pytest
+
+import src.common.backend.db as database
+import src.data_controller.backend.http_transfer as http_transfer
+import src.data_controller.backend.repositories as repositories
+import src.data_controller.models.core as core
+import src.data_controller.models.db as db_models
+
+CHUNK_SIZE = 16
+CONST_DATASET_UUID = uuid.UUID('ebe2ed89-0470-4e3f-b6a8-75614774f853')
+
+
+def make_service(
+    folder: pathlib.Path, status: core.DatasetStatus,
+) -> tuple[http_transfer.HttpTransferService, core.Dataset]:
+    folder.mkdir()
+    repository = repositories.DatasetRepository(
+        database.DB(
+            db_name=str(folder / 'data.sqlite'), base=db_models.Base,
+        )
+    )
+    dataset = core.Dataset(
+        dataset_uid=CONST_DATASET_UUID,
+        magnet_link=None,
+        path=folder / str(CONST_DATASET_UUID),
+        status=status,
+    )
+    repository.create_entity(dataset)
+    service = http_transfer.HttpTransferService(
+        repository, chunk_size=CHUNK_SIZE,
+    )
+    return service, dataset
+
+
+class FlakySource(http_transfer.LocalChunkSource):
+    def __init__(self, transfer_service: http_transfer.HttpTransferService):
+        super().__init__(transfer_service)
+        self.requests = 0
+
+    def read_chunk(
+        self, dataset_uid: uuid.UUID, path: str, offset: int, length: int,
+    ) -> bytes:
+        self.requests += 1
+        if self.requests == 1:
+            raise ConnectionResetError
+        if self.requests == 2:
+            return b'\0' * length
+        return super().read_chunk(dataset_uid, path, offset, length)
+
+
+@pytest.fixture
+def services(tmp_path: pathlib.Path):
+    publisher, published = make_service(
+        tmp_path / 'publisher', core.DatasetStatus.AVAILABLE,
+    )
+    (published.path / 'part').mkdir(parents=True)
+    (published.path / 'data.csv').write_bytes(bytes(range(100)))
+    (published.path / 'part' / 'empty.csv').write_bytes(b'')
+    downloader, downloaded = make_service(
+        tmp_path / 'downloader', core.DatasetStatus.DOWNLOADING,
+    )
+    return publisher, published, downloader, downloaded
+
+
+def test_download_verifies_and_retries_chunks(services):
+    publisher, published, downloader, downloaded = services
+    source = FlakySource(publisher)
+    transferred = downloader.download(downloaded, source)
+    assert transferred == 100
+    assert (downloaded.path / 'data.csv').read_bytes() == bytes(range(100))
+    assert (downloaded.path / 'part' / 'empty.csv').read_bytes() == b''
+    assert not list(downloaded.path.rglob('*.part'))
+
+
+def test_download_resumes_partial_files(services):
+    publisher, published, downloader, downloaded = services
+    partial = downloaded.path / 'data.csv.part'
+    partial.parent.mkdir(parents=True)
+    partial.write_bytes(bytes(range(3 * CHUNK_SIZE)))
+    source = http_transfer.LocalChunkSource(publisher)
+    assert downloader.download(downloaded, source) == 100 - 3 * CHUNK_SIZE
+    assert (downloaded.path / 'data.csv').read_bytes() == bytes(range(100))
+
+
+def test_read_chunk_stays_inside_dataset(services):
+    publisher, *_ = services
+    with pytest.raises(FileNotFoundError):
+        publisher.read_chunk(CONST_DATASET_UUID, '../data.sqlite', 0, 10)
+
+
+def test_download_rejects_paths_outside_dataset(services):
+    publisher, published, downloader, downloaded = services
+    content = b'replaced'
+    manifest = core.Manifest(
+        dataset_uid=CONST_DATASET_UUID,
+        chunk_size=CHUNK_SIZE,
+        files=[
+            core.FileManifest(
+                path='../data.sqlite',
+                size=len(content),
+                checksum=http_transfer.get_chunk_checksum(content),
+                chunks=[http_transfer.get_chunk_checksum(content)],
+            ),
+        ],
+    )
+    target = downloaded.path.parent / 'data.sqlite'
+    original = target.read_bytes()
+    with pytest.raises(ValueError):
+        downloader.download(
+            downloaded, http_transfer.LocalChunkSource(publisher), manifest,
+        )
+    assert target.read_bytes() == original
+    assert not target.with_name('data.sqlite.part').exists()
+
+
+def test_download_fetches_only_appended_chunks(services):
+    publisher, published, downloader, downloaded = services
+    source = http_transfer.LocalChunkSource(publisher)
+    downloader.download(downloaded, source)
+    downloaded.status = core.DatasetStatus.AVAILABLE
+    downloader.dataset_repository.update_entity(downloaded)
+    content = bytes(range(140))
+    version_uid = uuid.uuid4()
+    version = core.Dataset(
+        dataset_uid=version_uid,
+        magnet_link=None,
+        path=published.path.parent / str(version_uid),
+        status=core.DatasetStatus.AVAILABLE,
+        base_uid=CONST_DATASET_UUID,
+    )
+    version.path.mkdir()
+    (version.path / 'data.csv').write_bytes(content)
+    publisher.dataset_repository.create_entity(version)
+    local_version = core.Dataset(
+        dataset_uid=version_uid,
+        magnet_link=None,
+        path=downloaded.path.parent / str(version_uid),
+        status=core.DatasetStatus.DOWNLOADING,
+    )
+    downloader.dataset_repository.create_entity(local_version)
+    transferred = downloader.download(local_version, source)
+    assert transferred == len(content) - 6 * CHUNK_SIZE
+    assert local_version.base_uid == CONST_DATASET_UUID
+    assert (local_version.path / 'data.csv').read_bytes() == content
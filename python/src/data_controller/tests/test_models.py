@@ -60,6 +60,7 @@ def test_dataset_model_core_db_web_conversion(
     assert mapped_db_model.status == db_model.status
     mapped_core_model = mapped_db_model.to_core()
     assert mapped_core_model == core_model
+    assert db_model.to_core() == core_model
     mapped_web_model = web.Dataset.from_core(core_model)
     assert mapped_web_model == web_model
     mapped_core_model = mapped_web_model.to_core()
@@ -0,0 +1,46 @@
+import pathlib
+import uuid
+
+import src.common.backend.db as database
+import src.data_controller.backend.http_transfer as http_transfer
+import src.data_controller.backend.repositories as repositories
+import src.data_controller.backend.services as services
+import src.data_controller.models.core as core
+import src.data_controller.models.db as db_models
+
+UNREACHABLE_URL = 'http://127.0.0.1:1'
+
+
+class FakeTorrentService:
+    def __init__(self):
+        self.downloaded: list[uuid.UUID] = []
+
+    def download(self, dataset: core.Dataset):
+        self.downloaded.append(dataset.dataset_uid)
+
+
+def test_auto_transport_uses_torrent_when_source_is_unreachable(
+    tmp_path: pathlib.Path,
+):
+    repository = repositories.DatasetRepository(
+        database.DB(db_name=str(tmp_path / 'data.sqlite'), base=db_models.Base)
+    )
+    torrent_service = FakeTorrentService()
+    service = services.DatasetService(
+        repository,
+        torrent_service,
+        http_transfer.HttpTransferService(repository),
+        dataset_cache=None,
+    )
+    dataset = core.Dataset(
+        dataset_uid=uuid.uuid4(),
+        magnet_link='magnet:?xt=urn:btih:' + '0' * 40,
+        path=tmp_path / 'dataset',
+        status=core.DatasetStatus.DOWNLOADING,
+    )
+    service._transfer_dataset(
+        dataset,
+        http_transfer.HttpChunkSource(UNREACHABLE_URL),
+        core.Transport.AUTO,
+    )
+    assert torrent_service.downloaded == [dataset.dataset_uid]
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+import src.data_controller.backend.torrent_monitor as torrent_monitor
+
+
+class ScriptedClient:
+    def __init__(self, responses: list[dict]):
+        self.responses = responses
+        self.rids: list[int] = []
+        self.lock = threading.Lock()
+
+    def sync_main_data(self, rid: int = 0) -> dict:
+        with self.lock:
+            self.rids.append(rid)
+            if len(self.rids) <= len(self.responses):
+                return self.responses[len(self.rids) - 1]
+            return {'rid': rid}
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(torrent_monitor, 'SYNC_POLLING_DELAY', 0.001)
+
+
+def test_monitor_applies_incremental_updates():
+    client = ScriptedClient([
+        {
+            'rid': 1,
+            'full_update': True,
+            'torrents': {
+                'a1': {'name': 'first', 'progress': 0.5},
+                'b2': {'name': 'second', 'progress': 1},
+            },
+        },
+        {'rid': 2, 'torrents': {'a1': {'progress': 1}}},
+        {'rid': 3, 'torrents_removed': ['b2']},
+    ])
+    monitor = torrent_monitor.TorrentMonitor(lambda: client)
+    monitor.wait('first', timeout=1)
+    assert client.rids[:2] == [0, 1]
+    with pytest.raises(TimeoutError):
+        monitor.wait('missing', timeout=0.05)
+    assert monitor.get_progress('first') == 1
+    assert monitor.get_progress('second') == 0
+
+
+def test_monitor_retries_transient_client_errors():
+    client = ScriptedClient([
+        {'rid': 1, 'torrents': {'a1': {'name': 'first', 'progress': 1}}},
+    ])
+
+    class FlakyClient:
+        failures = 2
+
+        def sync_main_data(self, rid: int = 0) -> dict:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError
+            return client.sync_main_data(rid=rid)
+
+    flaky_client = FlakyClient()
+    monitor = torrent_monitor.TorrentMonitor(lambda: flaky_client)
+    monitor.wait('first', timeout=1)
+    assert monitor.get_progress('first') == 1
+
+
+def test_monitor_raises_persistent_client_errors():
+    class BrokenClient:
+        def sync_main_data(self, rid: int = 0) -> dict:
+            raise ConnectionError
+
+    monitor = torrent_monitor.TorrentMonitor(BrokenClient)
+    with pytest.raises(ConnectionError):
+        monitor.wait('first', timeout=1)
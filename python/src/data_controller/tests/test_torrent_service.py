@@ -0,0 +1,38 @@
+import asyncio
+import pathlib
+
+import src.data_controller.backend.torrent_service as torrent
+
+
+def write_dataset(folder: pathlib.Path, content: str) -> pathlib.Path:
+    (folder / 'part').mkdir(parents=True)
+    (folder / 'data.csv').write_text(content)
+    (folder / 'part' / 'extra.csv').write_text('a,b\n1,2\n')
+    return folder
+
+
+def test_dataset_hash_depends_only_on_content(tmp_path: pathlib.Path):
+    first = write_dataset(tmp_path / 'first', 'x,y\n1,0\n')
+    second = write_dataset(tmp_path / 'second', 'x,y\n1,0\n')
+    changed = write_dataset(tmp_path / 'changed', 'x,y\n1,1\n')
+    hash_dataset = torrent.TorrentService.hash_dataset
+    assert hash_dataset(first) == hash_dataset(second)
+    assert hash_dataset(first) != hash_dataset(changed)
+    assert (
+        hash_dataset(first / 'data.csv') ==
+        hash_dataset(second / 'data.csv')
+    )
+
+
+def test_file_digests_are_cached_in_bounded_lru(
+    tmp_path: pathlib.Path, monkeypatch,
+):
+    monkeypatch.setattr(torrent, 'FILE_DIGESTS_CACHE_SIZE', 2)
+    service = torrent.TorrentService(dataset_repository=None)
+    dataset = write_dataset(tmp_path / 'dataset', 'x,y\n1,0\n')
+    uid = service.get_dataset_uid(dataset)
+    assert len(service.file_digests) == 2
+    (dataset / 'data.csv').write_text('x,y\n1,10\n')
+    assert service.get_dataset_uid(dataset) != uid
+    assert len(service.file_digests) == 2
+    assert asyncio.run(service.hash_dataset_uid(dataset)) != uid
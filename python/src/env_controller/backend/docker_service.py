@@ -1,119 +1,279 @@
 import pathlib
+import tempfile
 import threading
+import time
+from typing import Optional
+import uuid
 
-import checksumdir
 import docker
 
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
+import src.env_controller.backend.execution_service as execution
+import src.env_controller.backend.image_store as image_store
 import src.env_controller.backend.repositories as repositories
 import src.env_controller.models.core as models
 
 
 DOCKER_USER = 'distcalcanonymous'
 DOCKER_PASSWORD = 'dckr_pat_DVvkJ0bp-mg5j8v6uf_YpARZI74'
+EXITED_CONTAINER_STATUSES = ('exited', 'dead')
+CONTAINER_EVENTS_RETRY_DELAY = 1.0
 
 
-class DockerService:
+class DockerService(execution.ExecutionService):
     def __init__(
         self,
         image_repository: repositories.ImageRepository,
         subtask_repository: repositories.SubtaskRepository,
     ):
-        self.image_repository = image_repository
-        self.subtask_repository = subtask_repository
-        self.client = docker.from_env()
-        self.client.login(username=DOCKER_USER, password=DOCKER_PASSWORD)
+        super().__init__(image_repository, subtask_repository)
+        self.client = self._create_client()
+        self.monitor: Optional[threading.Thread] = None
+
+    def _create_client(self):
+        client = docker.from_env()
+        client.login(username=DOCKER_USER, password=DOCKER_PASSWORD)
+        return client
 
     def build_and_push_image(
-        self, subtask_folder: pathlib.Path, tag: str,
+        self,
+        subtask_folder: pathlib.Path,
+        tag: str,
+        registry: models.Registry = models.Registry.DOCKER_HUB,
     ) -> models.Image:
 
         image = models.Image(
             image_tag=tag,
             image_id=None,
             status=models.ImageStatus.BUILDING,
+            registry=registry,
         )
         self.image_repository.upsert_entity(image)
         thread = threading.Thread(
-            target=self._build_and_push_image, args=(subtask_folder, tag),
+            target=tracing.bind_context(self._build_and_push_image),
+            args=(subtask_folder, tag, registry),
         )
         thread.start()
         return image
 
-    def _build_and_push_image(self, path: pathlib.Path, tag: str):
-        print(f'building image {tag}...')
+    def _build_and_push_image(
+        self, path: pathlib.Path, tag: str, registry: models.Registry,
+    ):
         image = self.image_repository.get_entity(image_tag=tag)
+        try:
+            docker_image = self._get_local_image(tag)
+            if docker_image is None:
+                docker_image = self._build_image(path, tag)
+            else:
+                print(f'image {tag} is found locally, skipping build')
+            image.image_id = docker_image.id
+            image.status = models.ImageStatus.PUSHING
+            self.image_repository.update_entity(image)
+            self._publish_image(docker_image, tag, registry)
+        except Exception:
+            image.status = (
+                models.ImageStatus.BUILDING_ERROR
+                if image.status == models.ImageStatus.BUILDING
+                else models.ImageStatus.PUSHING_ERROR
+            )
+            self.image_repository.update_entity(image)
+            raise
 
-        docker_image, logs = self.client.images.build(path=str(path), tag=tag)
-
-        image.image_id = docker_image.id
+        image.status = models.ImageStatus.PUSHED
         self.image_repository.update_entity(image)
+        print(f'image {tag} has been published to {registry.value}')
+
+    def _get_local_image(self, tag: str):
+        try:
+            return self.client.images.get(tag)
+        except docker.errors.ImageNotFound:
+            return None
+
+    def _build_image(self, path: pathlib.Path, tag: str):
+        print(f'building image {tag}...')
+        with (
+            metrics.IMAGE_OPERATION_DURATION.labels('build').time(),
+            tracing.start_span('image_build', image_tag=tag),
+        ):
+            docker_image, logs = self.client.images.build(
+                path=str(path), tag=tag,
+            )
         print(f'image {tag} has been built')
+        return docker_image
 
+    def _publish_image(
+        self, docker_image, tag: str, registry: models.Registry,
+    ):
+        if registry == models.Registry.PEER:
+            if self.image_store.get_manifest(tag) is not None:
+                print(f'image {tag} is already in local image store')
+                return
+            print(f'saving image {tag} to local image store')
+            with (
+                metrics.IMAGE_OPERATION_DURATION.labels('save').time(),
+                tracing.start_span('image_save', image_tag=tag),
+            ):
+                self.image_store.save(tag, docker_image.save(named=True))
+            return
+        if self._is_pushed(tag):
+            print(f'image {tag} is already in dockerhub')
+            return
         print(f'pushing image {tag} to dockerhub')
-        image.status = models.ImageStatus.PUSHING
-        self.image_repository.update_entity(image)
+        with (
+            metrics.IMAGE_OPERATION_DURATION.labels('push').time(),
+            tracing.start_span('image_push', image_tag=tag),
+        ):
+            self.client.images.push(repository=tag)
 
-        self.client.images.push(repository=tag)
+    def _is_pushed(self, tag: str) -> bool:
+        try:
+            self.client.images.get_registry_data(tag)
+        except docker.errors.APIError:
+            return False
+        return True
 
-        image.status = models.ImageStatus.PUSHED
-        self.image_repository.update_entity(image)
-        print(f'image {tag} has been pushed to dockerhub')
-
-    def pull_image(self, tag: str) -> models.Image:
+    def pull_image(
+        self, tag: str, source_url: Optional[str] = None,
+    ) -> models.Image:
         image = models.Image(
             image_tag=tag,
             image_id=None,
             status=models.ImageStatus.PULLING,
         )
         self.image_repository.upsert_entity(image)
-        thread = threading.Thread(target=self._pull_image, args=(tag,))
+        thread = threading.Thread(
+            target=tracing.bind_context(self._pull_image),
+            args=(tag, source_url),
+        )
         thread.start()
         return image
 
-    def _pull_image(self, tag: str):
-        print(f'pulling image {tag} from dockerhub')
+    def _pull_image(self, tag: str, source_url: Optional[str]):
         image = self.image_repository.get_entity(image_tag=tag)
-
-        docker_image = self.client.images.pull(repository=tag)
+        try:
+            with (
+                metrics.IMAGE_OPERATION_DURATION.labels('pull').time(),
+                tracing.start_span('image_pull', image_tag=tag),
+            ):
+                if source_url is not None:
+                    print(f'pulling image {tag} from peer {source_url}')
+                    docker_image = self._load_image(
+                        tag, image_store.HttpImageSource(source_url),
+                    )
+                else:
+                    print(f'pulling image {tag} from dockerhub')
+                    docker_image = self.client.images.pull(repository=tag)
+        except Exception:
+            image.status = models.ImageStatus.PULLING_ERROR
+            self.image_repository.update_entity(image)
+            raise
 
         image.image_id = docker_image.id
         image.status = models.ImageStatus.PULLED
         self.image_repository.update_entity(image)
-        print(f'image {tag} has been pulled from dockerhub')
+        print(f'image {tag} has been pulled')
 
-    def run_container(
+    def _load_image(
         self,
-        subtask: models.Subtask,
-        input_path: pathlib.Path,
-        output_path: pathlib.Path,
-    ) -> models.Subtask:
-        subtask.status = models.SubtaskStatus.RUNNING
-        self.subtask_repository.update_entity(subtask)
-        thread = threading.Thread(
-            target=self._run_container,
-            args=(subtask, input_path, output_path),
-        )
-        thread.start()
-        return subtask
+        tag: str,
+        source: image_store.LocalImageSource | image_store.HttpImageSource,
+    ):
+        manifest = self.image_store.fetch(tag, source)
+        with tempfile.TemporaryFile() as archive:
+            self.image_store.write_archive(manifest, archive)
+            archive.seek(0)
+            with (
+                metrics.IMAGE_OPERATION_DURATION.labels('load').time(),
+                tracing.start_span('image_load', image_tag=tag),
+            ):
+                return self.client.images.load(archive)[0]
 
-    def _run_container(
+    def _start_container(
         self,
-        subtask: models.Subtask,
+        image: models.Image,
         input_path: pathlib.Path,
         output_path: pathlib.Path,
+        environment: dict[str, str],
+        cpuset: list[int],
+        memory: Optional[int],
     ):
-        tag = subtask.image.image_tag
-        params = f'tag: {tag}, input {input_path}, output: {output_path}'
-        print(f'running container {params}')
-        self.client.containers.run(
-            image=tag,
+        limits = {}
+        if cpuset:
+            limits['cpuset_cpus'] = ','.join(map(str, cpuset))
+        if memory:
+            limits['mem_limit'] = memory
+        return self.client.containers.run(
+            image=image.image_tag,
             volumes={
-                str(input_path): {'bind': '/usr/src/app/input', 'mode': 'ro'},
+                str(input_path): {
+                    'bind': '/usr/src/app/input', 'mode': 'ro',
+                },
                 str(output_path): {
                     'bind': '/usr/src/app/output', 'mode': 'rw',
                 },
             },
+            environment=environment,
+            detach=True,
+            **limits,
         )
-        print(f'container {params} has been finished')
-        subtask.status = models.SubtaskStatus.SUCCESS
-        self.subtask_repository.update_entity(subtask)
+
+    def _watch_container(self, subtask_uid: uuid.UUID, container):
+        container.reload()
+        if container.status in EXITED_CONTAINER_STATUSES:
+            self._complete_container(
+                subtask_uid, container.attrs['State']['ExitCode'],
+            )
+
+    def _kill_container(self, container):
+        try:
+            container.kill()
+        except docker.errors.APIError as error:
+            print(f'container {container.id} is not killed: {error}')
+
+    def _remove_container(self, container):
+        try:
+            container.remove(force=True)
+        except docker.errors.APIError as error:
+            print(f'container {container.id} is not removed: {error}')
+
+    def _start_monitor(self):
+        with self.running_lock:
+            if self.monitor is not None:
+                return
+            self.monitor = threading.Thread(
+                target=self._monitor_containers,
+                args=(int(time.time()),),
+                name='container-monitor',
+                daemon=True,
+            )
+            self.monitor.start()
+
+    def _monitor_containers(self, since: int):
+        while True:
+            try:
+                events = self.client.events(
+                    since=since,
+                    decode=True,
+                    filters={'type': 'container', 'event': 'die'},
+                )
+                for event in events:
+                    since = event.get('time', since)
+                    attributes = event['Actor'].get('Attributes', {})
+                    self._handle_container_exit(
+                        event['Actor']['ID'],
+                        int(attributes.get('exitCode', -1)),
+                    )
+            except Exception as error:
+                print(f'container events stream has failed: {error!r}')
+            time.sleep(CONTAINER_EVENTS_RETRY_DELAY)
+
+    def _handle_container_exit(self, container_id: str, exit_code: int):
+        with self.running_lock:
+            subtask_uids = [
+                subtask_uid
+                for subtask_uid, running in self.running.items()
+                if running.container.id == container_id
+            ]
+        for subtask_uid in subtask_uids:
+            self._complete_container(subtask_uid, exit_code)
@@ -0,0 +1,240 @@
+import dataclasses
+import json
+import os
+import pathlib
+import shutil
+import threading
+import time
+from typing import Any, Callable, Optional
+import uuid
+
+import checksumdir
+
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
+import src.env_controller.backend.image_store as image_store
+import src.env_controller.backend.repositories as repositories
+import src.env_controller.models.core as models
+
+IMAGE_STORE_PATH = pathlib.Path(__file__).parent.parent / 'images'
+THREADS_ENVIRONMENT_VARIABLES = (
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+)
+CHECKSUM_ALGORITHM = 'md5'
+CHECKSUM_EXCLUDED_EXTENSIONS = ['pyc']
+
+
+def get_folder_checksum(folder: pathlib.Path) -> str:
+    return checksumdir.dirhash(
+        folder,
+        hashfunc=CHECKSUM_ALGORITHM,
+        excluded_extensions=CHECKSUM_EXCLUDED_EXTENSIONS,
+    )
+
+
+class CpuAllocator:
+    def __init__(self, cpus: list[int]):
+        self.usage = {cpu: 0 for cpu in cpus}
+        self.lock = threading.Lock()
+
+    def acquire(self, count: int) -> list[int]:
+        with self.lock:
+            cpus = sorted(
+                self.usage, key=lambda cpu: (self.usage[cpu], cpu),
+            )[:count]
+            for cpu in cpus:
+                self.usage[cpu] += 1
+        return sorted(cpus)
+
+    def release(self, cpus: list[int]):
+        with self.lock:
+            for cpu in cpus:
+                self.usage[cpu] -= 1
+
+
+@dataclasses.dataclass
+class RunningContainer:
+    subtask: models.Subtask
+    container: Any
+    cpuset: list[int]
+    input_path: pathlib.Path
+    output_path: pathlib.Path
+    started_at: float
+    finish: Callable
+    timer: Optional[threading.Timer] = None
+    stop_status: Optional[models.SubtaskStatus] = None
+
+
+class ExecutionService:
+    def __init__(
+        self,
+        image_repository: repositories.ImageRepository,
+        subtask_repository: repositories.SubtaskRepository,
+    ):
+        self.image_repository = image_repository
+        self.subtask_repository = subtask_repository
+        self.image_store = image_store.ImageStore(IMAGE_STORE_PATH)
+        self.cpu_allocator = CpuAllocator(sorted(os.sched_getaffinity(0)))
+        self.running: dict[uuid.UUID, RunningContainer] = {}
+        self.running_lock = threading.Lock()
+
+    def build_and_push_image(
+        self,
+        subtask_folder: pathlib.Path,
+        tag: str,
+        registry: models.Registry = models.Registry.DOCKER_HUB,
+    ) -> models.Image:
+        raise NotImplementedError
+
+    def pull_image(
+        self, tag: str, source_url: Optional[str] = None,
+    ) -> models.Image:
+        raise NotImplementedError
+
+    def run_container(
+        self,
+        subtask: models.Subtask,
+        input_path: pathlib.Path,
+        output_path: pathlib.Path,
+        cpus: Optional[int] = None,
+        memory: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> models.Subtask:
+        self._start_monitor()
+        tag = subtask.image.image_tag
+        params = f'tag: {tag}, input {input_path}, output: {output_path}'
+        cpuset = self.cpu_allocator.acquire(cpus) if cpus else []
+        environment = tracing.inject_environment()
+        if cpuset:
+            environment.update(
+                dict.fromkeys(THREADS_ENVIRONMENT_VARIABLES, str(len(cpuset))),
+            )
+        print(f'running container {params}, cpus: {cpuset}, memory: {memory}')
+        try:
+            with tracing.start_span('container_start', image_tag=tag):
+                container = self._start_container(
+                    subtask.image, input_path, output_path, environment,
+                    cpuset, memory,
+                )
+        except Exception:
+            self.cpu_allocator.release(cpuset)
+            shutil.rmtree(input_path, ignore_errors=True)
+            subtask.status = models.SubtaskStatus.ERROR
+            self.subtask_repository.update_entity(subtask)
+            raise
+        metrics.SUBTASKS_IN_FLIGHT.labels('env_controller').inc()
+        subtask.container_id = container.id
+        subtask.status = models.SubtaskStatus.RUNNING
+        self.subtask_repository.update_entity(subtask)
+        running = RunningContainer(
+            subtask=subtask,
+            container=container,
+            cpuset=cpuset,
+            input_path=input_path,
+            output_path=output_path,
+            started_at=time.time(),
+            finish=tracing.bind_context(self._finish_container),
+        )
+        if timeout is not None:
+            running.timer = threading.Timer(
+                timeout,
+                self._stop_container,
+                args=(subtask.subtask_uid, models.SubtaskStatus.TIMEOUT),
+            )
+            running.timer.daemon = True
+            running.timer.start()
+        with self.running_lock:
+            self.running[subtask.subtask_uid] = running
+        self._watch_container(subtask.subtask_uid, container)
+        return subtask
+
+    def _start_monitor(self):
+        pass
+
+    def _start_container(
+        self,
+        image: models.Image,
+        input_path: pathlib.Path,
+        output_path: pathlib.Path,
+        environment: dict[str, str],
+        cpuset: list[int],
+        memory: Optional[int],
+    ):
+        raise NotImplementedError
+
+    def _watch_container(self, subtask_uid: uuid.UUID, container):
+        raise NotImplementedError
+
+    def _kill_container(self, container):
+        raise NotImplementedError
+
+    def _remove_container(self, container):
+        raise NotImplementedError
+
+    def cancel_container(self, subtask_uid: uuid.UUID) -> bool:
+        return self._stop_container(
+            subtask_uid, models.SubtaskStatus.CANCELLED,
+        )
+
+    def _stop_container(
+        self, subtask_uid: uuid.UUID, status: models.SubtaskStatus,
+    ) -> bool:
+        with self.running_lock:
+            running = self.running.get(subtask_uid)
+            if running is None or running.stop_status is not None:
+                return False
+            running.stop_status = status
+        print(f'stopping container of subtask {subtask_uid}: {status.value}')
+        self._kill_container(running.container)
+        self._complete_container(subtask_uid, None)
+        return True
+
+    def _complete_container(
+        self, subtask_uid: uuid.UUID, exit_code: Optional[int],
+    ):
+        with self.running_lock:
+            running = self.running.pop(subtask_uid, None)
+        if running is not None:
+            running.finish(running, exit_code)
+
+    def _finish_container(
+        self, running: RunningContainer, exit_code: Optional[int],
+    ):
+        if running.timer is not None:
+            running.timer.cancel()
+        status = running.stop_status or (
+            models.SubtaskStatus.SUCCESS
+            if exit_code == 0
+            else models.SubtaskStatus.ERROR
+        )
+        finished_at = time.time()
+        tag = running.subtask.image.image_tag
+        tracing.record_span(
+            'container_run', running.started_at, finished_at,
+            image_tag=tag, status=status.value,
+        )
+        if status == models.SubtaskStatus.SUCCESS:
+            self._record_container_phases(running.output_path)
+        self._remove_container(running.container)
+        self.cpu_allocator.release(running.cpuset)
+        shutil.rmtree(running.input_path, ignore_errors=True)
+        metrics.SUBTASKS_IN_FLIGHT.labels('env_controller').dec()
+        metrics.CONTAINER_RUN_DURATION.labels(status.value).observe(
+            finished_at - running.started_at,
+        )
+        running.subtask.status = status
+        self.subtask_repository.update_entity(running.subtask)
+        print(
+            f'container of subtask {running.subtask.subtask_uid} '
+            f'has been finished: {status.value}, exit code {exit_code}'
+        )
+
+    def _record_container_phases(self, output_path: pathlib.Path):
+        spans_file = output_path / 'spans.json'
+        if not spans_file.exists():
+            return
+        for phase in json.loads(spans_file.read_text()):
+            tracing.record_span(
+                phase['name'], phase['start'], phase['end'],
+                service='container',
+            )
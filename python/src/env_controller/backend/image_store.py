@@ -0,0 +1,230 @@
+import hashlib
+import io
+import json
+import pathlib
+import re
+import tarfile
+import tempfile
+import threading
+from typing import BinaryIO, Iterable, Iterator, Optional
+import urllib.parse
+import urllib.request
+
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
+import src.env_controller.models.core as models
+import src.env_controller.models.web as web
+
+DIGEST_ALGORITHM = 'sha256'
+DIGEST_REGEX = re.compile(r'^[a-f0-9]{64}$')
+HTTP_TIMEOUT = 30
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class LocalImageSource:
+    def __init__(self, image_store: 'ImageStore'):
+        self.image_store = image_store
+
+    def get_manifest(self, image_tag: str) -> Optional[models.ImageManifest]:
+        return self.image_store.get_manifest(image_tag)
+
+    def open_blob(self, digest: str) -> BinaryIO:
+        return self.image_store.get_blob_path(digest).open('rb')
+
+
+class HttpImageSource:
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+
+    def get_manifest(self, image_tag: str) -> Optional[models.ImageManifest]:
+        request_body = web.GetImageManifestRequest(
+            image_tag=image_tag,
+        ).model_dump_json()
+        request = urllib.request.Request(
+            f'{self.url}/image/manifest',
+            data=request_body.encode(),
+            headers={
+                'Content-Type': 'application/json',
+                **tracing.inject_headers(),
+            },
+        )
+        with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT) as response:
+            json_body = json.loads(response.read())
+        response_body = web.GetImageManifestResponse.model_validate(json_body)
+        if response_body.manifest is None:
+            return None
+        return response_body.manifest.to_core()
+
+    def open_blob(self, digest: str) -> BinaryIO:
+        query = urllib.parse.urlencode({'digest': digest})
+        request = urllib.request.Request(
+            f'{self.url}/image/blob?{query}',
+            headers=tracing.inject_headers(),
+        )
+        return urllib.request.urlopen(request, timeout=HTTP_TIMEOUT)
+
+
+class ChunkReader(io.RawIOBase):
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks: Iterator[bytes] = iter(chunks)
+        self.buffer = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.buffer:
+            try:
+                self.buffer = next(self.chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self.buffer))
+        buffer[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+
+class ImageStore:
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self.lock = threading.Lock()
+
+    def save(
+        self, image_tag: str, chunks: Iterable[bytes],
+    ) -> models.ImageManifest:
+        entries = []
+        with tarfile.open(fileobj=ChunkReader(chunks), mode='r|') as archive:
+            for member in archive:
+                entries.append(self._add_member(archive, member))
+        manifest = models.ImageManifest(image_tag=image_tag, entries=entries)
+        self._write_manifest(manifest)
+        return manifest
+
+    def fetch(
+        self,
+        image_tag: str,
+        source: LocalImageSource | HttpImageSource,
+    ) -> models.ImageManifest:
+        manifest = source.get_manifest(image_tag)
+        if manifest is None:
+            raise FileNotFoundError(f'source has no image {image_tag}')
+        blobs = {
+            entry.digest: entry.size
+            for entry in manifest.entries
+            if entry.entry_type == models.ImageEntryType.FILE
+        }
+        missing = [
+            digest for digest in blobs if not self.has_blob(digest)
+        ]
+        for digest in missing:
+            with source.open_blob(digest) as blob:
+                self._add_blob(blob, digest)
+        fetched = sum(blobs[digest] for digest in missing)
+        reused = sum(blobs.values()) - fetched
+        metrics.IMAGE_BLOB_BYTES.labels(result='fetched').inc(fetched)
+        metrics.IMAGE_BLOB_BYTES.labels(result='reused').inc(reused)
+        print(
+            f'image {image_tag} blobs: {len(missing)} of {len(blobs)} '
+            f'fetched, {fetched} bytes fetched, {reused} bytes reused'
+        )
+        self._write_manifest(manifest)
+        return manifest
+
+    def write_archive(self, manifest: models.ImageManifest, file: BinaryIO):
+        with tarfile.open(fileobj=file, mode='w|') as archive:
+            for entry in manifest.entries:
+                info = tarfile.TarInfo(entry.path)
+                match entry.entry_type:
+                    case models.ImageEntryType.DIRECTORY:
+                        info.type = tarfile.DIRTYPE
+                        info.mode = 0o755
+                        archive.addfile(info)
+                    case models.ImageEntryType.SYMLINK:
+                        info.type = tarfile.SYMTYPE
+                        info.linkname = entry.link
+                        archive.addfile(info)
+                    case models.ImageEntryType.FILE:
+                        info.size = entry.size
+                        info.mode = 0o644
+                        blob_path = self.get_blob_path(entry.digest)
+                        with blob_path.open('rb') as blob:
+                            archive.addfile(info, blob)
+
+    def get_manifest(self, image_tag: str) -> Optional[models.ImageManifest]:
+        path = self._get_manifest_path(image_tag)
+        if not path.exists():
+            return None
+        return web.ImageManifest.model_validate_json(
+            path.read_text(),
+        ).to_core()
+
+    def has_blob(self, digest: str) -> bool:
+        return self.get_blob_path(digest).is_file()
+
+    def get_blob_path(self, digest: str) -> pathlib.Path:
+        if not DIGEST_REGEX.match(digest):
+            raise FileNotFoundError(f'invalid blob digest {digest}')
+        return self.root / 'blobs' / DIGEST_ALGORITHM / digest
+
+    def _add_member(
+        self, archive: tarfile.TarFile, member: tarfile.TarInfo,
+    ) -> models.ImageEntry:
+        if member.isdir():
+            return models.ImageEntry(
+                path=member.name,
+                entry_type=models.ImageEntryType.DIRECTORY,
+            )
+        if member.issym():
+            return models.ImageEntry(
+                path=member.name,
+                entry_type=models.ImageEntryType.SYMLINK,
+                link=member.linkname,
+            )
+        if member.isfile():
+            digest = self._add_blob(archive.extractfile(member))
+            return models.ImageEntry(
+                path=member.name,
+                entry_type=models.ImageEntryType.FILE,
+                size=member.size,
+                digest=digest,
+            )
+        raise ValueError(f'unsupported image archive member {member.name}')
+
+    def _add_blob(
+        self, content: BinaryIO, expected_digest: Optional[str] = None,
+    ) -> str:
+        temporary_folder = self.root / 'tmp'
+        temporary_folder.mkdir(parents=True, exist_ok=True)
+        checksum = hashlib.new(DIGEST_ALGORITHM)
+        with tempfile.NamedTemporaryFile(
+            dir=temporary_folder, delete=False,
+        ) as temporary:
+            while chunk := content.read(COPY_BUFFER_SIZE):
+                checksum.update(chunk)
+                temporary.write(chunk)
+        digest = checksum.hexdigest()
+        temporary_path = pathlib.Path(temporary.name)
+        if expected_digest is not None and digest != expected_digest:
+            temporary_path.unlink()
+            raise ValueError(
+                f'blob digest mismatch: {digest} != {expected_digest}',
+            )
+        blob_path = self.get_blob_path(digest)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            if blob_path.exists():
+                temporary_path.unlink()
+            else:
+                temporary_path.replace(blob_path)
+        return digest
+
+    def _write_manifest(self, manifest: models.ImageManifest):
+        path = self._get_manifest_path(manifest.image_tag)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            web.ImageManifest.from_core(manifest).model_dump_json(),
+        )
+
+    def _get_manifest_path(self, image_tag: str) -> pathlib.Path:
+        name = hashlib.new(DIGEST_ALGORITHM, image_tag.encode()).hexdigest()
+        return self.root / 'manifests' / f'{name}.json'
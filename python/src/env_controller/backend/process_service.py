@@ -0,0 +1,165 @@
+import contextlib
+import json
+import pathlib
+import subprocess
+import sys
+import threading
+from typing import Optional
+import uuid
+
+import src.env_controller.backend.execution_service as execution
+import src.env_controller.backend.repositories as repositories
+import src.env_controller.models.core as models
+
+TASKS_PATH = pathlib.Path(__file__).parent.parent / 'tasks'
+WORKER_PATH = pathlib.Path(__file__).parent / 'process_worker.py'
+SUBTASK_SCRIPT = pathlib.Path('src') / 'subtask.py'
+
+
+class ProcessWorker:
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, str(WORKER_PATH)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        self.id = f'process-{self.process.pid}'
+        self.killed = False
+
+    def submit(self, job: dict):
+        self.process.stdin.write(json.dumps(job) + '\n')
+        self.process.stdin.flush()
+
+    def wait(self) -> int:
+        line = self.process.stdout.readline()
+        if not line:
+            return self.process.wait()
+        return json.loads(line)['exit_code']
+
+    def is_alive(self) -> bool:
+        return not self.killed and self.process.poll() is None
+
+    def kill(self):
+        self.killed = True
+        self.process.kill()
+
+    def close(self):
+        with contextlib.suppress(OSError):
+            self.process.stdin.close()
+        self.process.wait()
+
+
+class ProcessService(execution.ExecutionService):
+    def __init__(
+        self,
+        image_repository: repositories.ImageRepository,
+        subtask_repository: repositories.SubtaskRepository,
+    ):
+        super().__init__(image_repository, subtask_repository)
+        self.workers: list[ProcessWorker] = []
+        self.workers_lock = threading.Lock()
+        self.workers_limit = len(self.cpu_allocator.usage)
+
+    def build_and_push_image(
+        self,
+        subtask_folder: pathlib.Path,
+        tag: str,
+        registry: models.Registry = models.Registry.DOCKER_HUB,
+    ) -> models.Image:
+        image = models.Image(
+            image_tag=tag,
+            image_id=str(subtask_folder),
+            status=models.ImageStatus.PUSHED,
+            registry=registry,
+        )
+        self.image_repository.upsert_entity(image)
+        print(f'image {tag} is served from {subtask_folder}')
+        return image
+
+    def pull_image(
+        self, tag: str, source_url: Optional[str] = None,
+    ) -> models.Image:
+        subtask_folder = self._find_subtask_folder(tag)
+        image = models.Image(
+            image_tag=tag,
+            image_id=str(subtask_folder) if subtask_folder else None,
+            status=(
+                models.ImageStatus.PULLED
+                if subtask_folder is not None
+                else models.ImageStatus.PULLING_ERROR
+            ),
+        )
+        self.image_repository.upsert_entity(image)
+        print(f'image {tag} is resolved to {subtask_folder}')
+        return image
+
+    @staticmethod
+    def _find_subtask_folder(tag: str) -> Optional[pathlib.Path]:
+        repository, _, checksum = tag.rpartition(':')
+        subtask_name = repository.rpartition('/')[2]
+        for subtask_folder in TASKS_PATH.glob(f'*/subtasks/{subtask_name}'):
+            if execution.get_folder_checksum(subtask_folder) == checksum:
+                return subtask_folder
+        return None
+
+    def _start_container(
+        self,
+        image: models.Image,
+        input_path: pathlib.Path,
+        output_path: pathlib.Path,
+        environment: dict[str, str],
+        cpuset: list[int],
+        memory: Optional[int],
+    ) -> ProcessWorker:
+        script = pathlib.Path(image.image_id) / SUBTASK_SCRIPT
+        output_path.mkdir(parents=True, exist_ok=True)
+        worker = self._acquire_worker()
+        try:
+            worker.submit(
+                {
+                    'script': str(script),
+                    'input_path': str(input_path),
+                    'output_path': str(output_path),
+                    'environment': environment,
+                    'cpuset': cpuset,
+                    'memory': memory,
+                }
+            )
+        except OSError:
+            worker.kill()
+            worker.close()
+            raise
+        return worker
+
+    def _watch_container(self, subtask_uid: uuid.UUID, worker: ProcessWorker):
+        thread = threading.Thread(
+            target=lambda: self._complete_container(
+                subtask_uid, worker.wait(),
+            ),
+            name=f'worker-{worker.id}',
+            daemon=True,
+        )
+        thread.start()
+
+    def _kill_container(self, worker: ProcessWorker):
+        worker.kill()
+
+    def _remove_container(self, worker: ProcessWorker):
+        self._release_worker(worker)
+
+    def _acquire_worker(self) -> ProcessWorker:
+        with self.workers_lock:
+            while self.workers:
+                worker = self.workers.pop()
+                if worker.is_alive():
+                    return worker
+                worker.close()
+        return ProcessWorker()
+
+    def _release_worker(self, worker: ProcessWorker):
+        with self.workers_lock:
+            if worker.is_alive() and len(self.workers) < self.workers_limit:
+                self.workers.append(worker)
+                return
+        worker.close()
@@ -0,0 +1,71 @@
+# python process_worker.py, started by ProcessService
+# reads one json job per line from stdin and answers with its exit code,
+# subtask output is redirected to stderr to keep stdout for the protocol
+import json
+import os
+import pathlib
+import resource
+import runpy
+import sys
+import tempfile
+import traceback
+from typing import Optional
+
+
+def run_subtask(
+    script: str,
+    input_path: str,
+    output_path: str,
+    environment: dict[str, str],
+    cpuset: list[int],
+    memory: Optional[int] = None,
+) -> int:
+    saved_environment = dict(os.environ)
+    saved_affinity = os.sched_getaffinity(0)
+    saved_memory = resource.getrlimit(resource.RLIMIT_AS)
+    saved_cwd = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            workdir = pathlib.Path(workdir)
+            (workdir / 'input').symlink_to(input_path)
+            (workdir / 'output').symlink_to(output_path)
+            os.environ.update(environment)
+            if cpuset:
+                os.sched_setaffinity(0, cpuset)
+            if memory:
+                hard_memory = saved_memory[1]
+                if hard_memory != resource.RLIM_INFINITY:
+                    memory = min(memory, hard_memory)
+                resource.setrlimit(
+                    resource.RLIMIT_AS, (memory, hard_memory),
+                )
+            os.chdir(workdir)
+            runpy.run_path(script, run_name='__main__')
+    except SystemExit as exit:
+        if exit.code is None or isinstance(exit.code, int):
+            return exit.code or 0
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, saved_memory)
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_environment)
+        os.sched_setaffinity(0, saved_affinity)
+    return 0
+
+
+def main():
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    for line in sys.stdin:
+        exit_code = run_subtask(**json.loads(line))
+        sys.stdout.flush()
+        protocol.write(json.dumps({'exit_code': exit_code}) + '\n')
+        protocol.flush()
+
+
+if __name__ == '__main__':
+    main()
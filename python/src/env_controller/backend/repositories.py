@@ -14,22 +14,20 @@ class ImageRepository:
         self.db = db
 
     def create_entity(self, entity: core.Image):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             image: db_models.Image = db_models.Image.from_core(entity)
             session.add(image)
-            session.commit()
 
     def delete_entity(self, image_tag: str):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             image: Optional[db_models.Image] = session.query(
                 db_models.Image,
             ).where(db_models.Image.image_tag == image_tag).first()
             if image is not None:
                 session.delete(image)
-                session.commit()
 
     def update_entity(self, entity: core.Image):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             image = db_models.Image.from_core(entity)
             stmt = sql.update(
                 db_models.Image,
@@ -40,32 +38,31 @@ class ImageRepository:
                 status=image.status,
             )
             session.execute(stmt)
-            session.commit()
 
     def get_entity(self, image_tag: str) -> Optional[core.Image]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             image: Optional[db_models.Image] = session.query(
                 db_models.Image
             ).where(db_models.Image.image_tag == image_tag).first()
             if image is None:
-                raise Exception(f'image with tag {image_tag} does not exists')
+                return None
             return image.to_core()
 
     def get_entities(self) -> Iterable[core.Image]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             stmt = sql.select(db_models.Image)
             images = session.scalars(stmt).all()
-        return [image.to_core() for image in images]
+            return [image.to_core() for image in images]
 
     def upsert_entity(self, entity: core.Image):
-        with self.db.create_session() as session:
-            image: Optional[db_models.Image] = session.query(
-                db_models.Image
-            ).where(db_models.Image.image_tag == entity.image_tag).first()
-        if image is None:
-            self.create_entity(entity)
-        else:
-            self.update_entity(entity)
+        self.upsert_entities([entity])
+
+    def upsert_entities(self, entities: Iterable[core.Image]):
+        with self.db.begin() as session:
+            database.upsert(
+                session,
+                [db_models.Image.from_core(entity) for entity in entities],
+            )
 
 
 class SubtaskRepository:
@@ -73,22 +70,20 @@ class SubtaskRepository:
         self.db = db
 
     def create_entity(self, entity: core.Subtask):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask = db_models.Subtask.from_core(entity)
             session.add(subtask)
-            session.commit()
 
     def delete_entity(self, subtask_uid: uuid.UUID):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask: Optional[db_models.Subtask] = session.query(
                 db_models.Subtask,
             ).where(db_models.Subtask.subtask_uid == str(subtask_uid)).first()
             if subtask is not None:
                 session.delete(subtask)
-                session.commit()
 
     def update_entity(self, entity: core.Subtask):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask = db_models.Subtask.from_core(entity)
             stmt = sql.update(
                 db_models.Subtask,
@@ -100,10 +95,9 @@ class SubtaskRepository:
                 status=subtask.status,
             )
             session.execute(stmt)
-            session.commit()
 
     def get_entity(self, subtask_uid: uuid.UUID) -> Optional[core.Subtask]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask: Optional[db_models.Subtask] = session.query(
                 db_models.Subtask
             ).where(db_models.Subtask.subtask_uid == str(subtask_uid)).first()
@@ -112,19 +106,17 @@ class SubtaskRepository:
             return subtask.to_core()
 
     def get_entities(self) -> Iterable[core.Subtask]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             stmt = sql.select(db_models.Subtask)
             subtasks = session.scalars(stmt).all()
-        return [subtask.to_core() for subtask in subtasks]
+            return [subtask.to_core() for subtask in subtasks]
 
     def upsert_entity(self, entity: core.Subtask):
-        with self.db.create_session() as session:
-            image: Optional[db_models.Subtask] = session.query(
-                db_models.Subtask
-            ).where(
-                db_models.Subtask.subtask_uid == str(entity.subtask_uid)
-            ).first()
-        if image is None:
-            self.create_entity(entity)
-        else:
-            self.update_entity(entity)
+        self.upsert_entities([entity])
+
+    def upsert_entities(self, entities: Iterable[core.Subtask]):
+        with self.db.begin() as session:
+            database.upsert(
+                session,
+                [db_models.Subtask.from_core(entity) for entity in entities],
+            )
@@ -1,35 +1,55 @@
+import json
 import pathlib
 
 import fastapi
 
 import src.common.backend.db as database
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
 import src.common.models.web as common_models
 import src.env_controller.backend.docker_service as docker
+import src.env_controller.backend.process_service as process
 import src.env_controller.backend.repositories as repositories
 import src.env_controller.backend.services as services
+import src.env_controller.models.core as core_models
 import src.env_controller.models.web as models
 import src.env_controller.models.db as db_models
 
 app = fastapi.FastAPI()
+metrics.instrument_app(app, service='env_controller')
+tracing.instrument_app(app, service='env_controller')
 db_name = str(
     pathlib.Path(__file__).parent.parent / 'db' / 'env_controller.sqlite',
 )
 db = database.DB(db_name=db_name, base=db_models.Base)
 image_repository = repositories.ImageRepository(db=db)
 subtask_repository = repositories.SubtaskRepository(db=db)
-docker_service = docker.DockerService(image_repository, subtask_repository)
-image_service = services.ImageService(image_repository, docker_service)
+config_path = pathlib.Path(__file__).parent.parent / 'config' / 'config.json'
+execution_backend = core_models.ExecutionBackend(
+    json.loads(config_path.read_text())['execution_backend'],
+)
+if execution_backend == core_models.ExecutionBackend.PROCESS:
+    execution_service = process.ProcessService(
+        image_repository, subtask_repository,
+    )
+else:
+    execution_service = docker.DockerService(
+        image_repository, subtask_repository,
+    )
+image_service = services.ImageService(image_repository, execution_service)
 subtasks_service = services.SubtaskService(
-    subtask_repository, image_repository, docker_service,
+    subtask_repository, image_repository, execution_service,
 )
 
 
 @app.post('/image/push')
-async def push_image(
+def push_image(
     request: models.ImagePushRequest,
 ) -> models.ImagePushResponse:
     image = image_service.build_and_push(
-        task_type=request.task_type, subtask_type=request.subtask_type,
+        task_type=request.task_type,
+        subtask_type=request.subtask_type,
+        registry=request.registry,
     )
     return models.ImagePushResponse(
         status=common_models.ResponseStatus.SUCCESS,
@@ -39,7 +59,7 @@ async def push_image(
 
 
 @app.post('/image/push/status')
-async def push_image_status(
+def push_image_status(
     request: models.ImagePushStatusRequest,
 ) -> models.ImagePushStatusResponse:
     status = image_service.get_image_status(request.image_tag)
@@ -50,11 +70,40 @@ async def push_image_status(
     )
 
 
+@app.post('/image/manifest')
+def get_image_manifest(
+    request: models.GetImageManifestRequest,
+) -> models.GetImageManifestResponse:
+    manifest = image_service.get_image_manifest(request.image_tag)
+    return models.GetImageManifestResponse(
+        status=common_models.ResponseStatus.SUCCESS,
+        manifest=(
+            models.ImageManifest.from_core(manifest)
+            if manifest is not None else None
+        ),
+    )
+
+
+@app.get('/image/blob')
+def get_image_blob(digest: str) -> fastapi.responses.FileResponse:
+    try:
+        path = image_service.get_image_blob_path(digest)
+    except FileNotFoundError as error:
+        raise fastapi.HTTPException(status_code=404, detail=str(error))
+    if not path.is_file():
+        raise fastapi.HTTPException(status_code=404, detail=digest)
+    return fastapi.responses.FileResponse(
+        path, media_type='application/octet-stream',
+    )
+
+
 @app.post('/image/pull')
-async def pull_image(
+def pull_image(
     request: models.ImagePullRequest,
 ) -> models.ImagePullResponse:
-    image = image_service.pull_image(image_tag=request.image_tag)
+    image = image_service.pull_image(
+        image_tag=request.image_tag, source_url=request.source_url,
+    )
     return models.ImagePullResponse(
         status=common_models.ResponseStatus.SUCCESS,
         image_tag=image.image_tag,
@@ -63,7 +112,7 @@ async def pull_image(
 
 
 @app.post('/image/pull/status')
-async def pull_image_status(
+def pull_image_status(
     request: models.ImagePullStatusRequest,
 ) -> models.ImagePullStatusResponse:
     status = image_service.get_image_status(image_tag=request.image_tag)
@@ -75,13 +124,16 @@ async def pull_image_status(
 
 
 @app.post('/container/run')
-async def run_container(
+def run_container(
     request: models.ContainerRunRequest,
 ) -> models.ContainerRunResponse:
     subtask = subtasks_service.run_container(
         subtask_uid=request.subtask_uid,
         image_tag=request.image_tag,
         input_files=request.input_files,
+        cpus=request.cpus,
+        memory=request.memory,
+        timeout=request.timeout,
     )
     return models.ContainerRunResponse(
         status=common_models.ResponseStatus.SUCCESS,
@@ -91,7 +143,7 @@ async def run_container(
 
 
 @app.post('/container/status')
-async def get_container_status(
+def get_container_status(
     request: models.ContainerStatusRequest,
 ) -> models.ContainerStatusResponse:
     status = subtasks_service.get_container_status(request.subtask_uid)
@@ -102,8 +154,20 @@ async def get_container_status(
     )
 
 
+@app.post('/container/cancel')
+def cancel_container(
+    request: models.ContainerCancelRequest,
+) -> models.ContainerCancelResponse:
+    status = subtasks_service.cancel_container(request.subtask_uid)
+    return models.ContainerCancelResponse(
+        status=common_models.ResponseStatus.SUCCESS,
+        subtask_uid=request.subtask_uid,
+        running_status=status,
+    )
+
+
 @app.post('/container/result')
-async def get_container_result(
+def get_container_result(
     request: models.ContainerResultRequest,
 ) -> models.ContainerResultResponse:
     result_file = subtasks_service.get_subtask_result(request.subtask_uid)
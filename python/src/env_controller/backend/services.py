@@ -1,29 +1,45 @@
+import contextlib
 import json
 import pathlib
-import shutil
+import threading
 from typing import Any, Optional
 import uuid
 
-import checksumdir
-
+import src.common.backend.files as files
+import src.common.backend.tracing as tracing
+import src.env_controller.backend.execution_service as execution
 import src.env_controller.backend.repositories as repositories
-import src.env_controller.backend.docker_service as docker
 import src.env_controller.models.core as models
 
+REUSABLE_PUSH_STATUSES = (
+    models.ImageStatus.BUILDING,
+    models.ImageStatus.PUSHING,
+    models.ImageStatus.PUSHED,
+)
+REUSABLE_PULL_STATUSES = (
+    models.ImageStatus.PULLING,
+    models.ImageStatus.PULLED,
+)
+
 
 class ImageService:
     def __init__(
         self,
         repository: repositories.ImageRepository,
-        docker_service: docker.DockerService,
+        docker_service: execution.ExecutionService,
     ):
         self.repository = repository
         self.docker_service = docker_service
+        self.lock = threading.Lock()
+        self.image_locks: dict[str, tuple[threading.Lock, int]] = {}
+        self.checksums: dict[pathlib.Path, tuple[tuple, str]] = {}
+        self.checksums_lock = threading.Lock()
 
     def build_and_push(
         self,
         task_type: models.TaskType,
         subtask_type: models.SubtaskType,
+        registry: models.Registry = models.Registry.DOCKER_HUB,
     ) -> models.Image:
         task_folder = self._tasks_repo / task_type.value.lower()
         subtask_folder = task_folder / 'subtasks' / subtask_type.value.lower()
@@ -31,17 +47,97 @@ class ImageService:
             f'subtask folder {subtask_folder} does not exist'
         )
         subtask_name = subtask_type.value.lower()
-        subtask_checksum = checksumdir.dirhash(subtask_folder, hashfunc='md5')
+        subtask_checksum = self._get_folder_checksum(subtask_folder)
         tag = f'distcalcanonymous/{subtask_name}:{subtask_checksum}'
-        image = self.docker_service.build_and_push_image(subtask_folder, tag)
+        with self._lock_image(tag):
+            image = self._get_reusable_image(
+                tag, REUSABLE_PUSH_STATUSES, registry,
+            )
+            if image is None:
+                image = self.docker_service.build_and_push_image(
+                    subtask_folder, tag, registry,
+                )
+        return image
+
+    @contextlib.contextmanager
+    def _lock_image(self, image_tag: str):
+        with self.lock:
+            image_lock, users = self.image_locks.get(
+                image_tag, (threading.Lock(), 0),
+            )
+            self.image_locks[image_tag] = (image_lock, users + 1)
+        try:
+            with image_lock:
+                yield
+        finally:
+            with self.lock:
+                _, users = self.image_locks[image_tag]
+                if users > 1:
+                    self.image_locks[image_tag] = (image_lock, users - 1)
+                else:
+                    del self.image_locks[image_tag]
+
+    def _get_folder_checksum(self, folder: pathlib.Path) -> str:
+        fingerprint = tuple(
+            (path.as_posix(), path.stat().st_mtime_ns, path.stat().st_size)
+            for path in sorted(folder.rglob('*'))
+        )
+        with self.checksums_lock:
+            cached = self.checksums.get(folder)
+            if cached is not None and cached[0] == fingerprint:
+                return cached[1]
+            checksum = execution.get_folder_checksum(folder)
+            self.checksums[folder] = (fingerprint, checksum)
+        return checksum
+
+    def pull_image(
+        self, image_tag: str, source_url: Optional[str] = None,
+    ) -> models.Image:
+        with self._lock_image(image_tag):
+            image = self._get_reusable_image(
+                image_tag, REUSABLE_PULL_STATUSES,
+            )
+            if image is None:
+                image = self.docker_service.pull_image(image_tag, source_url)
         return image
 
-    def pull_image(self, image_tag: str) -> models.Image:
-        image = self.docker_service.pull_image(image_tag)
+    def get_image_manifest(
+        self, image_tag: str,
+    ) -> Optional[models.ImageManifest]:
+        return self.docker_service.image_store.get_manifest(image_tag)
+
+    def get_image_blob_path(self, digest: str) -> pathlib.Path:
+        return self.docker_service.image_store.get_blob_path(digest)
+
+    def _get_reusable_image(
+        self,
+        image_tag: str,
+        statuses: tuple[models.ImageStatus, ...],
+        registry: Optional[models.Registry] = None,
+    ) -> Optional[models.Image]:
+        image = self.repository.get_entity(image_tag=image_tag)
+        if image is None or image.status not in statuses:
+            return None
+        if registry is not None and not self._is_published_to(
+            image, registry,
+        ):
+            return None
+        print(f'image {image_tag} is reused, it is {image.status.value}')
         return image
 
+    def _is_published_to(
+        self, image: models.Image, registry: models.Registry,
+    ) -> bool:
+        if image.registry == registry:
+            return True
+        if registry == models.Registry.PEER:
+            return self.get_image_manifest(image.image_tag) is not None
+        return image.registry is None
+
     def get_image_status(self, image_tag: str) -> models.ImageStatus:
         image = self.repository.get_entity(image_tag=image_tag)
+        if image is None:
+            raise Exception(f'image with tag {image_tag} does not exists')
         return image.status
 
     @property
@@ -54,7 +150,7 @@ class SubtaskService:
         self,
         subtask_repository: repositories.SubtaskRepository,
         image_repository: repositories.ImageRepository,
-        docker_service: docker.DockerService,
+        docker_service: execution.ExecutionService,
     ):
         self.subtask_repository = subtask_repository
         self.image_repository = image_repository
@@ -65,6 +161,9 @@ class SubtaskService:
         subtask_uid: uuid.UUID,
         image_tag: str,
         input_files: list[pathlib.Path],
+        cpus: Optional[int] = None,
+        memory: Optional[int] = None,
+        timeout: Optional[float] = None,
     ) -> models.Subtask:
         image = self.image_repository.get_entity(image_tag)
         subtask = models.Subtask(
@@ -77,13 +176,18 @@ class SubtaskService:
         subtask_runtime_dir = self.get_subtask_runtime_dir(subtask.subtask_uid)
         subtask.status = models.SubtaskStatus.FILE_COPYING
         self.subtask_repository.update_entity(subtask)
-        self._copy_input_files(
-            input_files=input_files, subtask_runtime_dir=subtask_runtime_dir,
-        )
+        with tracing.start_span('file_copying', files=len(input_files)):
+            self._copy_input_files(
+                input_files=input_files,
+                subtask_runtime_dir=subtask_runtime_dir,
+            )
         subtask = self.docker_service.run_container(
             subtask,
             input_path=subtask_runtime_dir / 'input',
             output_path=subtask_runtime_dir / 'output',
+            cpus=cpus,
+            memory=memory,
+            timeout=timeout,
         )
         return subtask
 
@@ -92,12 +196,15 @@ class SubtaskService:
         input_files: list[pathlib.Path],
         subtask_runtime_dir: pathlib.Path,
     ):
-        print('copying input files')
-        for src_path in input_files:
-            dst_path = subtask_runtime_dir / 'input' / src_path.name
-            dst_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy(src_path, dst_path)
-        print('input files has been copied')
+        print('staging input files')
+        methods = files.stage_files(
+            (src_path, subtask_runtime_dir / 'input' / src_path.name)
+            for src_path in input_files
+        )
+        print(
+            'input files has been staged: '
+            f'{files.describe_staging(methods)}'
+        )
 
     def get_container_status(
         self, subtask_uid: uuid.UUID,
@@ -105,6 +212,13 @@ class SubtaskService:
         subtask = self.subtask_repository.get_entity(subtask_uid)
         return subtask.status
 
+    def cancel_container(
+        self, subtask_uid: uuid.UUID,
+    ) -> Optional[models.SubtaskStatus]:
+        self.docker_service.cancel_container(subtask_uid)
+        subtask = self.subtask_repository.get_entity(subtask_uid)
+        return subtask.status if subtask is not None else None
+
     def get_subtask_result(
         self, subtask_uid: uuid.UUID,
     ) -> Optional[pathlib.Path]:
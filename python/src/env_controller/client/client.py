@@ -1,4 +1,5 @@
 import pathlib
+from typing import Optional
 import uuid
 
 import aiohttp
@@ -11,14 +12,19 @@ import src.env_controller.models.web as web
 class EnvControllerClient(client_base.ClientBase):
 
     async def push_image(
-        self, task_type: models.TaskType, subtask_type: models.SubtaskType,
+        self,
+        task_type: models.TaskType,
+        subtask_type: models.SubtaskType,
+        registry: models.Registry = models.Registry.DOCKER_HUB,
     ) -> tuple[str, models.ImageStatus]:
         url = self.get_server_url('/image/push')
         request_body = web.ImagePushRequest(
-            task_type=task_type, subtask_type=subtask_type,
+            task_type=task_type, subtask_type=subtask_type, registry=registry,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.ImagePushResponse.model_validate(json)
         return response_body.image_tag, response_body.pushing_status
@@ -31,18 +37,24 @@ class EnvControllerClient(client_base.ClientBase):
             image_tag=image_tag,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.ImagePushStatusResponse.model_validate(json)
         return response_body.pushing_status
 
-    async def pull_image(self, image_tag: str) -> models.ImageStatus:
+    async def pull_image(
+        self, image_tag: str, source_url: Optional[str] = None,
+    ) -> models.ImageStatus:
         url = self.get_server_url('/image/pull')
         request_body = web.ImagePullRequest(
-            image_tag=image_tag,
+            image_tag=image_tag, source_url=source_url,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.ImagePullResponse.model_validate(json)
         return response_body.pulling_status
@@ -53,7 +65,9 @@ class EnvControllerClient(client_base.ClientBase):
             image_tag=image_tag,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.ImagePullStatusResponse.model_validate(json)
         return response_body.pulling_status
@@ -62,16 +76,24 @@ class EnvControllerClient(client_base.ClientBase):
         self,
         subtask_uid: uuid.UUID,
         image_tag: str,
-        input_files: list[pathlib.Path]
+        input_files: list[pathlib.Path],
+        cpus: Optional[int] = None,
+        memory: Optional[int] = None,
+        timeout: Optional[float] = None,
     ) -> models.SubtaskStatus:
         url = self.get_server_url('/container/run')
         request_body = web.ContainerRunRequest(
             subtask_uid=subtask_uid,
             image_tag=image_tag,
             input_files=input_files,
+            cpus=cpus,
+            memory=memory,
+            timeout=timeout,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.ContainerRunResponse.model_validate(json)
         return response_body.running_status
@@ -84,11 +106,28 @@ class EnvControllerClient(client_base.ClientBase):
             subtask_uid=subtask_uid,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.ContainerRunResponse.model_validate(json)
         return response_body.running_status
 
+    async def cancel_container(
+        self, subtask_uid: uuid.UUID,
+    ) -> Optional[models.SubtaskStatus]:
+        url = self.get_server_url('/container/cancel')
+        request_body = web.ContainerCancelRequest(
+            subtask_uid=subtask_uid,
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
+                json = await response.json()
+        response_body = web.ContainerCancelResponse.model_validate(json)
+        return response_body.running_status
+
     async def get_container_result(
         self, subtask_uid: uuid.UUID,
     ) -> pathlib.Path:
@@ -97,7 +136,9 @@ class EnvControllerClient(client_base.ClientBase):
             subtask_uid=subtask_uid,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.ContainerResultResponse.model_validate(json)
         return response_body.result_file
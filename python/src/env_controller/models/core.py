@@ -17,11 +17,43 @@ class ImageStatus(enum.Enum):
     ARCHIVED = 'archived'
 
 
+class Registry(enum.Enum):
+    DOCKER_HUB = 'docker_hub'
+    PEER = 'peer'
+
+
 @dataclasses.dataclass
 class Image:
     image_tag: str
     image_id: Optional[str]
     status: ImageStatus
+    registry: Optional[Registry] = None
+
+
+class ExecutionBackend(enum.Enum):
+    DOCKER = 'docker'
+    PROCESS = 'process'
+
+
+class ImageEntryType(enum.Enum):
+    FILE = 'file'
+    DIRECTORY = 'directory'
+    SYMLINK = 'symlink'
+
+
+@dataclasses.dataclass
+class ImageEntry:
+    path: str
+    entry_type: ImageEntryType
+    size: int = 0
+    digest: Optional[str] = None
+    link: Optional[str] = None
+
+
+@dataclasses.dataclass
+class ImageManifest:
+    image_tag: str
+    entries: list[ImageEntry]
 
 
 class SubtaskStatus(enum.Enum):
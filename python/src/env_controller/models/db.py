@@ -19,6 +19,7 @@ class Image(Base):
     )
     image_id: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(71))
     status: orm.Mapped[str] = orm.mapped_column(sql.String(64))
+    registry: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(16))
 
     subtasks: orm.Mapped[list['Subtask']] = orm.relationship(
         back_populates='image',
@@ -30,15 +31,15 @@ class Image(Base):
             image_tag=obj.image_tag,
             image_id=obj.image_id,
             status=obj.status.value,
+            registry=obj.registry.value if obj.registry else None,
         )
 
     def to_core(self) -> core.Image:
         return core.Image(
             image_tag=self.image_tag,
             image_id=self.image_id,
-            status=[
-                elem for elem in core.ImageStatus if elem.value == self.status
-            ][0],
+            status=core.ImageStatus(self.status),
+            registry=core.Registry(self.registry) if self.registry else None,
         )
 
     def __repr__(self):
@@ -46,7 +47,8 @@ class Image(Base):
             "Image("
             f"image_tag={self.image_tag!r}, "
             f"image_id={self.image_id!r}, "
-            f"status={self.status!r})"
+            f"status={self.status!r}, "
+            f"registry={self.registry!r})"
         )
 
 
@@ -79,11 +81,7 @@ class Subtask(Base):
             subtask_uid=uuid.UUID(self.subtask_uid),
             image=self.image.to_core(),
             container_id=self.container_id,
-            status=[
-                elem
-                for elem in core.SubtaskStatus
-                if elem.value == self.status
-            ][0],
+            status=core.SubtaskStatus(self.status),
         )
 
     def __repr__(self):
@@ -54,9 +54,57 @@ class Subtask(pydantic.BaseModel):
         )
 
 
+class ImageEntry(pydantic.BaseModel):
+    path: str
+    entry_type: core.ImageEntryType
+    size: int = 0
+    digest: Optional[str] = pydantic.Field(
+        default=None, pattern=SHA_256_REGEX,
+    )
+    link: Optional[str] = None
+
+    @staticmethod
+    def from_core(obj: core.ImageEntry) -> 'ImageEntry':
+        return ImageEntry(
+            path=obj.path,
+            entry_type=obj.entry_type,
+            size=obj.size,
+            digest=obj.digest,
+            link=obj.link,
+        )
+
+    def to_core(self) -> core.ImageEntry:
+        return core.ImageEntry(
+            path=self.path,
+            entry_type=self.entry_type,
+            size=self.size,
+            digest=self.digest,
+            link=self.link,
+        )
+
+
+class ImageManifest(pydantic.BaseModel):
+    image_tag: str
+    entries: list[ImageEntry]
+
+    @staticmethod
+    def from_core(obj: core.ImageManifest) -> 'ImageManifest':
+        return ImageManifest(
+            image_tag=obj.image_tag,
+            entries=[ImageEntry.from_core(entry) for entry in obj.entries],
+        )
+
+    def to_core(self) -> core.ImageManifest:
+        return core.ImageManifest(
+            image_tag=self.image_tag,
+            entries=[entry.to_core() for entry in self.entries],
+        )
+
+
 class ImagePushRequest(pydantic.BaseModel):
     task_type: core.TaskType
     subtask_type: core.SubtaskType
+    registry: core.Registry = core.Registry.DOCKER_HUB
 
 
 class ImagePushResponse(common_web.BaseResponse):
@@ -75,6 +123,7 @@ class ImagePushStatusResponse(common_web.BaseResponse):
 
 class ImagePullRequest(pydantic.BaseModel):
     image_tag: str
+    source_url: Optional[str] = None
 
 
 class ImagePullResponse(common_web.BaseResponse):
@@ -91,10 +140,21 @@ class ImagePullStatusResponse(common_web.BaseResponse):
     pulling_status: core.ImageStatus
 
 
+class GetImageManifestRequest(pydantic.BaseModel):
+    image_tag: str
+
+
+class GetImageManifestResponse(common_web.BaseResponse):
+    manifest: Optional[ImageManifest]
+
+
 class ContainerRunRequest(pydantic.BaseModel):
     image_tag: str
     subtask_uid: pydantic.UUID4
     input_files: list[pydantic.FilePath]
+    cpus: Optional[pydantic.PositiveInt] = None
+    memory: Optional[pydantic.PositiveInt] = None
+    timeout: Optional[pydantic.PositiveFloat] = None
 
 
 class ContainerRunResponse(common_web.BaseResponse):
@@ -111,6 +171,15 @@ class ContainerStatusResponse(common_web.BaseResponse):
     running_status: core.SubtaskStatus
 
 
+class ContainerCancelRequest(pydantic.BaseModel):
+    subtask_uid: pydantic.UUID4
+
+
+class ContainerCancelResponse(common_web.BaseResponse):
+    subtask_uid: pydantic.UUID4
+    running_status: Optional[core.SubtaskStatus]
+
+
 class ContainerResultRequest(pydantic.BaseModel):
     subtask_uid: pydantic.UUID4
 
@@ -1,8 +1,11 @@
+import contextlib
 import dataclasses
 import enum
 import json
+import os
 import pathlib
-from typing import Any
+import time
+from typing import Any, Iterator
 from typing import Type
 
 import dacite
@@ -13,6 +16,9 @@ import sklearn.model_selection
 import sklearn.preprocessing
 import sklearn.tree
 
+PHASES: list[dict[str, Any]] = []
+COMPRESSED_SUFFIXES = ('.zst', '.gz')
+
 
 @dataclasses.dataclass
 class Input:
@@ -57,6 +63,21 @@ def write_output(output: Output) -> None:
     pathlib.Path('output/result.json').write_text(data)
 
 
+def write_phases() -> None:
+    if 'TRACEPARENT' not in os.environ:
+        return
+    pathlib.Path('output/spans.json').write_text(json.dumps(PHASES))
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    start = time.time()
+    try:
+        yield
+    finally:
+        PHASES.append({'name': name, 'start': start, 'end': time.time()})
+
+
 def preprocess_df(
     df: pandas.DataFrame,
     dataset_config: DatasetConfig,
@@ -70,9 +91,22 @@ def preprocess_df(
     return df
 
 
+def get_dataset_path(path: str) -> pathlib.Path:
+    dataset_path = pathlib.Path('input') / path
+    if dataset_path.exists():
+        return dataset_path
+    for suffix in COMPRESSED_SUFFIXES:
+        compressed_path = dataset_path.with_name(dataset_path.name + suffix)
+        if compressed_path.exists():
+            return compressed_path
+    return dataset_path
+
+
 def get_dataframe(config: Input) -> pd.DataFrame:
-    df = pandas.read_csv(f'input/{config.dataset_config.path}')
-    df = preprocess_df(df, config.dataset_config)
+    with phase('dataset_reading'):
+        df = pandas.read_csv(get_dataset_path(config.dataset_config.path))
+    with phase('preprocessing'):
+        df = preprocess_df(df, config.dataset_config)
     return df
 
 
@@ -116,7 +150,10 @@ def get_models_scores(config: Input, df: pandas.DataFrame) -> list[dict]:
     )
     result = []
     for params_set in config.subtask_params:
-        f1_score = get_model_score(model_class, separated_data, params_set)
+        with phase('model_fitting'):
+            f1_score = get_model_score(
+                model_class, separated_data, params_set,
+            )
         result.append({'params': params_set, 'f1_score': f1_score})
     return result
 
@@ -127,6 +164,7 @@ def main():
     scores = get_models_scores(config, df)
     result = Output(result=scores)
     write_output(result)
+    write_phases()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,98 @@
+import json
+import pathlib
+import time
+from typing import Optional
+import uuid
+
+import pytest
+
+import src.benchmarks.fakes as fakes
+import src.common.backend.db as database
+import src.env_controller.backend.repositories as repositories
+import src.env_controller.models.core as core
+import src.env_controller.models.db as db_models
+
+STATUS_POLLING_DELAY = 0.01
+IMAGE_TAG = 'distcalcanonymous/grid_search:1'
+
+
+def make_service(
+    db_path: pathlib.Path, workload: fakes.Workload,
+) -> fakes.FakeDockerService:
+    db = database.DB(db_name=str(db_path), base=db_models.Base)
+    service = fakes.FakeDockerService(
+        repositories.ImageRepository(db=db),
+        repositories.SubtaskRepository(db=db),
+    )
+    service.client = fakes.FakeDockerClient(workload)
+    return service
+
+
+def run_container(
+    service: fakes.FakeDockerService,
+    runtime_dir: pathlib.Path,
+    timeout: Optional[float] = None,
+) -> core.Subtask:
+    image = core.Image(
+        image_tag=IMAGE_TAG, image_id=None, status=core.ImageStatus.PULLED,
+    )
+    service.image_repository.upsert_entity(image)
+    subtask = core.Subtask(
+        subtask_uid=uuid.uuid4(),
+        image=image,
+        container_id=None,
+        status=core.SubtaskStatus.CREATING,
+    )
+    service.subtask_repository.create_entity(subtask)
+    input_path = runtime_dir / 'input'
+    input_path.mkdir(parents=True)
+    (input_path / 'config.json').write_text(
+        json.dumps({'subtask_params': [{}]}),
+    )
+    return service.run_container(
+        subtask, input_path, runtime_dir / 'output', cpus=1, timeout=timeout,
+    )
+
+
+def wait_finished(
+    service: fakes.FakeDockerService, subtask_uid: uuid.UUID,
+) -> core.SubtaskStatus:
+    status = core.SubtaskStatus.RUNNING
+    while status == core.SubtaskStatus.RUNNING:
+        time.sleep(STATUS_POLLING_DELAY)
+        status = service.subtask_repository.get_entity(subtask_uid).status
+    return status
+
+
+@pytest.mark.parametrize('timeout', [None, 0.05])
+def test_run_container_returns_while_container_is_running(
+    tmp_path: pathlib.Path, timeout: Optional[float],
+):
+    service = make_service(
+        tmp_path / 'env.sqlite', fakes.Workload(container_seconds=0.1),
+    )
+    subtask = run_container(service, tmp_path / 'subtask', timeout)
+    assert subtask.status == core.SubtaskStatus.RUNNING
+    expected = (
+        core.SubtaskStatus.SUCCESS
+        if timeout is None
+        else core.SubtaskStatus.TIMEOUT
+    )
+    assert wait_finished(service, subtask.subtask_uid) == expected
+    assert not service.running
+    assert not any(service.cpu_allocator.usage.values())
+
+
+def test_cancel_container_frees_resources_immediately(tmp_path: pathlib.Path):
+    service = make_service(
+        tmp_path / 'env.sqlite', fakes.Workload(container_seconds=60.0),
+    )
+    subtask = run_container(service, tmp_path / 'subtask')
+    assert service.cancel_container(subtask.subtask_uid)
+    assert service.subtask_repository.get_entity(
+        subtask.subtask_uid,
+    ).status == core.SubtaskStatus.CANCELLED
+    assert not service.running
+    assert not any(service.cpu_allocator.usage.values())
+    assert not (tmp_path / 'subtask' / 'input').exists()
+    assert not service.cancel_container(subtask.subtask_uid)
@@ -0,0 +1,144 @@
+import concurrent.futures
+import pathlib
+import threading
+import time
+
+import pytest
+
+import src.benchmarks.fakes as fakes
+import src.common.backend.db as database
+import src.env_controller.backend.repositories as repositories
+import src.env_controller.backend.services as services
+import src.env_controller.models.core as core
+import src.env_controller.models.db as db_models
+
+STATUS_POLLING_DELAY = 0.01
+
+
+class CountingImages(fakes.FakeImages):
+    def __init__(self, workload: fakes.Workload):
+        super().__init__(workload)
+        self.builds = 0
+        self.pushes = 0
+
+    def build(self, path: str, tag: str) -> tuple[fakes.FakeImage, list]:
+        self.builds += 1
+        return super().build(path, tag)
+
+    def push(self, repository: str):
+        self.pushes += 1
+        super().push(repository)
+
+
+def make_service(
+    db_path: pathlib.Path, images: CountingImages,
+) -> services.ImageService:
+    db = database.DB(db_name=str(db_path), base=db_models.Base)
+    image_repository = repositories.ImageRepository(db=db)
+    docker_service = fakes.FakeDockerService(
+        image_repository, repositories.SubtaskRepository(db=db),
+    )
+    docker_service.client.images = images
+    return services.ImageService(image_repository, docker_service)
+
+
+def wait_pushed(service: services.ImageService, image_tag: str):
+    while service.get_image_status(image_tag) != core.ImageStatus.PUSHED:
+        time.sleep(STATUS_POLLING_DELAY)
+
+
+@pytest.fixture
+def images() -> CountingImages:
+    fakes.FakeRegistry.images.clear()
+    return CountingImages(fakes.Workload(image_seconds=0.05))
+
+
+def test_concurrent_requests_share_one_build(
+    tmp_path: pathlib.Path, images: CountingImages, monkeypatch,
+):
+    hashes = []
+    dirhash = services.execution.checksumdir.dirhash
+    monkeypatch.setattr(
+        services.execution.checksumdir, 'dirhash',
+        lambda *args, **kwargs: hashes.append(args) or dirhash(
+            *args, **kwargs,
+        ),
+    )
+    service = make_service(tmp_path / 'env.sqlite', images)
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        tags = set(
+            executor.map(
+                lambda _: service.build_and_push(
+                    core.TaskType.GRID_SEARCH, core.SubtaskType.GRID_SEARCH,
+                ).image_tag,
+                range(4),
+            )
+        )
+    assert len(tags) == 1
+    wait_pushed(service, *tags)
+    service.build_and_push(
+        core.TaskType.GRID_SEARCH, core.SubtaskType.GRID_SEARCH,
+    )
+    assert (images.builds, images.pushes) == (1, 1)
+    assert len(hashes) == 1
+
+
+def test_image_found_locally_is_not_rebuilt(
+    tmp_path: pathlib.Path, images: CountingImages,
+):
+    service = make_service(tmp_path / 'first.sqlite', images)
+    image = service.build_and_push(
+        core.TaskType.GRID_SEARCH, core.SubtaskType.GRID_SEARCH,
+    )
+    wait_pushed(service, image.image_tag)
+    restarted = make_service(tmp_path / 'second.sqlite', images)
+    restarted.build_and_push(
+        core.TaskType.GRID_SEARCH, core.SubtaskType.GRID_SEARCH,
+    )
+    wait_pushed(restarted, image.image_tag)
+    assert (images.builds, images.pushes) == (1, 1)
+
+
+def test_hub_image_is_saved_for_peer_registry(
+    tmp_path: pathlib.Path, images: CountingImages,
+):
+    service = make_service(tmp_path / 'env.sqlite', images)
+    image = service.build_and_push(
+        core.TaskType.GRID_SEARCH, core.SubtaskType.GRID_SEARCH,
+    )
+    wait_pushed(service, image.image_tag)
+    assert service.get_image_manifest(image.image_tag) is None
+    service.build_and_push(
+        core.TaskType.GRID_SEARCH, core.SubtaskType.GRID_SEARCH,
+        registry=core.Registry.PEER,
+    )
+    wait_pushed(service, image.image_tag)
+    assert service.get_image_manifest(image.image_tag) is not None
+    service.build_and_push(
+        core.TaskType.GRID_SEARCH, core.SubtaskType.GRID_SEARCH,
+        registry=core.Registry.PEER,
+    )
+    assert (images.builds, images.pushes) == (1, 1)
+
+
+def test_pulls_of_different_tags_do_not_wait_for_each_other(
+    tmp_path: pathlib.Path, images: CountingImages, monkeypatch,
+):
+    service = make_service(tmp_path / 'env.sqlite', images)
+    release = threading.Event()
+    pulled = []
+
+    def pull_image(image_tag: str, source_url=None):
+        if image_tag == 'slow':
+            release.wait()
+        pulled.append(image_tag)
+
+    monkeypatch.setattr(service.docker_service, 'pull_image', pull_image)
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        slow = executor.submit(service.pull_image, 'slow')
+        executor.submit(service.pull_image, 'fast').result(timeout=5)
+        assert pulled == ['fast']
+        release.set()
+        slow.result(timeout=5)
+    assert pulled == ['fast', 'slow']
+    assert service.image_locks == {}
@@ -0,0 +1,75 @@
+import io
+import pathlib
+import tarfile
+
+import src.env_controller.backend.image_store as image_store
+import src.env_controller.models.core as core
+
+TAG = 'distcalcanonymous/grid_search:1'
+NEXT_TAG = 'distcalcanonymous/grid_search:2'
+BASE_LAYER = b'base layer ' * 10000
+
+
+def make_archive(layers: dict[str, bytes]) -> list[bytes]:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as archive:
+        for name, content in layers.items():
+            folder = tarfile.TarInfo(name)
+            folder.type = tarfile.DIRTYPE
+            archive.addfile(folder)
+            info = tarfile.TarInfo(f'{name}/layer.tar')
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+        link = tarfile.TarInfo('latest')
+        link.type = tarfile.SYMTYPE
+        link.linkname = next(iter(layers))
+        archive.addfile(link)
+    data = buffer.getvalue()
+    return [data[i:i + 1000] for i in range(0, len(data), 1000)]
+
+
+def read_members(data: bytes) -> dict[str, bytes | str | None]:
+    members = {}
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        for member in archive:
+            if member.isfile():
+                members[member.name] = archive.extractfile(member).read()
+            elif member.issym():
+                members[member.name] = member.linkname
+            else:
+                members[member.name] = None
+    return members
+
+
+def test_fetch_transfers_only_missing_layers(tmp_path: pathlib.Path):
+    creator = image_store.ImageStore(tmp_path / 'creator')
+    executor = image_store.ImageStore(tmp_path / 'executor')
+    source = image_store.LocalImageSource(creator)
+    creator.save(TAG, make_archive({'base': BASE_LAYER}))
+    creator.save(
+        NEXT_TAG, make_archive({'base': BASE_LAYER, 'top': b'top layer'}),
+    )
+
+    manifest = executor.fetch(TAG, source)
+    assert [entry.entry_type for entry in manifest.entries] == [
+        core.ImageEntryType.DIRECTORY,
+        core.ImageEntryType.FILE,
+        core.ImageEntryType.SYMLINK,
+    ]
+    opened = []
+    open_blob = source.open_blob
+    source.open_blob = lambda digest: opened.append(digest) or open_blob(
+        digest,
+    )
+    next_manifest = executor.fetch(NEXT_TAG, source)
+    assert opened == [next_manifest.entries[3].digest]
+    assert executor.get_manifest(NEXT_TAG) == next_manifest
+
+
+def test_write_archive_restores_saved_members(tmp_path: pathlib.Path):
+    store = image_store.ImageStore(tmp_path / 'store')
+    chunks = make_archive({'base': BASE_LAYER, 'top': b'top layer'})
+    manifest = store.save(TAG, chunks)
+    archive = io.BytesIO()
+    store.write_archive(manifest, archive)
+    assert read_members(archive.getvalue()) == read_members(b''.join(chunks))
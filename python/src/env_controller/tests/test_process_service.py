@@ -0,0 +1,183 @@
+import json
+import pathlib
+import time
+from typing import Iterator, Optional
+import uuid
+
+import pytest
+
+import src.common.backend.db as database
+import src.env_controller.backend.execution_service as execution
+import src.env_controller.backend.process_service as process
+import src.env_controller.backend.repositories as repositories
+import src.env_controller.models.core as core
+import src.env_controller.models.db as db_models
+
+STATUS_POLLING_DELAY = 0.01
+MEMORY_LIMIT = 1024 ** 3
+SUBTASK_SCRIPT = '''
+import json
+import os
+import pathlib
+import time
+
+config = json.loads(pathlib.Path('input/config.json').read_text())
+time.sleep(config['seconds'])
+bytearray(config['allocate'])
+if config['fail']:
+    raise SystemExit(3)
+pathlib.Path('output/result.json').write_text(
+    json.dumps({'pid': os.getpid(), 'cpus': sorted(os.sched_getaffinity(0))}),
+)
+'''
+
+
+@pytest.fixture
+def service(tmp_path: pathlib.Path) -> Iterator[process.ProcessService]:
+    db = database.DB(db_name=str(tmp_path / 'env.sqlite'), base=db_models.Base)
+    service = process.ProcessService(
+        repositories.ImageRepository(db=db),
+        repositories.SubtaskRepository(db=db),
+    )
+    yield service
+    for worker in service.workers:
+        worker.close()
+
+
+@pytest.fixture
+def subtask_folder(tmp_path: pathlib.Path) -> pathlib.Path:
+    folder = tmp_path / 'tasks' / 'grid_search' / 'subtasks' / 'grid_search'
+    (folder / 'src').mkdir(parents=True)
+    (folder / 'src' / 'subtask.py').write_text(SUBTASK_SCRIPT)
+    return folder
+
+
+def run_subtask(
+    service: process.ProcessService,
+    subtask_folder: pathlib.Path,
+    runtime_dir: pathlib.Path,
+    seconds: float = 0.0,
+    fail: bool = False,
+    allocate: int = 0,
+    memory: Optional[int] = None,
+) -> core.Subtask:
+    image = service.build_and_push_image(
+        subtask_folder, 'distcalcanonymous/grid_search:1',
+    )
+    subtask = core.Subtask(
+        subtask_uid=uuid.uuid4(),
+        image=image,
+        container_id=None,
+        status=core.SubtaskStatus.CREATING,
+    )
+    service.subtask_repository.create_entity(subtask)
+    input_path = runtime_dir / 'input'
+    input_path.mkdir(parents=True)
+    (input_path / 'config.json').write_text(
+        json.dumps({'seconds': seconds, 'fail': fail, 'allocate': allocate}),
+    )
+    return service.run_container(
+        subtask, input_path, runtime_dir / 'output', cpus=1, memory=memory,
+    )
+
+
+def wait_finished(
+    service: process.ProcessService, subtask_uid: uuid.UUID,
+) -> core.SubtaskStatus:
+    status = core.SubtaskStatus.RUNNING
+    while status == core.SubtaskStatus.RUNNING:
+        time.sleep(STATUS_POLLING_DELAY)
+        status = service.subtask_repository.get_entity(subtask_uid).status
+    return status
+
+
+def test_subtasks_reuse_pinned_worker(
+    tmp_path: pathlib.Path,
+    service: process.ProcessService,
+    subtask_folder: pathlib.Path,
+):
+    results = []
+    for i in range(2):
+        runtime_dir = tmp_path / f'subtask_{i}'
+        subtask = run_subtask(service, subtask_folder, runtime_dir)
+        status = wait_finished(service, subtask.subtask_uid)
+        assert status == core.SubtaskStatus.SUCCESS
+        results.append(
+            json.loads((runtime_dir / 'output' / 'result.json').read_text()),
+        )
+    assert results[0]['pid'] == results[1]['pid']
+    assert len(results[0]['cpus']) == 1
+    assert not any(service.cpu_allocator.usage.values())
+
+
+def test_failed_subtask_reports_error(
+    tmp_path: pathlib.Path,
+    service: process.ProcessService,
+    subtask_folder: pathlib.Path,
+):
+    subtask = run_subtask(
+        service, subtask_folder, tmp_path / 'subtask', fail=True,
+    )
+    status = wait_finished(service, subtask.subtask_uid)
+    assert status == core.SubtaskStatus.ERROR
+    assert len(service.workers) == 1
+
+
+def test_memory_limit_is_enforced_per_subtask(
+    tmp_path: pathlib.Path,
+    service: process.ProcessService,
+    subtask_folder: pathlib.Path,
+):
+    statuses = [
+        wait_finished(
+            service,
+            run_subtask(
+                service, subtask_folder, tmp_path / f'subtask_{i}',
+                allocate=allocate, memory=MEMORY_LIMIT,
+            ).subtask_uid,
+        )
+        for i, allocate in enumerate((2 * MEMORY_LIMIT, 0))
+    ]
+    assert statuses == [core.SubtaskStatus.ERROR, core.SubtaskStatus.SUCCESS]
+    unlimited = run_subtask(
+        service, subtask_folder, tmp_path / 'unlimited',
+        allocate=2 * MEMORY_LIMIT,
+    )
+    assert wait_finished(
+        service, unlimited.subtask_uid,
+    ) == core.SubtaskStatus.SUCCESS
+    assert len(service.workers) == 1
+
+
+def test_cancel_kills_worker(
+    tmp_path: pathlib.Path,
+    service: process.ProcessService,
+    subtask_folder: pathlib.Path,
+):
+    subtask = run_subtask(
+        service, subtask_folder, tmp_path / 'subtask', seconds=60.0,
+    )
+    assert service.cancel_container(subtask.subtask_uid)
+    assert service.subtask_repository.get_entity(
+        subtask.subtask_uid,
+    ).status == core.SubtaskStatus.CANCELLED
+    assert not service.workers
+    assert not any(service.cpu_allocator.usage.values())
+
+
+def test_pull_resolves_folder_by_checksum(
+    tmp_path: pathlib.Path,
+    service: process.ProcessService,
+    subtask_folder: pathlib.Path,
+    monkeypatch,
+):
+    monkeypatch.setattr(process, 'TASKS_PATH', tmp_path / 'tasks')
+    checksum = execution.get_folder_checksum(subtask_folder)
+    bytecode = subtask_folder / 'src' / '__pycache__' / 'subtask.pyc'
+    bytecode.parent.mkdir()
+    bytecode.write_bytes(b'stray bytecode')
+    image = service.pull_image(f'distcalcanonymous/grid_search:{checksum}')
+    assert image.status == core.ImageStatus.PULLED
+    assert image.image_id == str(subtask_folder)
+    image = service.pull_image('distcalcanonymous/grid_search:outdated')
+    assert image.status == core.ImageStatus.PULLING_ERROR
@@ -0,0 +1,284 @@
+import asyncio
+import contextlib
+import dataclasses
+import datetime
+import math
+import pathlib
+import random
+import time
+from typing import Iterable, Optional
+import uuid
+
+import fastapi
+
+import src.common.backend.db as database
+import src.common.models.web as common_web
+import src.node_controller.backend.repositories as repositories
+import src.node_controller.backend.services as services
+import src.node_controller.client.client as node_client
+import src.node_controller.models.core as models
+import src.node_controller.models.web as web
+
+PROTOCOL_PERIOD = 0.5
+PING_TIMEOUT = 0.2
+PROBE_TIMEOUT = 0.4
+INDIRECT_PROBES = 3
+SUSPICION_TIMEOUT = 3.0
+RETRANSMIT_MULTIPLIER = 3
+MAX_PIGGYBACK = 8
+PROBED_STATUSES = (models.NodeStatus.ACTIVE, models.NodeStatus.SUSPECT)
+STATUS_PRECEDENCE = {
+    models.NodeStatus.UNKNOWN: 0,
+    models.NodeStatus.ACTIVE: 1,
+    models.NodeStatus.SUSPECT: 2,
+    models.NodeStatus.INACTIVE: 3,
+}
+
+
+def supersedes(update: models.Node, current: Optional[models.Node]) -> bool:
+    if current is None:
+        return True
+    if update.incarnation != current.incarnation:
+        return update.incarnation > current.incarnation
+    return (
+        STATUS_PRECEDENCE[update.status] > STATUS_PRECEDENCE[current.status]
+    )
+
+
+class GossipService:
+    def __init__(
+        self,
+        repository: repositories.NodeRepository,
+        node_service: services.NodeService,
+    ):
+        self.repository = database.AsyncRepository(repository)
+        self.node_service = node_service
+        self.node: Optional[models.Node] = None
+        self.broadcasts: dict[uuid.UUID, tuple[models.Node, int]] = {}
+        self.suspicions: dict[uuid.UUID, float] = {}
+        self.probe_order: list[uuid.UUID] = []
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self, config_path: pathlib.Path):
+        self.node = self.node_service.get_self_node(config_path)
+        self.node.incarnation = time.time_ns() // 1_000_000
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.task
+        self.task = None
+
+    async def handle_gossip(
+        self, updates: Iterable[models.Node],
+    ) -> list[models.Node]:
+        await self.merge(updates)
+        return self._get_updates()
+
+    async def handle_probe(
+        self, target: models.Node, updates: Iterable[models.Node],
+    ) -> tuple[bool, list[models.Node]]:
+        await self.merge(updates)
+        acknowledged = await self._ping(target)
+        return acknowledged, self._get_updates()
+
+    async def merge(self, updates: Iterable[models.Node]):
+        async with self.lock:
+            known = {
+                node.node_uid: node
+                for node in await self.repository.get_entities()
+            }
+            changed: list[models.Node] = []
+            for update in updates:
+                if self.node is not None and (
+                    update.node_uid == self.node.node_uid
+                ):
+                    self._refute(update)
+                    continue
+                current = known.get(update.node_uid)
+                if not supersedes(update, current):
+                    continue
+                if current is None or current.status != update.status:
+                    print(
+                        f'node {update.node_uid} is {update.status.value}, '
+                        f'incarnation {update.incarnation}'
+                    )
+                known[update.node_uid] = update
+                changed.append(update)
+                self._broadcast(update, len(known))
+                if update.status == models.NodeStatus.SUSPECT:
+                    self.suspicions[update.node_uid] = (
+                        time.monotonic() + SUSPICION_TIMEOUT
+                    )
+                else:
+                    self.suspicions.pop(update.node_uid, None)
+            await self.repository.upsert_entities(changed)
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                await self._probe_round()
+            except Exception as error:
+                print(f'gossip round has failed: {error!r}')
+            await asyncio.sleep(
+                max(0.0, PROTOCOL_PERIOD - (time.monotonic() - started)),
+            )
+
+    async def _probe_round(self):
+        await self._expire_suspicions()
+        target = await self._next_target()
+        if target is None:
+            return
+        if await self._ping(target):
+            return
+        if await self._probe_indirectly(target):
+            return
+        await self.merge(
+            [dataclasses.replace(target, status=models.NodeStatus.SUSPECT)],
+        )
+
+    async def _get_members(self) -> list[models.Node]:
+        return [
+            node
+            for node in await self.repository.get_entities()
+            if node.node_uid != self.node.node_uid and
+            node.status in PROBED_STATUSES
+        ]
+
+    async def _next_target(self) -> Optional[models.Node]:
+        members = {node.node_uid: node for node in await self._get_members()}
+        while self.probe_order:
+            target = members.get(self.probe_order.pop())
+            if target is not None:
+                return target
+        self.probe_order = list(members)
+        random.shuffle(self.probe_order)
+        if not self.probe_order:
+            return None
+        return members[self.probe_order.pop()]
+
+    async def _ping(self, target: models.Node) -> bool:
+        updates = await self._get_client(target).gossip(
+            self._get_updates(), timeout=PING_TIMEOUT,
+        )
+        if updates is None:
+            return False
+        await self.merge(updates)
+        return True
+
+    async def _probe_indirectly(self, target: models.Node) -> bool:
+        helpers = [
+            node
+            for node in await self._get_members()
+            if node.status == models.NodeStatus.ACTIVE and
+            node.node_uid != target.node_uid
+        ]
+        helpers = random.sample(helpers, min(INDIRECT_PROBES, len(helpers)))
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(
+                    self._get_client(helper).probe_node(
+                        target, self._get_updates(), timeout=PROBE_TIMEOUT,
+                    )
+                )
+                for helper in helpers
+            ]
+        acknowledged = False
+        for task in tasks:
+            if task.result() is None:
+                continue
+            helper_acknowledged, updates = task.result()
+            await self.merge(updates)
+            acknowledged = acknowledged or helper_acknowledged
+        return acknowledged
+
+    async def _expire_suspicions(self):
+        now = time.monotonic()
+        expired = {
+            node_uid
+            for node_uid, deadline in self.suspicions.items()
+            if deadline <= now
+        }
+        if not expired:
+            return
+        await self.merge(
+            [
+                dataclasses.replace(node, status=models.NodeStatus.INACTIVE)
+                for node in await self.repository.get_entities()
+                if node.node_uid in expired and
+                node.status == models.NodeStatus.SUSPECT
+            ]
+        )
+        for node_uid in expired:
+            self.suspicions.pop(node_uid, None)
+
+    def _refute(self, update: models.Node):
+        if update.status == models.NodeStatus.ACTIVE:
+            return
+        if update.incarnation < self.node.incarnation:
+            return
+        self.node.incarnation = update.incarnation + 1
+        print(
+            f'refuting {update.status.value} state, '
+            f'incarnation {self.node.incarnation}'
+        )
+
+    def _broadcast(self, node: models.Node, members: int):
+        transmissions = RETRANSMIT_MULTIPLIER * math.ceil(
+            math.log2(members + 2),
+        )
+        self.broadcasts[node.node_uid] = (node, transmissions)
+
+    def _get_updates(self) -> list[models.Node]:
+        selected = sorted(
+            self.broadcasts.values(),
+            key=lambda broadcast: broadcast[1],
+            reverse=True,
+        )[:MAX_PIGGYBACK]
+        for node, transmissions in selected:
+            if transmissions > 1:
+                self.broadcasts[node.node_uid] = (node, transmissions - 1)
+            else:
+                del self.broadcasts[node.node_uid]
+        updates = [node for node, _ in selected]
+        if self.node is not None:
+            self.node.last_ping = datetime.datetime.now()
+            updates.insert(0, self.node)
+        return updates
+
+    @staticmethod
+    def _get_client(node: models.Node) -> node_client.NodeControllerClient:
+        return node_client.NodeControllerClient().set_server(
+            ipv4_address=node.ipv4_address, port=node.port,
+        )
+
+
+def add_routes(app: fastapi.FastAPI, gossip_service: GossipService):
+    @app.post('/nodes/gossip')
+    async def gossip(request: web.GossipRequest) -> web.GossipResponse:
+        updates = await gossip_service.handle_gossip(
+            [node.to_core() for node in request.updates],
+        )
+        return web.GossipResponse(
+            status=common_web.ResponseStatus.SUCCESS,
+            updates=[web.Node.from_core(node) for node in updates],
+        )
+
+    @app.post('/nodes/gossip/probe')
+    async def gossip_probe(
+        request: web.GossipProbeRequest,
+    ) -> web.GossipProbeResponse:
+        acknowledged, updates = await gossip_service.handle_probe(
+            request.target.to_core(),
+            [node.to_core() for node in request.updates],
+        )
+        return web.GossipProbeResponse(
+            status=common_web.ResponseStatus.SUCCESS,
+            acknowledged=acknowledged,
+            updates=[web.Node.from_core(node) for node in updates],
+        )
@@ -1,34 +1,38 @@
+import threading
 from typing import Iterable, Optional
 import uuid
 
 import sqlalchemy as sql
+import sqlalchemy.orm as orm
 
 import src.common.backend.db as database
 import src.node_controller.models.core as core
 import src.node_controller.models.db as db_models
 
+NODE_VERSION_NAME = 'node'
+
 
 class NodeRepository:
     def __init__(self, db: database.DB):
         self.db = db
+        self.version_lock = threading.Lock()
 
     def create_entity(self, entity: core.Node):
-        with self.db.create_session() as session:
+        with self.version_lock, self.db.begin() as session:
             node: db_models.Node = db_models.Node.from_core(entity)
+            node.version = self._reserve_versions(session, 1) + 1
             session.add(node)
-            session.commit()
 
     def delete_entity(self, uid: uuid.UUID):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             node: Optional[db_models.Node] = session.query(
                 db_models.Node
             ).where(db_models.Node.node_uid == str(uid)).first()
             if node is not None:
                 session.delete(node)
-                session.commit()
 
     def update_entity(self, entity: core.Node):
-        with self.db.create_session() as session:
+        with self.version_lock, self.db.begin() as session:
             node = db_models.Node.from_core(entity)
             stmt = sql.update(
                 db_models.Node
@@ -40,12 +44,13 @@ class NodeRepository:
                 role=node.role,
                 status=node.status,
                 last_ping=node.last_ping,
+                incarnation=node.incarnation,
+                version=self._reserve_versions(session, 1) + 1,
             )
             session.execute(stmt)
-            session.commit()
 
     def get_entity(self, uid: uuid.UUID) -> core.Node:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             node: Optional[db_models.Node] = session.query(
                 db_models.Node
             ).where(db_models.Node.node_uid == str(uid)).first()
@@ -57,25 +62,60 @@ class NodeRepository:
         self,
         role: Optional[core.NodeRole] = None,
         status: Optional[core.NodeStatus] = None,
+        since_version: Optional[int] = None,
     ) -> Iterable[core.Node]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             stmt = sql.select(db_models.Node)
             if role is not None:
                 stmt = stmt.where(db_models.Node.role == role.value)
             if status is not None:
                 stmt = stmt.where(db_models.Node.status == status.value)
+            if since_version:
+                stmt = stmt.where(db_models.Node.version > since_version)
             nodes = session.scalars(stmt).all()
-        return [node.to_core() for node in nodes]
+            return [node.to_core() for node in nodes]
+
+    def get_changes(
+        self, since_version: int,
+    ) -> tuple[list[core.Node], int]:
+        with self.db.begin():
+            return (
+                list(self.get_entities(since_version=since_version)),
+                self.get_version(),
+            )
+
+    def get_version(self) -> int:
+        with self.db.begin() as session:
+            return self._get_version(session)
 
     def upsert_entity(self, entity: core.Node):
-        with self.db.create_session() as session:
-            node: Optional[db_models.Node] = session.query(
-                db_models.Node
-            ).where(
-                db_models.Node.node_uid == str(entity.node_uid)
-            ).first()
-        if node is None:
-            self.create_entity(entity)
-        else:
-            self.update_entity(entity)
+        self.upsert_entities([entity])
+
+    def upsert_entities(self, entities: Iterable[core.Node]):
+        with self.version_lock, self.db.begin() as session:
+            nodes = [db_models.Node.from_core(entity) for entity in entities]
+            version = self._reserve_versions(session, len(nodes))
+            for node in nodes:
+                version += 1
+                node.version = version
+            database.upsert(session, nodes)
 
+    @staticmethod
+    def _get_version(session: orm.Session) -> int:
+        counter: Optional[db_models.NodeVersion] = session.get(
+            db_models.NodeVersion, NODE_VERSION_NAME,
+        )
+        if counter is not None:
+            return counter.value
+        return session.scalar(
+            sql.select(sql.func.max(db_models.Node.version)),
+        ) or 0
+
+    def _reserve_versions(self, session: orm.Session, count: int) -> int:
+        version = self._get_version(session)
+        session.merge(
+            db_models.NodeVersion(
+                name=NODE_VERSION_NAME, value=version + count,
+            )
+        )
+        return version
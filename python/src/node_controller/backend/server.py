@@ -2,11 +2,13 @@ import contextlib
 import logging
 import pathlib
 
-import aiocron
 import fastapi
 
 import src.common.models.web as common_web
 import src.common.backend.db as database
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
+import src.node_controller.backend.gossip_service as gossip
 import src.node_controller.backend.services as services
 import src.node_controller.backend.network_service as network
 import src.node_controller.backend.repositories as repositories
@@ -32,11 +34,15 @@ async def lifespan(app: fastapi.FastAPI):
         )
     )
     await node_service.notify_node_enabled(node_service.config_path)
+    gossip_service.start(node_service.config_path)
     yield
+    await gossip_service.stop()
     network_service.remove_rule(local_port=8000, public_port=public_port)
 
 
 app = fastapi.FastAPI(lifespan=lifespan)
+metrics.instrument_app(app, service='node_controller')
+tracing.instrument_app(app, service='node_controller')
 db_name = str(
     pathlib.Path(__file__).parent.parent / 'db' / 'node_controller.sqlite',
 )
@@ -45,6 +51,8 @@ db = database.DB(db_name=db_name, base=db_models.Base)
 node_repository = repositories.NodeRepository(db)
 network_service = network.NetworkService()
 node_service = services.NodeService(node_repository, network_service)
+gossip_service = gossip.GossipService(node_repository, node_service)
+gossip.add_routes(app, gossip_service)
 
 
 @app.get('/ping')
@@ -53,13 +61,13 @@ async def ping():
 
 
 @app.post('/nodes/active')
-async def nodes_active() -> models.Nodes:
+def nodes_active() -> models.Nodes:
     nodes = node_service.get_active_nodes()
     return models.Nodes(nodes=[models.Node.from_core(node) for node in nodes])
 
 
 @app.post('/nodes/handshake')
-async def nodes_handshake(
+def nodes_handshake(
     request: models.HandshakeRequest,
 ) -> models.HandshakeResponse:
     this_node = node_service.handle_handshake(
@@ -78,19 +86,21 @@ async def nodes_handshake(
 
 
 @app.post('/nodes/exchange')
-async def nodes_exchange(
+def nodes_exchange(
     request: models.ExchangeRequest,
 ) -> models.ExchangeResponse:
-    nodes = node_service.exchange_nodes(
+    nodes, version = node_service.exchange_nodes(
         nodes=[node.to_core() for node in request.nodes],
+        since_version=request.since_version,
     )
     return models.ExchangeResponse(
-        nodes=[models.Node.from_core(node) for node in nodes]
+        nodes=[models.Node.from_core(node) for node in nodes],
+        version=version,
     )
 
 
 @app.post('/nodes/join')
-async def nodes_join(request: models.JoinRequest) -> models.JoinResponse:
+def nodes_join(request: models.JoinRequest) -> models.JoinResponse:
     new_node = node_service.create_node(
         ipv4_address=request.ip,
         port=request.port,
@@ -100,7 +110,7 @@ async def nodes_join(request: models.JoinRequest) -> models.JoinResponse:
 
 
 @app.post('/nodes/leave')
-async def nodes_leave(request: models.LeaveRequest) -> models.LeaveResponse:
+def nodes_leave(request: models.LeaveRequest) -> models.LeaveResponse:
     node_service.delete_node(request.node_uid)
     return models.LeaveResponse(
         status=common_web.ResponseStatus.SUCCESS,
@@ -109,7 +119,7 @@ async def nodes_leave(request: models.LeaveRequest) -> models.LeaveResponse:
 
 
 @app.post('/nodes/enable')
-async def nodes_enable(request: models.EnableRequest) -> models.EnableResponse:
+def nodes_enable(request: models.EnableRequest) -> models.EnableResponse:
     node_service.enable_node(
         node_uid=request.node_uid,
         ipv4_address=request.ip,
@@ -119,20 +129,14 @@ async def nodes_enable(request: models.EnableRequest) -> models.EnableResponse:
 
 
 @app.post('/nodes/disable')
-async def nodes_disable(
+def nodes_disable(
     request: models.DisableRequest,
 ) -> models.DisableResponse:
     node_service.disable_node(node_uid=request.node_uid)
     return models.DisableResponse(status=common_web.ResponseStatus.SUCCESS)
 
 
-@aiocron.crontab('* * * * *')
-async def ping_active_nodes():
-    await node_service.update_nodes_status()
-
-
 if __name__ == '__main__':
     import uvicorn
 
-    ping_active_nodes.start()
     uvicorn.run(app, host='0.0.0.0', port=8000)
@@ -9,6 +9,7 @@ import ipaddress
 from typing import Iterable
 import uuid
 
+import src.common.backend.db as database
 import src.node_controller.models.core as models
 import src.node_controller.backend.repositories as repositories
 import src.node_controller.backend.network_service as network
@@ -25,6 +26,7 @@ class NodeService:
         network_service: network.NetworkService,
     ) -> None:
         self.repository = repository
+        self.async_repository = database.AsyncRepository(repository)
         self.node_client = node_client.NodeControllerClient()
         self.network_service = network_service
 
@@ -109,48 +111,15 @@ class NodeService:
         )
 
     def exchange_nodes(
-        self, nodes: Iterable[models.Node],
-    ) -> Iterable[models.Node]:
-        known_nodes = self.repository.get_entities()
-        known_nodes_keys = {node.node_uid for node in known_nodes}
-        for node in nodes:
-            if node.node_uid in known_nodes_keys:
-                self.repository.update_entity(node)
-            else:
-                self.repository.create_entity(node)
-        logger.info('exchanging nodes')
-        return known_nodes
-
-    async def update_nodes_status(self):
-        nodes = self.get_nodes()
-        async with asyncio.TaskGroup() as tg:
-            tasks = [
-                tg.create_task(
-                    self.node_client.set_server(
-                        node.ipv4_address, node.port
-                    ).ping_node()
-                )
-                for node in nodes
-            ]
-        node_statuses = [task.result() for task in tasks]
-        for i, node in enumerate(nodes):
-            new_status = node_statuses[i]
-            if node.status == new_status:
-                continue
-            if new_status == models.NodeStatus.INACTIVE:
-                logger.info(
-                    f'updating node({node.node_uid}) status: inactive',
-                )
-                self.disable_node(node_uid=node.node_uid)
-            elif new_status == models.NodeStatus.ACTIVE:
-                logger.info(
-                    f'updating node({node.node_uid}) status: active',
-                )
-                self.enable_node(
-                    node_uid=node.node_uid,
-                    ipv4_address=node.ipv4_address,
-                    port=node.port,
-                )
+        self, nodes: Iterable[models.Node], since_version: int = 0,
+    ) -> tuple[list[models.Node], int]:
+        changed_nodes, version = self.repository.get_changes(since_version)
+        self.repository.upsert_entities(nodes)
+        logger.info(
+            f'exchanging {len(changed_nodes)} nodes '
+            f'changed since version {since_version}'
+        )
+        return changed_nodes, version
 
     def get_self_node(self, config_path: pathlib.Path) -> models.Node:
         node_uid = self.get_self_node_uid(config_path)
@@ -195,11 +164,10 @@ class NodeService:
     def config_path(self) -> pathlib.Path:
         return pathlib.Path(__file__).parent.parent / 'config' / 'config.json'
 
-    def is_standalone(self) -> bool:
-        nodes = self.repository.get_entities()
-        nodes = [
-            node for node in nodes if node.role == models.NodeRole.REGISTRY
-        ]
+    async def is_standalone(self) -> bool:
+        nodes = await self.async_repository.get_entities(
+            role=models.NodeRole.REGISTRY,
+        )
         return not bool(nodes)
 
     async def discover_registry_nodes(self, config_path: pathlib.Path):
@@ -231,22 +199,21 @@ class NodeService:
                 print(
                     f'handshake with {registry_ip}:{registry_port} successful'
                 )
-                self.repository.upsert_entity(registry)
+                await self.async_repository.upsert_entity(registry)
             else:
                 print(f'handshake timeout {registry_ip}:{registry_port}')
-        if self.is_standalone():
+        if await self.is_standalone():
             print('no one registry not available, running in standalone mode')
             return
         print('registry nodes has been successfully finished')
 
     async def notify_node_enabled(self, config_path: pathlib.Path):
-        if self.is_standalone():
+        if await self.is_standalone():
             await self.discover_registry_nodes(config_path)
         self_node = self.get_self_node(config_path)
-        nodes = self.repository.get_entities()
-        registries = [
-            node for node in nodes if node.role == models.NodeRole.REGISTRY
-        ]
+        registries = await self.async_repository.get_entities(
+            role=models.NodeRole.REGISTRY,
+        )
         print(
             f'notifying {len(registries)} registries '
             f'about node {self_node.node_uid} enabled',
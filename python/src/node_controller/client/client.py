@@ -18,7 +18,9 @@ class NodeControllerClient(client_base.ClientBase):
         url = self.get_server_url('/ping')
         async with aiohttp.ClientSession() as session:
             try:
-                async with session.get(url, timeout=3) as response:
+                async with session.get(
+                    url, timeout=3, headers=self.get_headers(),
+                ) as response:
                     await response.json()
                     return models.NodeStatus.ACTIVE
             except asyncio.TimeoutError:
@@ -35,7 +37,10 @@ class NodeControllerClient(client_base.ClientBase):
         async with aiohttp.ClientSession() as session:
             try:
                 async with session.post(
-                    url, json=request_body, timeout=3,
+                    url,
+                    json=request_body,
+                    timeout=3,
+                    headers=self.get_headers(),
                 ) as response:
                     json = await response.json()
             except asyncio.TimeoutError:
@@ -53,23 +58,80 @@ class NodeControllerClient(client_base.ClientBase):
     async def get_active_nodes(self) -> list[models.Node]:
         url = self.get_server_url('/nodes/active')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json={}) as response:
+            async with session.post(
+                url, json={}, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.Nodes.model_validate(json)
         return [node.to_core() for node in response_body.nodes]
 
     async def exchange_nodes(
-        self, nodes: Iterable[models.Node],
-    ) -> list[models.Node]:
+        self, nodes: Iterable[models.Node], since_version: int = 0,
+    ) -> tuple[list[models.Node], int]:
         url = self.get_server_url('/nodes/exchange')
         request_body = web.ExchangeRequest(
             nodes=[web.Node.from_core(node) for node in nodes],
+            since_version=since_version,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.ExchangeResponse.model_validate(json)
-        return [node.to_core() for node in response_body.nodes]
+        return (
+            [node.to_core() for node in response_body.nodes],
+            response_body.version,
+        )
+
+    async def gossip(
+        self, updates: Iterable[models.Node], timeout: float,
+    ) -> Optional[list[models.Node]]:
+        url = self.get_server_url('/nodes/gossip')
+        request_body = web.GossipRequest(
+            updates=[web.Node.from_core(node) for node in updates],
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            try:
+                async with session.post(
+                    url,
+                    json=request_body,
+                    timeout=timeout,
+                    headers=self.get_headers(),
+                ) as response:
+                    json = await response.json()
+            except (asyncio.TimeoutError, aiohttp.ClientError):
+                return None
+        response_body = web.GossipResponse.model_validate(json)
+        return [node.to_core() for node in response_body.updates]
+
+    async def probe_node(
+        self,
+        target: models.Node,
+        updates: Iterable[models.Node],
+        timeout: float,
+    ) -> Optional[tuple[bool, list[models.Node]]]:
+        url = self.get_server_url('/nodes/gossip/probe')
+        request_body = web.GossipProbeRequest(
+            target=web.Node.from_core(target),
+            updates=[web.Node.from_core(node) for node in updates],
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            try:
+                async with session.post(
+                    url,
+                    json=request_body,
+                    timeout=timeout,
+                    headers=self.get_headers(),
+                ) as response:
+                    json = await response.json()
+            except (asyncio.TimeoutError, aiohttp.ClientError):
+                return None
+        response_body = web.GossipProbeResponse.model_validate(json)
+        return (
+            response_body.acknowledged,
+            [node.to_core() for node in response_body.updates],
+        )
 
     async def join_node(
         self,
@@ -82,7 +144,9 @@ class NodeControllerClient(client_base.ClientBase):
             ipv4_address=ipv4_address, port=port, role=role,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.JoinResponse.model_validate(json)
         return response_body.node_uid
@@ -96,7 +160,9 @@ class NodeControllerClient(client_base.ClientBase):
             node_uid=node_uid,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.LeaveResponse.model_validate(json)
         return response_body.status == common_web.ResponseStatus.SUCCESS
@@ -114,7 +180,10 @@ class NodeControllerClient(client_base.ClientBase):
         async with aiohttp.ClientSession() as session:
             try:
                 async with session.post(
-                    url, json=request_body, timeout=3,
+                    url,
+                    json=request_body,
+                    timeout=3,
+                    headers=self.get_headers(),
                 ) as response:
                     json = await response.json()
             except asyncio.TimeoutError:
@@ -128,7 +197,9 @@ class NodeControllerClient(client_base.ClientBase):
             node_uid=node_uid
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.DisableResponse.model_validate(json)
         return response_body.status == common_web.ResponseStatus.SUCCESS
@@ -8,6 +8,7 @@ import uuid
 class NodeStatus(enum.Enum):
     UNKNOWN = 'unknown'
     ACTIVE = 'active'
+    SUSPECT = 'suspect'
     INACTIVE = 'inactive'
 
 
@@ -25,3 +26,5 @@ class Node:
     role: NodeRole
     status: NodeStatus
     last_ping: datetime.datetime
+    incarnation: int = 0
+    version: int = 0
@@ -1,5 +1,6 @@
 import datetime
 import ipaddress
+from typing import Optional
 import uuid
 
 import sqlalchemy as sql
@@ -23,6 +24,10 @@ class Node(Base):
     role: orm.Mapped[str] = orm.mapped_column(sql.String(64))
     status: orm.Mapped[str] = orm.mapped_column(sql.String(64))
     last_ping: orm.Mapped[str] = orm.mapped_column(sql.String(23))
+    incarnation: orm.Mapped[Optional[int]] = orm.mapped_column(sql.Integer)
+    version: orm.Mapped[Optional[int]] = orm.mapped_column(
+        sql.Integer, index=True,
+    )
 
     @staticmethod
     def from_core(obj: core.Node) -> 'Node':
@@ -33,6 +38,8 @@ class Node(Base):
             last_ping=obj.last_ping.isoformat(timespec='milliseconds'),
             role=obj.role.value,
             status=obj.status.value,
+            incarnation=obj.incarnation,
+            version=obj.version,
         )
 
     def to_core(self) -> core.Node:
@@ -41,12 +48,10 @@ class Node(Base):
             ipv4_address=ipaddress.IPv4Address(self.ipv4_address),
             port=self.port,
             last_ping=datetime.datetime.fromisoformat(self.last_ping),
-            role=[
-                elem for elem in core.NodeRole if elem.value == self.role
-            ][0],
-            status=[
-                elem for elem in core.NodeStatus if elem.value == self.status
-            ][0],
+            role=core.NodeRole(self.role),
+            status=core.NodeStatus(self.status),
+            incarnation=self.incarnation or 0,
+            version=self.version or 0,
         )
 
     def __repr__(self) -> str:
@@ -57,5 +62,23 @@ class Node(Base):
             f'port={self.port!r}, '
             f'role={self.role!r}, '
             f'status={self.status!r}, '
-            f'last_ping={self.last_ping!r})'
+            f'last_ping={self.last_ping!r}, '
+            f'incarnation={self.incarnation!r}, '
+            f'version={self.version!r})'
+        )
+
+
+class NodeVersion(Base):
+    __tablename__ = 'node_version'
+
+    name: orm.Mapped[str] = orm.mapped_column(
+        sql.String(32), primary_key=True,
+    )
+    value: orm.Mapped[int] = orm.mapped_column(sql.Integer)
+
+    def __repr__(self) -> str:
+        return (
+            'NodeVersion('
+            f'name={self.name!r}, '
+            f'value={self.value!r})'
         )
@@ -15,6 +15,8 @@ class Node(pydantic.BaseModel):
     role: core.NodeRole
     status: core.NodeStatus
     last_ping: pydantic.NaiveDatetime
+    incarnation: int = pydantic.Field(default=0, ge=0)
+    version: int = pydantic.Field(default=0, ge=0)
 
     @staticmethod
     def from_core(obj: core.Node) -> 'Node':
@@ -25,6 +27,8 @@ class Node(pydantic.BaseModel):
             role=obj.role,
             status=obj.status,
             last_ping=obj.last_ping,
+            incarnation=obj.incarnation,
+            version=obj.version,
         )
 
     def to_core(self) -> core.Node:
@@ -35,6 +39,8 @@ class Node(pydantic.BaseModel):
             role=self.role,
             status=self.status,
             last_ping=self.last_ping,
+            incarnation=self.incarnation,
+            version=self.version,
         )
 
 
@@ -94,7 +100,25 @@ class DisableResponse(common_web.BaseResponse):
 
 class ExchangeRequest(pydantic.BaseModel):
     nodes: list[Node]
+    since_version: int = pydantic.Field(default=0, ge=0)
 
 
 class ExchangeResponse(pydantic.BaseModel):
     nodes: list[Node]
+    version: int = pydantic.Field(default=0, ge=0)
+
+
+class GossipRequest(pydantic.BaseModel):
+    updates: list[Node]
+
+
+class GossipResponse(common_web.BaseResponse):
+    updates: list[Node]
+
+
+class GossipProbeRequest(GossipRequest):
+    target: Node
+
+
+class GossipProbeResponse(GossipResponse):
+    acknowledged: bool
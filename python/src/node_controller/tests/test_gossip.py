@@ -0,0 +1,158 @@
+import asyncio
+import copy
+import dataclasses
+import datetime
+import ipaddress
+import pathlib
+from typing import Iterable, Optional
+import uuid
+
+import pytest
+
+import src.common.backend.db as database
+import src.node_controller.backend.gossip_service as gossip
+import src.node_controller.backend.repositories as repositories
+import src.node_controller.backend.services as services
+import src.node_controller.models.core as core
+import src.node_controller.models.db as db_models
+
+LOCALHOST = ipaddress.IPv4Address('127.0.0.1')
+
+
+class FakeClient:
+    def __init__(self, network: dict[int, gossip.GossipService], port: int):
+        self.network = network
+        self.port = port
+
+    async def gossip(
+        self, updates: Iterable[core.Node], timeout: float,
+    ) -> Optional[list[core.Node]]:
+        peer = self.network.get(self.port)
+        if peer is None:
+            return None
+        return copy.deepcopy(
+            await peer.handle_gossip(copy.deepcopy(list(updates))),
+        )
+
+    async def probe_node(
+        self, target: core.Node, updates: Iterable[core.Node], timeout: float,
+    ) -> Optional[tuple[bool, list[core.Node]]]:
+        peer = self.network.get(self.port)
+        if peer is None:
+            return None
+        return copy.deepcopy(
+            await peer.handle_probe(
+                copy.deepcopy(target), copy.deepcopy(list(updates)),
+            ),
+        )
+
+
+def make_node(port: int) -> core.Node:
+    return core.Node(
+        node_uid=uuid.uuid4(),
+        ipv4_address=LOCALHOST,
+        port=port,
+        role=core.NodeRole.EXECUTOR,
+        status=core.NodeStatus.ACTIVE,
+        last_ping=datetime.datetime.now(),
+    )
+
+
+def make_cluster(
+    tmp_path: pathlib.Path, size: int, monkeypatch,
+) -> tuple[list[gossip.GossipService], dict[int, gossip.GossipService]]:
+    network: dict[int, gossip.GossipService] = {}
+    monkeypatch.setattr(
+        gossip.GossipService, '_get_client',
+        staticmethod(lambda node: FakeClient(network, node.port)),
+    )
+    nodes = [make_node(port) for port in range(size)]
+    members = []
+    for node in nodes:
+        db = database.DB(
+            db_name=str(tmp_path / f'{node.port}.sqlite'),
+            base=db_models.Base,
+        )
+        repository = repositories.NodeRepository(db)
+        repository.upsert_entities(nodes)
+        member = gossip.GossipService(
+            repository, services.NodeService(repository, None),
+        )
+        member.node = dataclasses.replace(node, incarnation=1)
+        network[node.port] = member
+        members.append(member)
+    return members, network
+
+
+async def get_node(
+    member: gossip.GossipService, node_uid: uuid.UUID,
+) -> core.Node:
+    return await member.repository.get_entity(node_uid)
+
+
+@pytest.mark.parametrize(
+    'update, current, expected',
+    [
+        ((core.NodeStatus.SUSPECT, 1), (core.NodeStatus.ACTIVE, 1), True),
+        ((core.NodeStatus.ACTIVE, 1), (core.NodeStatus.SUSPECT, 1), False),
+        ((core.NodeStatus.ACTIVE, 2), (core.NodeStatus.SUSPECT, 1), True),
+        ((core.NodeStatus.INACTIVE, 1), (core.NodeStatus.SUSPECT, 1), True),
+        ((core.NodeStatus.SUSPECT, 1), (core.NodeStatus.INACTIVE, 1), False),
+        ((core.NodeStatus.ACTIVE, 2), (core.NodeStatus.INACTIVE, 1), True),
+        ((core.NodeStatus.SUSPECT, 1), (core.NodeStatus.ACTIVE, 2), False),
+    ],
+)
+def test_supersedes_follows_incarnation_then_status(
+    update: tuple[core.NodeStatus, int],
+    current: tuple[core.NodeStatus, int],
+    expected: bool,
+):
+    node = make_node(0)
+    assert gossip.supersedes(
+        dataclasses.replace(node, status=update[0], incarnation=update[1]),
+        dataclasses.replace(node, status=current[0], incarnation=current[1]),
+    ) == expected
+
+
+def test_failed_node_is_suspected_then_removed(
+    tmp_path: pathlib.Path, monkeypatch,
+):
+    monkeypatch.setattr(gossip, 'SUSPICION_TIMEOUT', 0.0)
+    members, network = make_cluster(tmp_path, 4, monkeypatch)
+    failed = members[-1]
+    del network[failed.node.port]
+
+    async def main():
+        for _ in range(2 * len(members)):
+            for member in members[:-1]:
+                await member._probe_round()
+        return [
+            (await get_node(member, failed.node.node_uid)).status
+            for member in members[:-1]
+        ]
+
+    assert asyncio.run(main()) == [core.NodeStatus.INACTIVE] * 3
+
+
+def test_suspected_node_refutes_with_new_incarnation(
+    tmp_path: pathlib.Path, monkeypatch,
+):
+    (member, suspected), _ = make_cluster(tmp_path, 2, monkeypatch)
+
+    async def main() -> core.Node:
+        await member.merge(
+            [
+                dataclasses.replace(
+                    suspected.node,
+                    status=core.NodeStatus.SUSPECT,
+                    incarnation=suspected.node.incarnation,
+                ),
+            ]
+        )
+        await member._probe_round()
+        return await get_node(member, suspected.node.node_uid)
+
+    node = asyncio.run(main())
+    assert node.status == core.NodeStatus.ACTIVE
+    assert node.incarnation == 2
+    assert not member.suspicions
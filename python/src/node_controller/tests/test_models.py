@@ -24,6 +24,9 @@ CONST_IP_ADDRESS = '127.0.0.1'
         pytest.param(
             core.NodeRole.REGISTRY, core.NodeStatus.UNKNOWN,
         ),
+        pytest.param(
+            core.NodeRole.EXECUTOR, core.NodeStatus.SUSPECT,
+        ),
     ],
 )
 def test_node_info_model_core_db_conversion(
@@ -68,6 +71,9 @@ def test_node_info_model_core_db_conversion(
         pytest.param(
             core.NodeRole.REGISTRY, core.NodeStatus.UNKNOWN,
         ),
+        pytest.param(
+            core.NodeRole.EXECUTOR, core.NodeStatus.SUSPECT,
+        ),
     ],
 )
 def test_node_info_model_core_web_conversion(
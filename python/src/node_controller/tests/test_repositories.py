@@ -0,0 +1,92 @@
+import dataclasses
+import datetime
+import ipaddress
+import pathlib
+import uuid
+
+import pytest
+import sqlalchemy as sql
+
+import src.common.backend.db as database
+import src.node_controller.backend.repositories as repositories
+import src.node_controller.backend.services as services
+import src.node_controller.models.core as core
+import src.node_controller.models.db as db_models
+
+CONST_DATETIME = datetime.datetime(2024, 6, 9, 12, 0)
+
+
+def make_node(port: int) -> core.Node:
+    return core.Node(
+        node_uid=uuid.uuid4(),
+        ipv4_address=ipaddress.IPv4Address('127.0.0.1'),
+        port=port,
+        role=core.NodeRole.EXECUTOR,
+        status=core.NodeStatus.ACTIVE,
+        last_ping=CONST_DATETIME,
+    )
+
+
+@pytest.fixture
+def repository(tmp_path: pathlib.Path) -> repositories.NodeRepository:
+    return repositories.NodeRepository(
+        database.DB(
+            db_name=str(tmp_path / 'nodes.sqlite'), base=db_models.Base,
+        )
+    )
+
+
+def test_changes_are_returned_since_version(
+    repository: repositories.NodeRepository,
+):
+    nodes = [make_node(port) for port in range(3)]
+    repository.upsert_entities(nodes)
+    changed, version = repository.get_changes(since_version=0)
+    assert len(changed) == 3 and version == 3
+    assert repository.get_changes(since_version=version) == ([], 3)
+
+    repository.update_entity(
+        dataclasses.replace(nodes[1], status=core.NodeStatus.INACTIVE),
+    )
+    repository.upsert_entity(dataclasses.replace(nodes[2], port=8000))
+    changed, version = repository.get_changes(since_version=3)
+    assert [(node.port, node.status, node.version) for node in changed] == [
+        (1, core.NodeStatus.INACTIVE, 4),
+        (8000, core.NodeStatus.ACTIVE, 5),
+    ]
+    assert version == 5
+
+
+def test_exchange_returns_changes_before_received_nodes(
+    repository: repositories.NodeRepository,
+):
+    node_service = services.NodeService(repository, None)
+    known, received = make_node(0), make_node(1)
+    repository.upsert_entity(known)
+    nodes, version = node_service.exchange_nodes([received])
+    assert [node.node_uid for node in nodes] == [known.node_uid]
+    nodes, _ = node_service.exchange_nodes([], since_version=version)
+    assert [node.node_uid for node in nodes] == [received.node_uid]
+
+
+def test_versions_survive_migration_and_deletes(
+    repository: repositories.NodeRepository,
+):
+    migrated, deleted = make_node(0), make_node(1)
+    repository.upsert_entities([migrated, deleted])
+    with repository.db.begin() as session:
+        session.execute(
+            sql.update(db_models.Node).where(
+                db_models.Node.node_uid == str(migrated.node_uid),
+            ).values(version=None)
+        )
+    changed, version = repository.get_changes(since_version=0)
+    assert {node.node_uid for node in changed} == {
+        migrated.node_uid, deleted.node_uid,
+    }
+
+    repository.delete_entity(deleted.node_uid)
+    repository.upsert_entity(make_node(2))
+    changed, next_version = repository.get_changes(since_version=version)
+    assert [node.port for node in changed] == [2]
+    assert next_version == version + 1
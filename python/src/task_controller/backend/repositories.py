@@ -1,33 +1,42 @@
+import datetime
+import re
 from typing import Optional, Iterable
 import uuid
 import sqlalchemy as sql
+import sqlalchemy.orm as orm
 
 import src.common.backend.db as database
 import src.task_controller.models.core as core
 import src.task_controller.models.db as db_models
 
+PARAMS_KEY_REGEX = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
 
 class SubtaskRepository:
     def __init__(self, db: database.DB):
         self.db = db
 
     def create_entity(self, entity: core.Subtask):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask = db_models.Subtask.from_core(entity)
             session.add(subtask)
-            session.commit()
+
+    def create_entities(self, entities: Iterable[core.Subtask]):
+        with self.db.begin() as session:
+            session.add_all(
+                [db_models.Subtask.from_core(entity) for entity in entities],
+            )
 
     def delete_entity(self, subtask_uid: uuid.UUID):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask: Optional[db_models.Subtask] = session.query(
                 db_models.Subtask,
             ).where(db_models.Subtask.subtask_uid == str(subtask_uid)).first()
             if subtask is not None:
                 session.delete(subtask)
-                session.commit()
 
     def update_entity(self, entity: core.Subtask):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask = db_models.Subtask.from_core(entity)
             stmt = sql.update(
                 db_models.Subtask,
@@ -44,10 +53,9 @@ class SubtaskRepository:
                 result=subtask.result,
             )
             session.execute(stmt)
-            session.commit()
 
     def get_entity(self, subtask_uid: uuid.UUID) -> Optional[core.Subtask]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask: Optional[db_models.Subtask] = session.query(
                 db_models.Subtask
             ).where(db_models.Subtask.subtask_uid == str(subtask_uid)).first()
@@ -56,22 +64,20 @@ class SubtaskRepository:
             return subtask.to_core()
 
     def get_entities(self) -> Iterable[core.Subtask]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             stmt = sql.select(db_models.Subtask)
             subtasks = session.scalars(stmt).all()
-        return [subtask.to_core() for subtask in subtasks]
+            return [subtask.to_core() for subtask in subtasks]
 
     def upsert_entity(self, entity: core.Subtask):
-        with self.db.create_session() as session:
-            subtask: Optional[db_models.Subtask] = session.query(
-                db_models.Subtask
-            ).where(
-                db_models.Subtask.subtask_uid == str(entity.subtask_uid)
-            ).first()
-        if subtask is None:
-            self.create_entity(entity)
-        else:
-            self.update_entity(entity)
+        self.upsert_entities([entity])
+
+    def upsert_entities(self, entities: Iterable[core.Subtask]):
+        with self.db.begin() as session:
+            database.upsert(
+                session,
+                [db_models.Subtask.from_core(entity) for entity in entities],
+            )
 
 
 class TaskRepository:
@@ -79,22 +85,20 @@ class TaskRepository:
         self.db = db
 
     def create_entity(self, entity: core.Task):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             task = db_models.Task.from_core(entity)
             session.add(task)
-            session.commit()
 
     def delete_entity(self, task_uid: uuid.UUID):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             task: Optional[db_models.Task] = session.query(
                 db_models.Task,
             ).where(db_models.Task.task_uid == str(task_uid)).first()
             if task is not None:
                 session.delete(task)
-                session.commit()
 
     def update_entity(self, entity: core.Task):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             task = db_models.Task.from_core(entity)
             stmt = sql.update(
                 db_models.Task,
@@ -111,10 +115,9 @@ class TaskRepository:
                 result=task.result,
             )
             session.execute(stmt)
-            session.commit()
 
     def get_entity(self, task_uid: uuid.UUID) -> Optional[core.Task]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             task: Optional[db_models.Task] = session.query(
                 db_models.Task
             ).where(db_models.Task.task_uid == str(task_uid)).first()
@@ -123,19 +126,113 @@ class TaskRepository:
             return task.to_core()
 
     def get_entities(self) -> Iterable[core.Task]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             stmt = sql.select(db_models.Task)
             tasks = session.scalars(stmt).all()
-        return [task.to_core() for task in tasks]
+            return [task.to_core() for task in tasks]
+
+    def get_page(
+        self,
+        status: Optional[core.TaskStatus] = None,
+        created_after: Optional[datetime.datetime] = None,
+        created_before: Optional[datetime.datetime] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+    ) -> tuple[list[core.Task], Optional[int]]:
+        with self.db.begin() as session:
+            stmt = sql.select(db_models.Task).options(
+                orm.selectinload(db_models.Task.subtasks),
+            )
+            if status is not None:
+                stmt = stmt.where(db_models.Task.status == status.value)
+            if created_after is not None:
+                stmt = stmt.where(
+                    db_models.Task.created_at >=
+                    created_after.isoformat(timespec='milliseconds'),
+                )
+            if created_before is not None:
+                stmt = stmt.where(
+                    db_models.Task.created_at <
+                    created_before.isoformat(timespec='milliseconds'),
+                )
+            tasks, next_cursor = database.paginate(
+                session, stmt, db_models.Task, cursor, limit,
+            )
+            return [task.to_core() for task in tasks], next_cursor
 
     def upsert_entity(self, entity: core.Task):
-        with self.db.create_session() as session:
-            task: Optional[db_models.Task] = session.query(
-                db_models.Task
-            ).where(
-                db_models.Task.task_uid == str(entity.task_uid)
-            ).first()
-        if task is None:
-            self.create_entity(entity)
-        else:
-            self.update_entity(entity)
+        self.upsert_entities([entity])
+
+    def upsert_entities(self, entities: Iterable[core.Task]):
+        with self.db.begin() as session:
+            database.upsert(
+                session,
+                [db_models.Task.from_core(entity) for entity in entities],
+            )
+
+
+class ResultRepository:
+    def __init__(self, db: database.DB):
+        self.db = db
+
+    def upsert_entities(self, entities: Iterable[core.Result]):
+        with self.db.begin() as session:
+            database.upsert(
+                session,
+                [db_models.Result.from_core(entity) for entity in entities],
+            )
+
+    def get_entities(
+        self,
+        task_uid: Optional[uuid.UUID] = None,
+        metric: Optional[str] = None,
+        order_by: str = 'value',
+        descending: bool = True,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> list[core.Result]:
+        with self.db.begin() as session:
+            order_column = self._get_order_column(order_by)
+            stmt = self._filter(
+                sql.select(db_models.Result), task_uid, metric,
+            ).order_by(
+                order_column.desc() if descending else order_column.asc(),
+                db_models.Result.params_hash,
+            ).offset(offset).limit(limit)
+            results = session.scalars(stmt).all()
+            return [result.to_core() for result in results]
+
+    def count_entities(
+        self,
+        task_uid: Optional[uuid.UUID] = None,
+        metric: Optional[str] = None,
+    ) -> int:
+        with self.db.begin() as session:
+            stmt = self._filter(
+                sql.select(sql.func.count()).select_from(db_models.Result),
+                task_uid, metric,
+            )
+            return session.execute(stmt).scalar_one()
+
+    @staticmethod
+    def _filter(
+        stmt: sql.Select, task_uid: Optional[uuid.UUID], metric: Optional[str],
+    ) -> sql.Select:
+        if task_uid is not None:
+            stmt = stmt.where(db_models.Result.task_uid == str(task_uid))
+        if metric is not None:
+            stmt = stmt.where(db_models.Result.metric == metric)
+        return stmt
+
+    @staticmethod
+    def _get_order_column(order_by: str) -> sql.ColumnElement:
+        if order_by.startswith('params.'):
+            key = order_by.removeprefix('params.')
+            if not PARAMS_KEY_REGEX.fullmatch(key):
+                raise ValueError(f'invalid params key {key!r} to order by')
+            return sql.func.json_extract(db_models.Result.params, f'$.{key}')
+        return {
+            'value': db_models.Result.value,
+            'duration': db_models.Result.duration,
+            'created_at': db_models.Result.created_at,
+        }[order_by]
@@ -4,7 +4,10 @@ import pathlib
 import fastapi
 
 import src.common.backend.db as database
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
 import src.common.models.web as web_common
+import src.node_controller.backend.gossip_service as gossip
 import src.node_controller.backend.network_service as network
 import src.node_controller.backend.services as node_services
 import src.node_controller.backend.repositories as node_repositories
@@ -35,13 +38,17 @@ async def lifespan(app: fastapi.FastAPI):
         )
     )
     await node_service.notify_node_enabled(tasks_service.config_path)
+    gossip_service.start(tasks_service.config_path)
     yield
+    await gossip_service.stop()
     network_service.remove_rule(
         local_port=TASK_CONTROLLER_DEFAULT_PORT, public_port=public_port,
     )
 
 
 app = fastapi.FastAPI(lifespan=lifespan)
+metrics.instrument_app(app, service='task_controller')
+tracing.instrument_app(app, service='task_controller')
 db_name = str(
     pathlib.Path(__file__).parent.parent / 'db' / 'task_controller.sqlite',
 )
@@ -52,14 +59,18 @@ db = database.DB(db_name=db_name, base=db_models.Base)
 node_db = database.DB(db_name=node_db_name, base=node_db_models.Base)
 subtask_repository = repositories.SubtaskRepository(db=db)
 task_repository = repositories.TaskRepository(db=db)
+result_repository = repositories.ResultRepository(db=db)
 node_repository = node_repositories.NodeRepository(db=node_db)
 network_service = network.NetworkService()
 node_service = node_services.NodeService(node_repository, network_service)
+gossip_service = gossip.GossipService(node_repository, node_service)
+gossip.add_routes(app, gossip_service)
 subtasks_service = services.SubtaskService(subtask_repository)
 tasks_service = services.TaskService(
     task_repository=task_repository,
     subtask_service=subtasks_service,
     subtask_repository=subtask_repository,
+    result_repository=result_repository,
     node_service=node_service,
     node_repository=node_repository,
     network_service=network_service,
@@ -87,10 +98,20 @@ async def create_task(
 
 
 @app.post('/tasks')
-async def get_tasks_list() -> models.GetTasksResponse:
-    tasks = await tasks_service.get_tasks()
+async def get_tasks_list(
+    request: models.GetTasksRequest = models.GetTasksRequest(),
+) -> models.GetTasksResponse:
+    tasks, next_cursor = await tasks_service.get_tasks(
+        status=request.status,
+        created_after=request.created_after,
+        created_before=request.created_before,
+        cursor=request.cursor,
+        limit=request.limit,
+    )
     return models.GetTasksResponse(
-        status=web_common.ResponseStatus.SUCCESS, tasks=tasks,
+        status=web_common.ResponseStatus.SUCCESS,
+        tasks=[models.Task.from_core(task) for task in tasks],
+        next_cursor=next_cursor,
     )
 
 
@@ -98,7 +119,19 @@ async def get_tasks_list() -> models.GetTasksResponse:
 async def get_task(request: models.GetTaskRequest) -> models.GetTaskResponse:
     task = await tasks_service.get_task(task_uid=request.task_uid)
     return models.GetTaskResponse(
-        status=web_common.ResponseStatus.SUCCESS, task=task,
+        status=web_common.ResponseStatus.SUCCESS,
+        task=models.Task.from_core(task) if task is not None else None,
+    )
+
+
+@app.post('/task/cancel')
+async def cancel_task(
+    request: models.CancelTaskRequest,
+) -> models.CancelTaskResponse:
+    task = await tasks_service.cancel_task(task_uid=request.task_uid)
+    return models.CancelTaskResponse(
+        status=web_common.ResponseStatus.SUCCESS,
+        task=models.Task.from_core(task) if task is not None else None,
     )
 
 
@@ -110,7 +143,10 @@ async def get_subtask(
         subtask_uid=request.subtask_uid,
     )
     return models.GetSubtaskResponse(
-        status=web_common.ResponseStatus.SUCCESS, subtask=subtask,
+        status=web_common.ResponseStatus.SUCCESS,
+        subtask=(
+            models.Subtask.from_core(subtask) if subtask is not None else None
+        ),
     )
 
 
@@ -119,8 +155,51 @@ async def get_task_result(
     request: models.GetTaskResultRequest,
 ) -> models.GetTaskResultResponse:
     task = await tasks_service.get_task(task_uid=request.task_uid)
+    results, total = await tasks_service.get_results(
+        task_uid=request.task_uid,
+        metric=request.metric,
+        order_by=request.order_by,
+        descending=request.descending,
+        offset=request.offset,
+        limit=request.limit,
+    )
     return models.GetTaskResultResponse(
-        status=web_common.ResponseStatus.SUCCESS, result=task.result,
+        status=web_common.ResponseStatus.SUCCESS,
+        result=task.result if task is not None else None,
+        results=[models.Result.from_core(result) for result in results],
+        total=total,
+    )
+
+
+@app.post('/results')
+async def get_results(
+    request: models.GetResultsRequest,
+) -> models.GetResultsResponse:
+    results, total = await tasks_service.get_results(
+        task_uid=request.task_uid,
+        metric=request.metric,
+        order_by=request.order_by,
+        descending=request.descending,
+        offset=request.offset,
+        limit=request.limit,
+    )
+    return models.GetResultsResponse(
+        status=web_common.ResponseStatus.SUCCESS,
+        results=[models.Result.from_core(result) for result in results],
+        total=total,
+    )
+
+
+@app.post('/task/timeline')
+async def get_task_timeline(
+    request: models.GetTaskTimelineRequest,
+) -> models.GetTaskTimelineResponse:
+    timeline = await tasks_service.get_task_timeline(
+        task_uid=request.task_uid,
+    )
+    return models.GetTaskTimelineResponse(
+        status=web_common.ResponseStatus.SUCCESS,
+        timeline=[models.TimelineEntry.from_core(entry) for entry in timeline],
     )
 
 
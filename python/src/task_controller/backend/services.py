@@ -1,17 +1,25 @@
 import asyncio
+import contextlib
 import copy
 import datetime
+import hashlib
 import ipaddress
+import json
 import math
 import pathlib
-from typing import Any, Iterable
+from typing import Any
 from typing import Optional
 import uuid
 
+import src.common.backend.db as database
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
 import src.data_controller.client.client as data_client
 import src.data_controller.models.core as data_models
+import src.data_controller.models.web as data_web
 import src.env_controller.client.client as env_client
 import src.env_controller.models.core as env_models
+import src.node_controller.backend.gossip_service as gossip
 import src.node_controller.backend.network_service as network
 import src.node_controller.backend.repositories as node_repositories
 import src.node_controller.backend.services as node_services
@@ -22,20 +30,51 @@ import src.task_controller.models.core as models
 import src.task_executor.client.client as executor_client
 import src.task_executor.models.core as executor_models
 
+ENV_CONTROLLER_HOST = '127.0.0.1'
+ENV_CONTROLLER_PORT = 8001
+DATA_CONTROLLER_HOST = '127.0.0.1'
+DATA_CONTROLLER_PORT = 8002
 EXECUTORS_ABSENCE_DELAY = 30.0
+EXECUTORS_ABSENCE_MIN_DELAY = 0.5
 IMAGE_PUSHING_POLLING_DELAY = 0.05
 DATASET_PUBLISHING_POLLING_DELAY = 0.1
 SUBTASKS_RUNNING_POLLING_DELAY = 0.05
+IMAGE_REGISTRY = env_models.Registry.DOCKER_HUB
+IMAGE_PUSHING_ERROR_STATUSES = (
+    env_models.ImageStatus.BUILDING_ERROR,
+    env_models.ImageStatus.PUSHING_ERROR,
+)
+FINISHED_TASK_STATUSES = (
+    models.TaskStatus.SUCCESS,
+    models.TaskStatus.ERROR,
+    models.TaskStatus.CANCELLED,
+)
+FINISHED_SUBTASK_STATUSES = (
+    models.SubtaskStatus.SUCCESS,
+    models.SubtaskStatus.ERROR,
+    models.SubtaskStatus.TIMEOUT,
+    models.SubtaskStatus.CANCELLED,
+)
+ENDED_EXECUTOR_STATUSES = (
+    executor_models.SubtaskStatus.SUCCESS,
+    executor_models.SubtaskStatus.CANCELLED,
+    executor_models.SubtaskStatus.ERROR,
+    executor_models.SubtaskStatus.TIMEOUT,
+)
 
 
 class SubtaskService:
     def __init__(self, subtask_repository: repositories.SubtaskRepository):
-        self.subtask_repository = subtask_repository
+        self.subtask_repository = database.AsyncRepository(
+            subtask_repository,
+        )
 
     async def get_subtask(
         self, subtask_uid: uuid.UUID,
     ) -> Optional[models.Subtask]:
-        subtask = self.subtask_repository.get_entity(subtask_uid=subtask_uid)
+        subtask = await self.subtask_repository.get_entity(
+            subtask_uid=subtask_uid,
+        )
         return subtask
 
 
@@ -45,19 +84,35 @@ class TaskService:
         task_repository: repositories.TaskRepository,
         subtask_service: SubtaskService,
         subtask_repository: repositories.SubtaskRepository,
+        result_repository: repositories.ResultRepository,
         node_service: node_services.NodeService,
         node_repository: node_repositories.NodeRepository,
         network_service: network.NetworkService,
     ):
-        self.task_repository = task_repository
+        self.task_repository = database.AsyncRepository(task_repository)
         self.subtask_service = subtask_service
-        self.subtask_repository = subtask_repository
+        self.subtask_repository = database.AsyncRepository(
+            subtask_repository,
+        )
+        self.result_repository = database.AsyncRepository(
+            result_repository,
+        )
         self.task_executor_client = executor_client.TaskExecutorClient()
         self.env_controller_client = env_client.EnvControllerClient()
+        self.env_controller_client.set_server(
+            ipv4_address=ipaddress.IPv4Address(ENV_CONTROLLER_HOST),
+            port=ENV_CONTROLLER_PORT,
+        )
         self.data_controller_client = data_client.DataControllerClient()
+        self.data_controller_client.set_server(
+            ipv4_address=ipaddress.IPv4Address(DATA_CONTROLLER_HOST),
+            port=DATA_CONTROLLER_PORT,
+        )
         self.network_service = network_service
         self.node_service = node_service
-        self.node_repository = node_repository
+        self.node_repository = database.AsyncRepository(node_repository)
+        self.runs: dict[uuid.UUID, asyncio.Task] = {}
+        self.exchange_versions: dict[uuid.UUID, int] = {}
 
     async def create_task(
         self,
@@ -78,8 +133,8 @@ class TaskService:
             result=None,
             subtasks=[],
         )
-        self.task_repository.create_entity(task)
-        asyncio.create_task(
+        await self.task_repository.create_entity(task)
+        self.runs[task.task_uid] = asyncio.create_task(
             self._create_task(
                 task_uid=task.task_uid,
                 task_type=task_type,
@@ -96,27 +151,93 @@ class TaskService:
         dataset_path: pathlib.Path,
         params: dict,
     ):
-        task = self.task_repository.get_entity(task_uid=task_uid)
-        executors: list[node_models.Node] = []
-        while not executors:
-            await self._update_nodes_statuses()
-            executors = await self._get_active_executors()
-            executors, subtasks_uids = await self._offer_subtasks(executors)
-            if not executors:
-                await asyncio.sleep(EXECUTORS_ABSENCE_DELAY)
-        subtasks_params = self._separate_subtasks_params(
-            params, len(executors),
+        active_tasks = metrics.QUEUE_DEPTH.labels(
+            'task_controller', 'active_tasks',
         )
-        subtask_type = self.get_subtasks_type(task_type=task_type)
-        subtasks = self._create_subtasks(
-            task_uid=task.task_uid,
-            subtasks_uids=subtasks_uids,
-            task_type=task_type,
-            executors=executors,
-            subtasks_params=subtasks_params,
+        active_tasks.inc()
+        try:
+            with tracing.start_span(
+                'task', trace_id=task_uid.hex, task_uid=str(task_uid),
+            ):
+                await self._run_task(
+                    task_uid=task_uid,
+                    task_type=task_type,
+                    dataset_path=dataset_path,
+                    params=params,
+                )
+        except asyncio.CancelledError:
+            print(f'task {task_uid} has been cancelled')
+            raise
+        except Exception as error:
+            print(f'task {task_uid} has failed: {error!r}')
+            task = await self.task_repository.get_entity(task_uid=task_uid)
+            task.status = models.TaskStatus.ERROR
+            task.finished_at = datetime.datetime.now()
+            await self.task_repository.update_entity(task)
+        finally:
+            self.runs.pop(task_uid, None)
+            active_tasks.dec()
+
+    async def cancel_task(self, task_uid: uuid.UUID) -> Optional[models.Task]:
+        task = await self.task_repository.get_entity(task_uid=task_uid)
+        if task is None or task.status in FINISHED_TASK_STATUSES:
+            return task
+        print(f'cancelling task {task_uid}')
+        run = self.runs.get(task_uid)
+        if run is not None:
+            run.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await run
+        task = await self.task_repository.get_entity(task_uid=task_uid)
+        subtasks = [
+            subtask
+            for subtask in task.subtasks
+            if subtask.status not in FINISHED_SUBTASK_STATUSES
+        ]
+        executors = {
+            node.node_uid: node
+            for node in await self.node_repository.get_entities()
+        }
+        cancelled = [
+            subtask
+            for subtask in subtasks
+            if subtask.executor_uid in executors
+        ]
+        results = await asyncio.gather(
+            *(
+                executor_client.TaskExecutorClient().set_server(
+                    ipv4_address=executors[subtask.executor_uid].ipv4_address,
+                    port=executors[subtask.executor_uid].port,
+                ).cancel_subtask(subtask_uid=subtask.subtask_uid)
+                for subtask in cancelled
+            ),
+            return_exceptions=True,
         )
+        for subtask, result in zip(cancelled, results):
+            if isinstance(result, Exception):
+                print(
+                    f'subtask {subtask.subtask_uid} could not be cancelled '
+                    f'on executor {subtask.executor_uid}: {result!r}'
+                )
+        finished_at = datetime.datetime.now()
         for subtask in subtasks:
-            self.subtask_repository.create_entity(subtask)
+            subtask.status = models.SubtaskStatus.CANCELLED
+            subtask.finished_at = finished_at
+        await self.subtask_repository.upsert_entities(subtasks)
+        task.status = models.TaskStatus.CANCELLED
+        task.finished_at = finished_at
+        await self.task_repository.update_entity(task)
+        return await self.task_repository.get_entity(task_uid=task_uid)
+
+    async def _run_task(
+        self,
+        task_uid: uuid.UUID,
+        task_type: models.TaskType,
+        dataset_path: pathlib.Path,
+        params: dict,
+    ):
+        task = await self.task_repository.get_entity(task_uid=task_uid)
+        subtask_type = self.get_subtasks_type(task_type=task_type)
         env_task_type = [
             status
             for status in env_models.TaskType
@@ -127,37 +248,89 @@ class TaskService:
             for status in env_models.SubtaskType
             if status.name == subtask_type.name
         ][0]
-        image_tag, dataset_uid, magnet_link = await self._publishing_resources(
-            task_uid=task.task_uid,
-            task_type=env_task_type,
-            subtask_type=env_subtask_type,
-            dataset_path=dataset_path,
-        )
-        task.status = models.TaskStatus.SUBTASKS_SENDING
-        self.task_repository.update_entity(task)
-        await self._send_subtasks(
-            executors=executors,
-            subtasks=subtasks,
-            image_tag=image_tag,
-            dataset_uid=dataset_uid,
-            magnet_link=magnet_link,
-        )
-        await self._wait_subtask_execution(
-            executors=executors, subtasks=subtasks,
+        publishing = asyncio.create_task(
+            self._publishing_resources(
+                task_uid=task.task_uid,
+                task_type=env_task_type,
+                subtask_type=env_subtask_type,
+                dataset_path=dataset_path,
+            ),
         )
-        subtasks_results = await self._get_subtasks_results(
-            executors=executors, subtasks=subtasks,
+        dataset_source = self._get_dataset_source()
+        image_source = self._get_image_source()
+        image_publisher = self._get_image_publisher()
+        executors: list[node_models.Node] = []
+        published: Optional[asyncio.Task] = None
+        absence_delay = EXECUTORS_ABSENCE_MIN_DELAY
+        try:
+            with tracing.start_span('executor_discovery'):
+                while not executors:
+                    await self._update_nodes_statuses()
+                    executors = await self._get_active_executors()
+                    if executors:
+                        image_tag, dataset_uid, published = await publishing
+                        executors, subtasks_uids = await self._offer_subtasks(
+                            executors,
+                            image_tag=image_tag,
+                            dataset_uid=dataset_uid,
+                            dataset_source=dataset_source,
+                            image_source=image_source,
+                            image_publisher=image_publisher,
+                        )
+                    if not executors:
+                        await asyncio.sleep(absence_delay)
+                        absence_delay = min(
+                            absence_delay * 2, EXECUTORS_ABSENCE_DELAY,
+                        )
+            magnet_link = await published
+        finally:
+            publishing.cancel()
+            if published is not None:
+                published.cancel()
+        subtasks_params = self._separate_subtasks_params(
+            params, len(executors),
         )
-        merged_result = self._merge_results(results=subtasks_results)
-        task.status = models.TaskStatus.RESULT_PROCESSING
-        self.task_repository.update_entity(task)
-        task_result = self._process_task_result(
-            merged_result=merged_result, task_type=task_type,
+        subtasks = self._create_subtasks(
+            task_uid=task.task_uid,
+            subtasks_uids=subtasks_uids,
+            task_type=task_type,
+            executors=executors,
+            subtasks_params=subtasks_params,
         )
+        await self.subtask_repository.create_entities(subtasks)
+        task = await self.task_repository.get_entity(task_uid=task_uid)
+        task.status = models.TaskStatus.SUBTASKS_SENDING
+        await self.task_repository.update_entity(task)
+        with tracing.start_span('subtasks_sending'):
+            await self._send_subtasks(
+                executors=executors,
+                subtasks=subtasks,
+                image_tag=image_tag,
+                dataset_uid=dataset_uid,
+                magnet_link=magnet_link,
+                dataset_source=dataset_source,
+                image_source=image_source,
+            )
+        in_flight = metrics.SUBTASKS_IN_FLIGHT.labels('task_controller')
+        in_flight.inc(len(subtasks))
+        try:
+            with tracing.start_span('subtasks_execution'):
+                subtasks_results = await self._wait_subtask_execution(
+                    executors=executors, subtasks=subtasks,
+                )
+        finally:
+            in_flight.dec(len(subtasks))
+        with tracing.start_span('result_processing'):
+            merged_result = self._merge_results(results=subtasks_results)
+            task.status = models.TaskStatus.RESULT_PROCESSING
+            await self.task_repository.update_entity(task)
+            task_result = self._process_task_result(
+                merged_result=merged_result, task_type=task_type,
+            )
         task.status = models.TaskStatus.SUCCESS
         task.finished_at = datetime.datetime.now()
         task.result = task_result
-        self.task_repository.update_entity(task)
+        await self.task_repository.update_entity(task)
 
     @staticmethod
     def _separate_subtasks_params(
@@ -216,31 +389,53 @@ class TaskService:
 
     async def _update_nodes_statuses(self):
         print('refreshing nodes statuses...')
-        registries = [
-            node
-            for node in self.node_service.get_nodes()
-            if node.role == node_models.NodeRole.REGISTRY
-        ]
+        registries = await self.node_repository.get_entities(
+            role=node_models.NodeRole.REGISTRY,
+        )
         async with asyncio.TaskGroup() as tg:
             tasks = [
-                tg.create_task(
-                    node_client.NodeControllerClient().set_server(
-                        ipv4_address=registry.ipv4_address, port=registry.port,
-                    ).exchange_nodes(nodes=[])
-                )
+                tg.create_task(self._exchange_nodes(registry))
                 for registry in registries
             ]
-        nodes_lists = [task.result() for task in tasks]
-        for nodes_list in nodes_lists:
-            for node in nodes_list:
-                self.node_repository.upsert_entity(node)
+        known_nodes = {
+            node.node_uid: node
+            for node in await self.node_repository.get_entities()
+        }
+        changed_nodes: dict[uuid.UUID, node_models.Node] = {}
+        for task in tasks:
+            for node in task.result():
+                current = changed_nodes.get(
+                    node.node_uid, known_nodes.get(node.node_uid),
+                )
+                if current is None or not gossip.supersedes(current, node):
+                    changed_nodes[node.node_uid] = node
+        await self.node_repository.upsert_entities(changed_nodes.values())
         print(
-            'nodes statuses has been refreshed '
+            f'{len(changed_nodes)} nodes statuses has been refreshed '
             f'from {len(registries)} registries'
         )
 
+    async def _exchange_nodes(
+        self, registry: node_models.Node,
+    ) -> list[node_models.Node]:
+        client = node_client.NodeControllerClient().set_server(
+            ipv4_address=registry.ipv4_address, port=registry.port,
+        )
+        since_version = self.exchange_versions.get(registry.node_uid, 0)
+        nodes, version = await client.exchange_nodes(
+            nodes=[], since_version=since_version,
+        )
+        if version < since_version:
+            print(
+                f'registry {registry.node_uid} has been reset, '
+                'requesting all nodes'
+            )
+            nodes, version = await client.exchange_nodes(nodes=[])
+        self.exchange_versions[registry.node_uid] = version
+        return nodes
+
     async def _get_active_executors(self) -> list[node_models.Node]:
-        nodes = self.node_repository.get_entities()
+        nodes = await self.node_repository.get_entities()
         active_executors = [
             node
             for node in nodes
@@ -253,25 +448,38 @@ class TaskService:
         return active_executors
 
     async def _offer_subtasks(
-        self, executors: list[node_models.Node]
+        self,
+        executors: list[node_models.Node],
+        image_tag: str,
+        dataset_uid: uuid.UUID,
+        dataset_source: Optional[str],
+        image_source: Optional[str],
+        image_publisher: Optional[str],
     ) -> tuple[list[node_models.Node], list[uuid.UUID]]:
         self_node = self.node_service.get_self_node(self.config_path)
         subtask_uids: list[uuid.UUID] = []
         print(f'offering subtasks to {len(executors)} active executors')
         async with asyncio.TaskGroup() as tg:
-            subtask_uid = uuid.uuid4()
-            subtask_uids.append(subtask_uid)
-            tasks = [
-                tg.create_task(
-                    executor_client.TaskExecutorClient().set_server(
-                        ipv4_address=executor.ipv4_address, port=executor.port,
-                    ).offer_subtask(
-                        subtask_uid=subtask_uid,
-                        creator_uid=self_node.node_uid,
+            tasks = []
+            for executor in executors:
+                subtask_uid = uuid.uuid4()
+                subtask_uids.append(subtask_uid)
+                tasks.append(
+                    tg.create_task(
+                        executor_client.TaskExecutorClient().set_server(
+                            ipv4_address=executor.ipv4_address,
+                            port=executor.port,
+                        ).offer_subtask(
+                            subtask_uid=subtask_uid,
+                            creator_uid=self_node.node_uid,
+                            image_tag=image_tag,
+                            dataset_uid=dataset_uid,
+                            dataset_source=dataset_source,
+                            image_source=image_source,
+                            image_publisher=image_publisher,
+                        )
                     )
                 )
-                for executor in executors
-            ]
         executors_answers = [task.result() for task in tasks]
         agreed_executors: list[node_models.Node] = []
         agreed_executors_tasks_uids: list[uuid.UUID] = []
@@ -288,64 +496,105 @@ class TaskService:
         task_type: models.TaskType,
         subtask_type: models.SubtaskType,
         dataset_path: pathlib.Path,
-    ) -> tuple[str, uuid.UUID, str]:
+    ) -> tuple[str, uuid.UUID, asyncio.Task]:
         print(f'publishing task {task_uid} resources')
-        task = self.task_repository.get_entity(task_uid=task_uid)
-        image_tag, _ = await self.env_controller_client.set_server(
-            ipv4_address=ipaddress.IPv4Address('127.0.0.1'), port=8001,
-        ).push_image(task_type=task_type, subtask_type=subtask_type)
-        dataset_uid = (
-            await self.data_controller_client.set_server(
-                ipv4_address=ipaddress.IPv4Address('127.0.0.1'), port=8002,
-            ).publish_dataset(dataset_path=dataset_path)
+        task = await self.task_repository.get_entity(task_uid=task_uid)
+        (image_tag, _), dataset_uid = await asyncio.gather(
+            self.env_controller_client.push_image(
+                task_type=task_type,
+                subtask_type=subtask_type,
+                registry=IMAGE_REGISTRY,
+            ),
+            self.data_controller_client.publish_dataset(
+                dataset_path=dataset_path,
+            ),
         )
         task.status = models.TaskStatus.RESOURCES_PUBLISHING
         task.dataset_uid = dataset_uid
         task.created_at = datetime.datetime.now()
-        self.task_repository.update_entity(task)
-        print(f'waiting image {image_tag} pushing')
-        await self._wait_image_pushing(image_tag=image_tag)
-        print(f'image {image_tag} has been pushed')
-        print('waiting dataset publishing')
-        await self._wait_dataset_publishing(dataset_uid=dataset_uid)
-        dataset = await self.data_controller_client.set_server(
-            ipv4_address=ipaddress.IPv4Address('127.0.0.1'), port=8002,
-        ).get_dataset(dataset_uid=dataset_uid)
-        print(f'dataset {dataset_uid} has been published')
+        await self.task_repository.update_entity(task)
+        published = asyncio.create_task(
+            self._wait_publishing(
+                task_uid=task_uid,
+                image_tag=image_tag,
+                dataset_uid=dataset_uid,
+            ),
+        )
+        return image_tag, dataset_uid, published
+
+    async def _wait_publishing(
+        self, task_uid: uuid.UUID, image_tag: str, dataset_uid: uuid.UUID,
+    ) -> Optional[str]:
+        with tracing.start_span('publishing_resources'):
+            print(f'waiting image {image_tag} pushing and dataset publishing')
+            _, dataset = await asyncio.gather(
+                self._wait_image_pushing(image_tag=image_tag),
+                self._wait_dataset_publishing(dataset_uid=dataset_uid),
+            )
         print(f'task {task_uid} resources has been published')
-        return image_tag, dataset_uid, dataset.magnet_link
+        return dataset.magnet_link
+
+    def _get_dataset_source(self) -> str:
+        public_ip, _ = self.network_service.get_public_ip_and_port_from_config(
+            self.config_path,
+        )
+        return f'http://{public_ip}:{self.data_controller_client.port}'
+
+    def _get_image_source(self) -> Optional[str]:
+        if IMAGE_REGISTRY != env_models.Registry.PEER:
+            return None
+        return self._get_image_publisher()
+
+    def _get_image_publisher(self) -> str:
+        public_ip, _ = self.network_service.get_public_ip_and_port_from_config(
+            self.config_path,
+        )
+        return f'http://{public_ip}:{self.env_controller_client.port}'
 
     async def _wait_image_pushing(
         self, image_tag: str,
     ):
-        status = await self.env_controller_client.get_pull_image_status(
-            image_tag=image_tag,
-        )
-        while status != env_models.ImageStatus.PUSHED:
-            await asyncio.sleep(IMAGE_PUSHING_POLLING_DELAY)
+        with tracing.start_span('image_pushing', image_tag=image_tag):
             status = await self.env_controller_client.get_pull_image_status(
                 image_tag=image_tag,
             )
+            while status != env_models.ImageStatus.PUSHED:
+                if status in IMAGE_PUSHING_ERROR_STATUSES:
+                    raise RuntimeError(f'image {image_tag} publishing failed')
+                await asyncio.sleep(IMAGE_PUSHING_POLLING_DELAY)
+                status = (
+                    await self.env_controller_client.get_pull_image_status(
+                        image_tag=image_tag,
+                    )
+                )
+        print(f'image {image_tag} has been pushed')
 
     async def _wait_dataset_publishing(
         self, dataset_uid: uuid.UUID,
-    ):
-        status = await self.data_controller_client.get_dataset(
-            dataset_uid=dataset_uid,
-        )
-        while status.status != data_models.DatasetStatus.AVAILABLE:
-            await asyncio.sleep(DATASET_PUBLISHING_POLLING_DELAY)
-            status = await self.data_controller_client.get_dataset(
+    ) -> data_web.Dataset:
+        with tracing.start_span(
+            'dataset_publishing', dataset_uid=str(dataset_uid),
+        ):
+            dataset = await self.data_controller_client.get_dataset(
                 dataset_uid=dataset_uid,
             )
+            while dataset.status != data_models.DatasetStatus.AVAILABLE:
+                await asyncio.sleep(DATASET_PUBLISHING_POLLING_DELAY)
+                dataset = await self.data_controller_client.get_dataset(
+                    dataset_uid=dataset_uid,
+                )
+        print(f'dataset {dataset_uid} has been published')
+        return dataset
 
     async def _send_subtasks(
         self,
         executors: list[node_models.Node],
         subtasks: list[models.Subtask],
         image_tag: str,
-        magnet_link: str,
+        magnet_link: Optional[str],
         dataset_uid: uuid.UUID,
+        dataset_source: Optional[str] = None,
+        image_source: Optional[str] = None,
     ):
         print('sending subtasks to executors')
         async with asyncio.TaskGroup() as tg:
@@ -360,73 +609,146 @@ class TaskService:
                         magnet_link=magnet_link,
                         dataset_uid=dataset_uid,
                         params=subtasks[i].params,
+                        dataset_source=dataset_source,
+                        image_source=image_source,
                     )
                 )
                 for i in range(len(executors))
             ]
-        executors_subtasks = [task.result() for task in tasks]
-        for i in range(len(executors_subtasks)):
-            creator_subtask = subtasks[i]
-            creator_subtask.status = models.SubtaskStatus.RUNNING
-            self.subtask_repository.update_entity(creator_subtask)
+        for subtask in subtasks:
+            subtask.status = models.SubtaskStatus.RUNNING
+        await self.subtask_repository.upsert_entities(subtasks)
         print('subtasks has been sent to executors')
 
     async def _wait_subtask_execution(
         self,
         executors: list[node_models.Node],
         subtasks: list[models.Subtask]
-    ):
-        subtasks_done: list[bool] = [False for _ in range(len(subtasks))]
+    ) -> list[Optional[dict]]:
+        collections: list[Optional[asyncio.Task]] = [None] * len(subtasks)
         print('polling subtask running')
-        while not all(subtasks_done):
-            async with asyncio.TaskGroup() as tg:
-                tasks = [
-                    tg.create_task(
-                        executor_client.TaskExecutorClient().set_server(
-                            ipv4_address=executors[i].ipv4_address,
-                            port=executors[i].port
-                        ).get_subtask(subtask_uid=subtasks[i].subtask_uid)
-                    )
-                    for i in range(len(subtasks))
-                ]
-            executors_subtasks = [task.result() for task in tasks]
-            ended_statuses = {
-                executor_models.SubtaskStatus.SUCCESS,
-                executor_models.SubtaskStatus.CANCELLED,
-                executor_models.SubtaskStatus.ERROR,
-                executor_models.SubtaskStatus.TIMEOUT,
-            }
-            subtasks_done = [
-                executor_subtask.status in ended_statuses
-                for executor_subtask in executors_subtasks
-            ]
-            await asyncio.sleep(SUBTASKS_RUNNING_POLLING_DELAY)
+        async with asyncio.TaskGroup() as collecting:
+            while not all(collections):
+                async with asyncio.TaskGroup() as tg:
+                    tasks = {
+                        i: tg.create_task(
+                            executor_client.TaskExecutorClient().set_server(
+                                ipv4_address=executors[i].ipv4_address,
+                                port=executors[i].port
+                            ).get_subtask(subtask_uid=subtasks[i].subtask_uid)
+                        )
+                        for i in range(len(subtasks))
+                        if collections[i] is None
+                    }
+                for i, task in tasks.items():
+                    executor_subtask = task.result()
+                    if executor_subtask.status in ENDED_EXECUTOR_STATUSES:
+                        collections[i] = collecting.create_task(
+                            self._finish_subtask(
+                                executor=executors[i],
+                                subtask=subtasks[i],
+                                executor_subtask=executor_subtask,
+                            )
+                        )
+                if not all(collections):
+                    await asyncio.sleep(SUBTASKS_RUNNING_POLLING_DELAY)
         print('subtasks has been finished')
+        return [collection.result() for collection in collections]
 
-    async def _get_subtasks_results(
+    async def _finish_subtask(
         self,
-        executors: list[node_models.Node],
-        subtasks: list[models.Subtask]
-    ) -> list[dict]:
-        print('getting subtasks result')
-        async with asyncio.TaskGroup() as tg:
-            tasks = [
-                tg.create_task(
-                    executor_client.TaskExecutorClient().set_server(
-                        ipv4_address=executors[i].ipv4_address,
-                        port=executors[i].port,
-                    ).get_subtask_result(subtask_uid=subtasks[i].subtask_uid)
+        executor: node_models.Node,
+        subtask: models.Subtask,
+        executor_subtask: executor_models.Subtask,
+    ) -> Optional[dict]:
+        subtask.status = models.SubtaskStatus(executor_subtask.status.value)
+        subtask.finished_at = (
+            executor_subtask.finished_at or datetime.datetime.now()
+        )
+        await self.subtask_repository.update_entity(subtask)
+        with tracing.start_span(
+            'results_collection', subtask_uid=str(subtask.subtask_uid),
+        ):
+            return await self._collect_subtask_result(
+                executor=executor,
+                subtask=subtask,
+                executor_subtask=executor_subtask,
+            )
+
+    async def _collect_subtask_result(
+        self,
+        executor: node_models.Node,
+        subtask: models.Subtask,
+        executor_subtask: executor_models.Subtask,
+    ) -> Optional[dict]:
+        if executor_subtask.status != executor_models.SubtaskStatus.SUCCESS:
+            print(
+                f'subtask {subtask.subtask_uid} has no result, '
+                f'it is {executor_subtask.status.value}'
+            )
+            return None
+        result = await executor_client.TaskExecutorClient().set_server(
+            ipv4_address=executor.ipv4_address, port=executor.port,
+        ).get_subtask_result(subtask_uid=subtask.subtask_uid)
+        if result is not None:
+            await self.result_repository.upsert_entities(
+                self._create_results(
+                    subtask=subtask,
+                    executor_subtask=executor_subtask,
+                    result=result,
+                )
+            )
+        return result
+
+    @staticmethod
+    def _create_results(
+        subtask: models.Subtask,
+        executor_subtask: executor_models.Subtask,
+        result: dict,
+    ) -> list[models.Result]:
+        duration = (
+            (
+                executor_subtask.finished_at - executor_subtask.created_at
+            ).total_seconds()
+            if executor_subtask.created_at and executor_subtask.finished_at
+            else None
+        )
+        created_at = datetime.datetime.now()
+        results: list[models.Result] = []
+        for entry in result.get('result', []):
+            params = entry.get('params', {})
+            params_hash = hashlib.sha256(
+                json.dumps(params, sort_keys=True).encode(),
+            ).hexdigest()
+            for metric, value in entry.items():
+                if metric == 'params' or not isinstance(value, (int, float)):
+                    continue
+                results.append(
+                    models.Result(
+                        task_uid=subtask.task_uid,
+                        subtask_uid=subtask.subtask_uid,
+                        params_hash=params_hash,
+                        params=params,
+                        metric=metric,
+                        value=float(value),
+                        duration=duration,
+                        created_at=created_at,
+                    )
                 )
-                for i in range(len(subtasks))
-            ]
-        results = [task.result() for task in tasks]
-        print('subtasks result has been got')
         return results
 
     @staticmethod
     def _merge_results(results: list[Optional[dict]],) -> list[dict]:
+        succeeded = [result for result in results if result is not None]
+        if not succeeded:
+            raise RuntimeError(f'none of {len(results)} subtasks has a result')
+        if len(succeeded) < len(results):
+            print(
+                f'merging {len(succeeded)} of {len(results)} subtasks '
+                'results, the others have not succeeded'
+            )
         united_result = []
-        for result in results:
+        for result in succeeded:
             united_result.extend(result['result'])
         return united_result
 
@@ -439,16 +761,85 @@ class TaskService:
             return {'result': answer}
 
     async def get_task(self, task_uid: uuid.UUID) -> Optional[models.Task]:
-        task = self.task_repository.get_entity(task_uid=task_uid)
+        task = await self.task_repository.get_entity(task_uid=task_uid)
         return task
 
-    async def get_tasks(self) -> Iterable[models.Task]:
-        return self.task_repository.get_entities()
+    async def get_tasks(
+        self,
+        status: Optional[models.TaskStatus],
+        created_after: Optional[datetime.datetime],
+        created_before: Optional[datetime.datetime],
+        cursor: Optional[int],
+        limit: int,
+    ) -> tuple[list[models.Task], Optional[int]]:
+        return await self.task_repository.get_page(
+            status=status,
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            limit=limit,
+        )
 
     async def get_task_result(self, task_uid: uuid.UUID) -> Optional[dict]:
-        task = self.task_repository.get_entity(task_uid=task_uid)
+        task = await self.task_repository.get_entity(task_uid=task_uid)
         return task.result
 
+    async def get_results(
+        self,
+        task_uid: Optional[uuid.UUID],
+        metric: Optional[str],
+        order_by: str,
+        descending: bool,
+        offset: int,
+        limit: int,
+    ) -> tuple[list[models.Result], int]:
+        results = await self.result_repository.get_entities(
+            task_uid=task_uid,
+            metric=metric,
+            order_by=order_by,
+            descending=descending,
+            offset=offset,
+            limit=limit,
+        )
+        total = await self.result_repository.count_entities(
+            task_uid=task_uid, metric=metric,
+        )
+        return results, total
+
+    async def get_task_timeline(
+        self, task_uid: uuid.UUID,
+    ) -> list[tracing.TimelineEntry]:
+        trace_id = task_uid.hex
+        spans = await asyncio.to_thread(tracing.read_trace, trace_id)
+        task = await self.task_repository.get_entity(task_uid=task_uid)
+        executors_uids = {
+            subtask.executor_uid
+            for subtask in (task.subtasks if task is not None else [])
+            if subtask.executor_uid is not None
+        }
+        executors = [
+            node
+            for node in await self.node_repository.get_entities()
+            if node.node_uid in executors_uids
+        ]
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(
+                    executor_client.TaskExecutorClient().set_server(
+                        ipv4_address=executor.ipv4_address,
+                        port=executor.port,
+                    ).get_traces(trace_id=trace_id)
+                )
+                for executor in executors
+            ]
+        known_spans = {span.span_id for span in spans}
+        for task_spans in tasks:
+            for span in task_spans.result():
+                if span.span_id not in known_spans:
+                    known_spans.add(span.span_id)
+                    spans.append(span)
+        return tracing.build_timeline(spans)
+
     @property
     def config_path(self) -> pathlib.Path:
         return pathlib.Path(__file__).parent.parent / 'config' / 'config.json'
@@ -0,0 +1,97 @@
+import pathlib
+from typing import Optional
+import uuid
+
+import aiohttp
+
+import src.common.client.client as client_base
+import src.task_controller.models.core as models
+import src.task_controller.models.web as web
+
+
+class TaskControllerClient(client_base.ClientBase):
+    async def create_task(
+        self,
+        task_type: models.TaskType,
+        params: dict,
+        dataset_path: pathlib.Path,
+    ) -> uuid.UUID:
+        url = self.get_server_url('/task/create')
+        request_body = web.TaskCreateRequest(
+            task_type=task_type, params=params, dataset_path=dataset_path,
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
+                json = await response.json()
+        response_body = web.TaskCreateResponse.model_validate(json)
+        return response_body.task_uid
+
+    async def get_task(self, task_uid: uuid.UUID) -> Optional[web.Task]:
+        url = self.get_server_url('/task')
+        request_body = web.GetTaskRequest(
+            task_uid=task_uid,
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
+                json = await response.json()
+        response_body = web.GetTaskResponse.model_validate(json)
+        return response_body.task
+
+    async def cancel_task(self, task_uid: uuid.UUID) -> Optional[web.Task]:
+        url = self.get_server_url('/task/cancel')
+        request_body = web.CancelTaskRequest(
+            task_uid=task_uid,
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
+                json = await response.json()
+        response_body = web.CancelTaskResponse.model_validate(json)
+        return response_body.task
+
+    async def get_task_result(self, task_uid: uuid.UUID) -> Optional[dict]:
+        url = self.get_server_url('/task/result')
+        request_body = web.GetTaskResultRequest(
+            task_uid=task_uid,
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
+                json = await response.json()
+        response_body = web.GetTaskResultResponse.model_validate(json)
+        return response_body.result
+
+    async def get_results(
+        self,
+        task_uid: Optional[uuid.UUID] = None,
+        metric: Optional[str] = None,
+        order_by: str = 'value',
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[models.Result], int]:
+        url = self.get_server_url('/results')
+        request_body = web.GetResultsRequest(
+            task_uid=task_uid,
+            metric=metric,
+            order_by=order_by,
+            descending=descending,
+            offset=offset,
+            limit=limit,
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
+                json = await response.json()
+        response_body = web.GetResultsResponse.model_validate(json)
+        return (
+            [result.to_core() for result in response_body.results],
+            response_body.total,
+        )
@@ -17,6 +17,7 @@ class SubtaskStatus(enum.Enum):
     SUCCESS = 'success'
     ERROR = 'error'
     TIMEOUT = 'timeout'
+    CANCELLED = 'cancelled'
 
 
 @dataclasses.dataclass
@@ -45,6 +46,7 @@ class TaskStatus(enum.Enum):
     RESULT_PROCESSING = 'result_processing'
     SUCCESS = 'success'
     ERROR = 'error'
+    CANCELLED = 'cancelled'
 
 
 @dataclasses.dataclass
@@ -59,3 +61,15 @@ class Task:
     params: Optional[dict]
     result: Optional[dict]
     subtasks: list[Subtask]
+
+
+@dataclasses.dataclass
+class Result:
+    task_uid: uuid.UUID
+    subtask_uid: uuid.UUID
+    params_hash: str
+    params: dict
+    metric: str
+    value: float
+    duration: Optional[float]
+    created_at: datetime.datetime
@@ -19,12 +19,14 @@ class Subtask(Base):
     subtask_uid: orm.Mapped[str] = orm.mapped_column(
         sql.String(36), primary_key=True
     )
-    task_uid: orm.Mapped[str] = orm.mapped_column(sql.ForeignKey('task.task_uid'))
+    task_uid: orm.Mapped[str] = orm.mapped_column(
+        sql.ForeignKey('task.task_uid'), index=True,
+    )
     subtask_type: orm.Mapped[str] = orm.mapped_column(sql.String(64))
     executor_uid: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(36))
-    status: orm.Mapped[str] = orm.mapped_column(sql.String(64))
+    status: orm.Mapped[str] = orm.mapped_column(sql.String(64), index=True)
     created_at: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(23))
-    finished_at: orm.Mapped[Optional[str]] = orm.mapped_column(sql.DateTime)
+    finished_at: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(23))
     params: orm.Mapped[Optional[dict]] = orm.mapped_column(sql.Text)
     result: orm.Mapped[Optional[dict]] = orm.mapped_column(sql.Text)
 
@@ -58,20 +60,12 @@ class Subtask(Base):
         return core.Subtask(
             subtask_uid=uuid.UUID(self.subtask_uid),
             task_uid=uuid.UUID(self.task_uid),
-            subtask_type=[
-                elem
-                for elem in core.SubtaskType
-                if elem.value == self.subtask_type
-            ][0],
+            subtask_type=core.SubtaskType(self.subtask_type),
             executor_uid=(
                 uuid.UUID(str(self.executor_uid))
                 if self.executor_uid else None
             ),
-            status=[
-                elem
-                for elem in core.SubtaskStatus
-                if elem.value == self.status
-            ][0],
+            status=core.SubtaskStatus(self.status),
             created_at=(
                 datetime.datetime.fromisoformat(str(self.created_at))
                 if self.created_at is not None
@@ -117,10 +111,10 @@ class Task(Base):
     )
     task_type: orm.Mapped[str] = orm.mapped_column(sql.String(64))
     creator_uid: orm.Mapped[str] = orm.mapped_column(sql.String(36))
-    status: orm.Mapped[str] = orm.mapped_column(sql.String(64))
+    status: orm.Mapped[str] = orm.mapped_column(sql.String(64), index=True)
     dataset_uid: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(36))
     created_at: orm.Mapped[Optional[datetime.datetime]] = orm.mapped_column(
-        sql.String(23),
+        sql.String(23), index=True,
     )
     finished_at: orm.Mapped[Optional[datetime.datetime]] = orm.mapped_column(
         sql.String(23),
@@ -161,21 +155,13 @@ class Task(Base):
     def to_core(self) -> core.Task:
         return core.Task(
             task_uid=uuid.UUID(self.task_uid),
-            task_type=[
-                elem
-                for elem in core.TaskType
-                if elem.value == self.task_type
-            ][0],
+            task_type=core.TaskType(self.task_type),
             creator_uid=uuid.UUID(self.creator_uid),
             dataset_uid=(
                 uuid.UUID(str(self.dataset_uid))
                 if self.dataset_uid is not None else None
             ),
-            status=[
-                elem
-                for elem in core.TaskStatus
-                if elem.value == self.status
-            ][0],
+            status=core.TaskStatus(self.status),
             created_at=(
                 datetime.datetime.fromisoformat(str(self.created_at))
                 if self.created_at is not None else None
@@ -208,3 +194,68 @@ class Task(Base):
             f"params={self.params!r}, "
             f"result={self.result!r})"
         )
+
+
+class Result(Base):
+    __tablename__ = 'result'
+    __table_args__ = (
+        sql.Index(
+            'ix_result_task_metric_value', 'task_uid', 'metric', 'value',
+        ),
+        sql.Index('ix_result_metric_value', 'metric', 'value'),
+    )
+
+    subtask_uid: orm.Mapped[str] = orm.mapped_column(
+        sql.String(36), primary_key=True,
+    )
+    params_hash: orm.Mapped[str] = orm.mapped_column(
+        sql.String(64), primary_key=True,
+    )
+    metric: orm.Mapped[str] = orm.mapped_column(
+        sql.String(64), primary_key=True,
+    )
+    task_uid: orm.Mapped[str] = orm.mapped_column(
+        sql.ForeignKey('task.task_uid'),
+    )
+    params: orm.Mapped[str] = orm.mapped_column(sql.Text)
+    value: orm.Mapped[float] = orm.mapped_column(sql.Float)
+    duration: orm.Mapped[Optional[float]] = orm.mapped_column(sql.Float)
+    created_at: orm.Mapped[str] = orm.mapped_column(sql.String(23))
+
+    @staticmethod
+    def from_core(obj: core.Result) -> 'Result':
+        return Result(
+            subtask_uid=str(obj.subtask_uid),
+            params_hash=obj.params_hash,
+            metric=obj.metric,
+            task_uid=str(obj.task_uid),
+            params=json.dumps(obj.params, sort_keys=True),
+            value=obj.value,
+            duration=obj.duration,
+            created_at=obj.created_at.isoformat(timespec='milliseconds'),
+        )
+
+    def to_core(self) -> core.Result:
+        return core.Result(
+            task_uid=uuid.UUID(self.task_uid),
+            subtask_uid=uuid.UUID(self.subtask_uid),
+            params_hash=self.params_hash,
+            params=json.loads(self.params),
+            metric=self.metric,
+            value=self.value,
+            duration=self.duration,
+            created_at=datetime.datetime.fromisoformat(self.created_at),
+        )
+
+    def __repr__(self):
+        return (
+            "Result("
+            f"task_uid={self.task_uid!r}, "
+            f"subtask_uid={self.subtask_uid!r}, "
+            f"params_hash={self.params_hash!r}, "
+            f"params={self.params!r}, "
+            f"metric={self.metric!r}, "
+            f"value={self.value!r}, "
+            f"duration={self.duration!r}, "
+            f"created_at={self.created_at!r})"
+        )
@@ -4,9 +4,14 @@ import pydantic
 import datetime
 import uuid
 
+import src.common.backend.tracing as tracing
 import src.common.models.web as common_web
 import src.task_controller.models.core as core
 
+ORDER_BY_REGEX = (
+    r'^(value|duration|created_at|params\.[A-Za-z_][A-Za-z0-9_]*)$'
+)
+
 
 class Subtask(pydantic.BaseModel):
     subtask_uid: pydantic.UUID4
@@ -65,7 +70,8 @@ class Task(pydantic.BaseModel):
             task_uid=obj.task_uid,
             task_type=obj.task_type,
             creator_uid=obj.creator_uid,
-            task_status=obj.status,
+            status=obj.status,
+            dataset_uid=obj.dataset_uid,
             created_at=obj.created_at,
             finished_at=obj.finished_at,
             params=obj.params,
@@ -106,6 +112,14 @@ class GetTaskResponse(common_web.BaseResponse):
     task: Optional[Task]
 
 
+class CancelTaskRequest(pydantic.BaseModel):
+    task_uid: pydantic.UUID4
+
+
+class CancelTaskResponse(common_web.BaseResponse):
+    task: Optional[Task]
+
+
 class GetSubtaskRequest(pydantic.BaseModel):
     subtask_uid: pydantic.UUID4
 
@@ -114,13 +128,113 @@ class GetSubtaskResponse(common_web.BaseResponse):
     subtask: Optional[Subtask]
 
 
+class GetTasksRequest(pydantic.BaseModel):
+    status: Optional[core.TaskStatus] = None
+    created_after: Optional[datetime.datetime] = None
+    created_before: Optional[datetime.datetime] = None
+    cursor: Optional[int] = None
+    limit: int = pydantic.Field(default=100, ge=1, le=1000)
+
+
 class GetTasksResponse(common_web.BaseResponse):
     tasks: list[Task]
+    next_cursor: Optional[int] = None
+
+
+class Result(pydantic.BaseModel):
+    task_uid: pydantic.UUID4
+    subtask_uid: pydantic.UUID4
+    params_hash: str
+    params: dict
+    metric: str
+    value: float
+    duration: Optional[float]
+    created_at: datetime.datetime
+
+    @staticmethod
+    def from_core(obj: core.Result) -> 'Result':
+        return Result(
+            task_uid=obj.task_uid,
+            subtask_uid=obj.subtask_uid,
+            params_hash=obj.params_hash,
+            params=obj.params,
+            metric=obj.metric,
+            value=obj.value,
+            duration=obj.duration,
+            created_at=obj.created_at,
+        )
+
+    def to_core(self) -> core.Result:
+        return core.Result(
+            task_uid=self.task_uid,
+            subtask_uid=self.subtask_uid,
+            params_hash=self.params_hash,
+            params=self.params,
+            metric=self.metric,
+            value=self.value,
+            duration=self.duration,
+            created_at=self.created_at,
+        )
 
 
-class GetTaskResultRequest(pydantic.BaseModel):
+class ResultsPage(pydantic.BaseModel):
+    metric: Optional[str] = None
+    order_by: str = pydantic.Field(
+        default='value', pattern=ORDER_BY_REGEX,
+    )
+    descending: bool = True
+    offset: int = pydantic.Field(default=0, ge=0)
+    limit: int = pydantic.Field(default=100, ge=1, le=1000)
+
+
+class GetTaskResultRequest(ResultsPage):
     task_uid: pydantic.UUID4
 
 
 class GetTaskResultResponse(common_web.BaseResponse):
     result: Optional[dict]
+    results: list[Result] = []
+    total: int = 0
+
+
+class GetResultsRequest(ResultsPage):
+    task_uid: Optional[pydantic.UUID4] = None
+
+
+class GetResultsResponse(common_web.BaseResponse):
+    results: list[Result]
+    total: int
+
+
+class TimelineEntry(pydantic.BaseModel):
+    name: str
+    service: str
+    span_id: str
+    parent_span_id: Optional[str]
+    depth: int
+    offset: float
+    duration: float
+    critical: bool
+    attributes: dict
+
+    @staticmethod
+    def from_core(obj: tracing.TimelineEntry) -> 'TimelineEntry':
+        return TimelineEntry(
+            name=obj.span.name,
+            service=obj.span.service,
+            span_id=obj.span.span_id,
+            parent_span_id=obj.span.parent_span_id,
+            depth=obj.depth,
+            offset=obj.offset,
+            duration=obj.span.duration,
+            critical=obj.critical,
+            attributes=obj.span.attributes,
+        )
+
+
+class GetTaskTimelineRequest(pydantic.BaseModel):
+    task_uid: pydantic.UUID4
+
+
+class GetTaskTimelineResponse(common_web.BaseResponse):
+    timeline: list[TimelineEntry]
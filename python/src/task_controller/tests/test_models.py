@@ -0,0 +1,40 @@
+import datetime
+import uuid
+
+import src.task_controller.models.core as core
+import src.task_controller.models.web as web
+
+CONST_TASK_UUID = uuid.UUID('525ca440-4673-46ba-8d04-4c9cf5e29bb2')
+CONST_SUBTASK_UUID = uuid.UUID('0797c85c-5b43-44a3-b03f-4ec3ca08a9bd')
+CONST_NODE_UUID = uuid.UUID('062fb045-a4fe-456d-aa1d-cb435e4657f2')
+CONST_DATASET_UUID = uuid.UUID('3d801391-388c-4254-a770-795b72bdc7a3')
+
+
+def test_task_model_core_web_conversion():
+    subtask = core.Subtask(
+        subtask_uid=CONST_SUBTASK_UUID,
+        task_uid=CONST_TASK_UUID,
+        subtask_type=core.SubtaskType.GRID_SEARCH,
+        executor_uid=CONST_NODE_UUID,
+        status=core.SubtaskStatus.RUNNING,
+        created_at=datetime.datetime(2024, 6, 9, 12, 0),
+        finished_at=None,
+        params={'subtask_params': [{'max_depth': 3}]},
+        result=None,
+    )
+    core_model = core.Task(
+        task_uid=CONST_TASK_UUID,
+        task_type=core.TaskType.GRID_SEARCH,
+        creator_uid=CONST_NODE_UUID,
+        status=core.TaskStatus.SUBTASKS_POLLING,
+        dataset_uid=CONST_DATASET_UUID,
+        created_at=datetime.datetime(2024, 6, 9, 12, 0),
+        finished_at=None,
+        params={'subtasks_params': [{'max_depth': 3}]},
+        result=None,
+        subtasks=[subtask],
+    )
+    web_model = web.Task.from_core(core_model)
+    assert web_model.status == core_model.status
+    assert web_model.dataset_uid == core_model.dataset_uid
+    assert web_model.to_core() == core_model
@@ -0,0 +1,103 @@
+import datetime
+import pathlib
+import uuid
+
+import pytest
+
+import src.common.backend.db as database
+import src.task_controller.backend.repositories as repositories
+import src.task_controller.models.core as core
+import src.task_controller.models.db as db_models
+
+CONST_DATETIME = datetime.datetime(2024, 6, 9, 12, 0)
+
+
+def make_result(
+    task_uid: uuid.UUID, max_depth: int, value: float,
+) -> core.Result:
+    return core.Result(
+        task_uid=task_uid,
+        subtask_uid=uuid.uuid4(),
+        params_hash=f'{max_depth:064}',
+        params={'max_depth': max_depth},
+        metric='f1_score',
+        value=value,
+        duration=1.0,
+        created_at=CONST_DATETIME,
+    )
+
+
+@pytest.fixture
+def repository(tmp_path: pathlib.Path) -> repositories.ResultRepository:
+    return repositories.ResultRepository(
+        database.DB(
+            db_name=str(tmp_path / 'tasks.sqlite'), base=db_models.Base,
+        )
+    )
+
+
+def test_results_are_sorted_and_paged(
+    repository: repositories.ResultRepository,
+):
+    first_task, second_task = uuid.uuid4(), uuid.uuid4()
+    repository.upsert_entities(
+        [make_result(first_task, depth, depth / 10) for depth in range(5)] +
+        [make_result(second_task, 9, 0.95)]
+    )
+    top = repository.get_entities(metric='f1_score', limit=2)
+    assert [result.value for result in top] == [0.95, 0.4]
+    page = repository.get_entities(
+        task_uid=first_task, order_by='params.max_depth', descending=False,
+        offset=1, limit=2,
+    )
+    assert [result.params['max_depth'] for result in page] == [1, 2]
+    assert repository.count_entities(task_uid=first_task) == 5
+
+
+def make_task(status: core.TaskStatus, minute: int) -> core.Task:
+    return core.Task(
+        task_uid=uuid.uuid4(),
+        task_type=core.TaskType.GRID_SEARCH,
+        creator_uid=uuid.uuid4(),
+        status=status,
+        dataset_uid=None,
+        created_at=CONST_DATETIME + datetime.timedelta(minutes=minute),
+        finished_at=None,
+        params={},
+        result=None,
+        subtasks=[],
+    )
+
+
+def test_tasks_are_filtered_and_paged_by_cursor(tmp_path: pathlib.Path):
+    repository = repositories.TaskRepository(
+        database.DB(
+            db_name=str(tmp_path / 'tasks.sqlite'), base=db_models.Base,
+        )
+    )
+    tasks = [
+        make_task(
+            core.TaskStatus.SUCCESS if i % 2 else core.TaskStatus.ERROR, i,
+        )
+        for i in range(7)
+    ]
+    for task in tasks:
+        repository.create_entity(task)
+    page, cursor = repository.get_page(limit=3)
+    assert page == tasks[:3:-1] and cursor is not None
+    page, cursor = repository.get_page(cursor=cursor, limit=3)
+    assert page == tasks[3:0:-1] and cursor is not None
+    page, cursor = repository.get_page(cursor=cursor, limit=3)
+    assert page == tasks[:1] and cursor is None
+    page, _ = repository.get_page(
+        status=core.TaskStatus.SUCCESS,
+        created_after=CONST_DATETIME + datetime.timedelta(minutes=2),
+    )
+    assert page == [tasks[5], tasks[3]]
+
+
+def test_results_are_not_ordered_by_arbitrary_json_paths(
+    repository: repositories.ResultRepository,
+):
+    with pytest.raises(ValueError):
+        repository.get_entities(order_by='params.max_depth[0]')
@@ -0,0 +1,233 @@
+import asyncio
+import dataclasses
+import datetime
+import ipaddress
+import pathlib
+from typing import Optional
+import uuid
+
+import pytest
+
+import src.common.backend.db as database
+import src.node_controller.backend.repositories as node_repositories
+import src.node_controller.models.core as node_core
+import src.node_controller.models.db as node_db_models
+import src.task_controller.backend.repositories as repositories
+import src.task_controller.backend.services as services
+import src.task_controller.models.core as core
+import src.task_controller.models.db as db_models
+import src.task_executor.models.core as executor_core
+
+UNREACHABLE_PORT = 1
+
+
+def make_subtask(
+    task_uid: uuid.UUID, executor_uid: Optional[uuid.UUID] = None,
+) -> core.Subtask:
+    return core.Subtask(
+        subtask_uid=uuid.uuid4(),
+        task_uid=task_uid,
+        subtask_type=core.SubtaskType.GRID_SEARCH,
+        executor_uid=executor_uid,
+        status=core.SubtaskStatus.WAITING_EXECUTOR_ASSIGNMENT,
+        created_at=None,
+        finished_at=None,
+        params={'max_depth': 3},
+        result=None,
+    )
+
+
+def test_subtask_service_reads_subtask(tmp_path: pathlib.Path):
+    repository = repositories.SubtaskRepository(
+        database.DB(
+            db_name=str(tmp_path / 'tasks.sqlite'), base=db_models.Base,
+        )
+    )
+    subtask = make_subtask(uuid.uuid4())
+    repository.create_entity(subtask)
+    subtask_service = services.SubtaskService(repository)
+
+    async def main() -> list:
+        return [
+            await subtask_service.get_subtask(subtask.subtask_uid),
+            await subtask_service.get_subtask(uuid.uuid4()),
+        ]
+
+    assert asyncio.run(main()) == [subtask, None]
+
+
+def test_task_is_cancelled_when_executor_is_unreachable(
+    tmp_path: pathlib.Path,
+):
+    db = database.DB(
+        db_name=str(tmp_path / 'tasks.sqlite'), base=db_models.Base,
+    )
+    node_repository = node_repositories.NodeRepository(
+        database.DB(
+            db_name=str(tmp_path / 'nodes.sqlite'), base=node_db_models.Base,
+        )
+    )
+    executor = node_core.Node(
+        node_uid=uuid.uuid4(),
+        ipv4_address=ipaddress.IPv4Address('127.0.0.1'),
+        port=UNREACHABLE_PORT,
+        role=node_core.NodeRole.EXECUTOR,
+        status=node_core.NodeStatus.ACTIVE,
+        last_ping=datetime.datetime.now(),
+    )
+    node_repository.create_entity(executor)
+    task = core.Task(
+        task_uid=uuid.uuid4(),
+        task_type=core.TaskType.GRID_SEARCH,
+        creator_uid=uuid.uuid4(),
+        status=core.TaskStatus.SUBTASKS_POLLING,
+        dataset_uid=None,
+        created_at=datetime.datetime.now(),
+        finished_at=None,
+        params={},
+        result=None,
+        subtasks=[],
+    )
+    repositories.TaskRepository(db).create_entity(task)
+    subtask_repository = repositories.SubtaskRepository(db)
+    subtask_repository.create_entity(
+        make_subtask(task.task_uid, executor.node_uid),
+    )
+    task_service = services.TaskService(
+        task_repository=repositories.TaskRepository(db),
+        subtask_service=services.SubtaskService(subtask_repository),
+        subtask_repository=subtask_repository,
+        result_repository=repositories.ResultRepository(db),
+        node_service=None,
+        node_repository=node_repository,
+        network_service=None,
+    )
+
+    cancelled = asyncio.run(task_service.cancel_task(task.task_uid))
+    assert cancelled.status == core.TaskStatus.CANCELLED
+    assert [subtask.status for subtask in cancelled.subtasks] == [
+        core.SubtaskStatus.CANCELLED,
+    ]
+
+
+def test_exchanged_nodes_do_not_override_newer_gossip_state(
+    tmp_path: pathlib.Path, monkeypatch,
+):
+    node_repository = node_repositories.NodeRepository(
+        database.DB(
+            db_name=str(tmp_path / 'nodes.sqlite'), base=node_db_models.Base,
+        )
+    )
+    registry, suspect, restarted, joined = (
+        node_core.Node(
+            node_uid=uuid.uuid4(),
+            ipv4_address=ipaddress.IPv4Address('127.0.0.1'),
+            port=port,
+            role=role,
+            status=status,
+            last_ping=datetime.datetime.now(),
+            incarnation=2,
+        )
+        for port, role, status in (
+            (1, node_core.NodeRole.REGISTRY, node_core.NodeStatus.ACTIVE),
+            (2, node_core.NodeRole.EXECUTOR, node_core.NodeStatus.SUSPECT),
+            (3, node_core.NodeRole.EXECUTOR, node_core.NodeStatus.INACTIVE),
+            (4, node_core.NodeRole.EXECUTOR, node_core.NodeStatus.ACTIVE),
+        )
+    )
+    node_repository.upsert_entities([registry, suspect, restarted])
+    exchanged = [
+        dataclasses.replace(suspect, status=node_core.NodeStatus.ACTIVE),
+        dataclasses.replace(
+            restarted, status=node_core.NodeStatus.ACTIVE, incarnation=3,
+        ),
+        joined,
+    ]
+    task_service = services.TaskService(
+        task_repository=None,
+        subtask_service=None,
+        subtask_repository=None,
+        result_repository=None,
+        node_service=None,
+        node_repository=node_repository,
+        network_service=None,
+    )
+
+    async def exchange_nodes(registry: node_core.Node) -> list:
+        return exchanged
+
+    monkeypatch.setattr(task_service, '_exchange_nodes', exchange_nodes)
+    asyncio.run(task_service._update_nodes_statuses())
+    statuses = {
+        node.node_uid: (node.status, node.incarnation)
+        for node in node_repository.get_entities()
+    }
+    assert statuses[suspect.node_uid] == (node_core.NodeStatus.SUSPECT, 2)
+    assert statuses[restarted.node_uid] == (node_core.NodeStatus.ACTIVE, 3)
+    assert statuses[joined.node_uid] == (node_core.NodeStatus.ACTIVE, 2)
+
+
+def test_timed_out_subtask_is_recorded_and_skipped(tmp_path: pathlib.Path):
+    db = database.DB(
+        db_name=str(tmp_path / 'tasks.sqlite'), base=db_models.Base,
+    )
+    subtask_repository = repositories.SubtaskRepository(db)
+    task_uid = uuid.uuid4()
+    executor = node_core.Node(
+        node_uid=uuid.uuid4(),
+        ipv4_address=ipaddress.IPv4Address('127.0.0.1'),
+        port=UNREACHABLE_PORT,
+        role=node_core.NodeRole.EXECUTOR,
+        status=node_core.NodeStatus.ACTIVE,
+        last_ping=datetime.datetime.now(),
+    )
+    subtasks = [make_subtask(task_uid, executor.node_uid) for _ in range(2)]
+    subtask_repository.create_entities(subtasks)
+    finished_at = datetime.datetime(2024, 6, 9, 12, 0)
+    executors_subtasks = [
+        executor_core.Subtask(
+            subtask_uid=subtask.subtask_uid,
+            creator_uid=uuid.uuid4(),
+            dataset_uid=None,
+            status=status,
+            created_at=None,
+            finished_at=finished_at,
+        )
+        for subtask, status in zip(
+            subtasks,
+            (
+                executor_core.SubtaskStatus.SUCCESS,
+                executor_core.SubtaskStatus.TIMEOUT,
+            ),
+        )
+    ]
+    task_service = services.TaskService(
+        task_repository=None,
+        subtask_service=None,
+        subtask_repository=subtask_repository,
+        result_repository=None,
+        node_service=None,
+        node_repository=None,
+        network_service=None,
+    )
+
+    timed_out = subtasks[1]
+    assert asyncio.run(
+        task_service._finish_subtask(
+            executor, timed_out, executors_subtasks[1],
+        )
+    ) is None
+    assert [
+        (subtask.status, subtask.finished_at)
+        for subtask in map(
+            subtask_repository.get_entity,
+            (subtask.subtask_uid for subtask in subtasks),
+        )
+    ] == [
+        (core.SubtaskStatus.WAITING_EXECUTOR_ASSIGNMENT, None),
+        (core.SubtaskStatus.TIMEOUT, finished_at),
+    ]
+    chunk = [{'params': {'max_depth': 3}, 'f1_score': 0.5}]
+    assert task_service._merge_results([{'result': chunk}, None]) == chunk
+    with pytest.raises(RuntimeError):
+        task_service._merge_results([None, None])
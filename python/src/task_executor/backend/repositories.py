@@ -14,22 +14,20 @@ class SubtaskRepository:
         self.db = db
 
     def create_entity(self, entity: core.Subtask):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask: db_models.Subtask = db_models.Subtask.from_core(entity)
             session.add(subtask)
-            session.commit()
 
     def delete_entity(self, subtask_uid: uuid.UUID):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask: Optional[db_models.Subtask] = session.query(
                 db_models.Subtask,
             ).where(db_models.Subtask.subtask_uid == str(subtask_uid)).first()
             if subtask is not None:
                 session.delete(subtask)
-                session.commit()
 
     def update_entity(self, entity: core.Subtask):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask = db_models.Subtask.from_core(entity)
             stmt = sql.update(
                 db_models.Subtask,
@@ -43,10 +41,9 @@ class SubtaskRepository:
                 finished_at=subtask.finished_at,
             )
             session.execute(stmt)
-            session.commit()
 
     def get_entity(self, subtask_uid: uuid.UUID) -> Optional[core.Subtask]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             subtask: Optional[db_models.Subtask] = session.query(
                 db_models.Subtask
             ).where(db_models.Subtask.subtask_uid == str(subtask_uid)).first()
@@ -55,10 +52,25 @@ class SubtaskRepository:
             return subtask.to_core()
 
     def get_entities(self) -> Iterable[core.Subtask]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             stmt = sql.select(db_models.Subtask)
             subtasks = session.scalars(stmt).all()
-        return [subtask.to_core() for subtask in subtasks]
+            return [subtask.to_core() for subtask in subtasks]
+
+    def get_page(
+        self,
+        status: Optional[core.SubtaskStatus] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+    ) -> tuple[list[core.Subtask], Optional[int]]:
+        with self.db.begin() as session:
+            stmt = sql.select(db_models.Subtask)
+            if status is not None:
+                stmt = stmt.where(db_models.Subtask.status == status.value)
+            subtasks, next_cursor = database.paginate(
+                session, stmt, db_models.Subtask, cursor, limit,
+            )
+            return [subtask.to_core() for subtask in subtasks], next_cursor
 
 
 class NodeRepository:
@@ -66,22 +78,20 @@ class NodeRepository:
         self.db = db
 
     def create_entity(self, entity: core.Node):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             node: db_models.Node = db_models.Node.from_core(entity)
             session.add(node)
-            session.commit()
 
     def delete_entity(self, uid: uuid.UUID):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             node: Optional[db_models.Node] = session.query(
                 db_models.Node
             ).where(db_models.Node.node_uid == str(uid)).first()
             if node is not None:
                 session.delete(node)
-                session.commit()
 
     def update_entity(self, entity: core.Node):
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             node = db_models.Node.from_core(entity)
             stmt = sql.update(
                 db_models.Node
@@ -95,10 +105,9 @@ class NodeRepository:
                 last_ping=node.last_ping,
             )
             session.execute(stmt)
-            session.commit()
 
     def get_entity(self, uid: uuid.UUID) -> core.Node:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             node: Optional[db_models.Node] = session.query(
                 db_models.Node
             ).where(db_models.Node.node_uid == str(uid)).first()
@@ -111,21 +120,21 @@ class NodeRepository:
         role: Optional[core.NodeRole] = None,
         status: Optional[core.NodeStatus] = None,
     ) -> Iterable[core.Node]:
-        with self.db.create_session() as session:
+        with self.db.begin() as session:
             stmt = sql.select(db_models.Node)
             if role is not None:
                 stmt = stmt.where(db_models.Node.role == role.value)
             if status is not None:
                 stmt = stmt.where(db_models.Node.status == status.value)
             nodes = session.scalars(stmt).all()
-        return [node.to_core() for node in nodes]
+            return [node.to_core() for node in nodes]
 
     def upsert_entity(self, entity: core.Node):
-        with self.db.create_session() as session:
-            image: Optional[db_models.Node] = session.query(
-                db_models.Node
-            ).where(db_models.Node.node_uid == entity.node_uid).first()
-        if image is None:
-            self.create_entity(entity)
-        else:
-            self.update_entity(entity)
+        self.upsert_entities([entity])
+
+    def upsert_entities(self, entities: Iterable[core.Node]):
+        with self.db.begin() as session:
+            database.upsert(
+                session,
+                [db_models.Node.from_core(entity) for entity in entities],
+            )
@@ -0,0 +1,91 @@
+import asyncio
+import dataclasses
+import os
+from typing import Optional
+import uuid
+
+MEMORY_BUDGET_FRACTION = 0.8
+DEFAULT_SUBTASK_CPUS = 1
+DEFAULT_SUBTASK_MEMORY = 2 * 1024 ** 3
+
+
+@dataclasses.dataclass(frozen=True)
+class Resources:
+    cpus: int
+    memory: int
+
+
+def get_node_resources(config: Optional[dict] = None) -> Resources:
+    config = (config or {}).get('resources', {})
+    memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    return Resources(
+        cpus=config.get('cpus', len(os.sched_getaffinity(0))),
+        memory=config.get('memory', int(memory * MEMORY_BUDGET_FRACTION)),
+    )
+
+
+def get_subtask_resources(
+    budget: Resources, config: Optional[dict] = None,
+) -> Resources:
+    config = (config or {}).get('subtask_resources', {})
+    return Resources(
+        cpus=config.get('cpus', min(DEFAULT_SUBTASK_CPUS, budget.cpus)),
+        memory=config.get(
+            'memory', min(DEFAULT_SUBTASK_MEMORY, budget.memory),
+        ),
+    )
+
+
+class ResourcePool:
+    def __init__(self, budget: Resources, queue_size: int):
+        self.budget = budget
+        self.queue_size = queue_size
+        self.reserved: dict[uuid.UUID, Resources] = {}
+        self.queued: dict[uuid.UUID, Resources] = {}
+        self.condition = asyncio.Condition()
+
+    def offer(self, uid: uuid.UUID, demand: Resources) -> bool:
+        if not self._fits_budget(demand):
+            return False
+        if not self.queued and self._fits(demand):
+            self.reserved[uid] = demand
+            return True
+        if len(self.queued) < self.queue_size:
+            self.queued[uid] = demand
+            return True
+        return False
+
+    async def acquire(self, uid: uuid.UUID):
+        if uid in self.reserved:
+            return
+        if uid not in self.queued:
+            raise LookupError(f'resources of {uid} have not been offered')
+        async with self.condition:
+            await self.condition.wait_for(
+                lambda: (
+                    next(iter(self.queued)) == uid and
+                    self._fits(self.queued[uid])
+                ),
+            )
+            self.reserved[uid] = self.queued.pop(uid)
+            self.condition.notify_all()
+
+    async def release(self, uid: uuid.UUID):
+        self.reserved.pop(uid, None)
+        self.queued.pop(uid, None)
+        async with self.condition:
+            self.condition.notify_all()
+
+    def _fits(self, demand: Resources) -> bool:
+        cpus = sum(resources.cpus for resources in self.reserved.values())
+        memory = sum(resources.memory for resources in self.reserved.values())
+        return (
+            cpus + demand.cpus <= self.budget.cpus and
+            memory + demand.memory <= self.budget.memory
+        )
+
+    def _fits_budget(self, demand: Resources) -> bool:
+        return (
+            demand.cpus <= self.budget.cpus and
+            demand.memory <= self.budget.memory
+        )
@@ -4,7 +4,10 @@ import pathlib
 import fastapi
 
 import src.common.backend.db as database
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
 import src.common.models.web as web_common
+import src.node_controller.backend.gossip_service as gossip
 import src.node_controller.backend.network_service as network
 import src.node_controller.backend.services as node_services
 import src.node_controller.backend.repositories as node_repositories
@@ -33,11 +36,15 @@ async def lifespan(app: fastapi.FastAPI):
         )
     )
     await node_service.notify_node_enabled(subtasks_service.config_path)
+    gossip_service.start(subtasks_service.config_path)
     yield
+    await gossip_service.stop()
     network_service.remove_rule(local_port=8003, public_port=public_port)
 
 
 app = fastapi.FastAPI(lifespan=lifespan)
+metrics.instrument_app(app, service='task_executor')
+tracing.instrument_app(app, service='task_executor')
 db_name = str(
     pathlib.Path(__file__).parent.parent / 'db' / 'task_executor.sqlite',
 )
@@ -50,6 +57,8 @@ subtask_repository = repositories.SubtaskRepository(db=db)
 node_repository = node_repositories.NodeRepository(db=node_db)
 network_service = network.NetworkService()
 node_service = node_services.NodeService(node_repository, network_service)
+gossip_service = gossip.GossipService(node_repository, node_service)
+gossip.add_routes(app, gossip_service)
 subtasks_service = services.SubtaskService(subtask_repository)
 
 
@@ -62,8 +71,15 @@ async def ping():
 async def offer_subtask(
     request: models.SubtaskOfferRequest,
 ) -> models.SubtaskOfferResponse:
-    accepted = subtasks_service.consider_subtask_offer(
-        creator_uid=request.creator_uid, subtask_uid=request.subtask_uid,
+    accepted = await subtasks_service.consider_subtask_offer(
+        creator_uid=request.creator_uid,
+        subtask_uid=request.subtask_uid,
+        image_tag=request.image_tag,
+        dataset_uid=request.dataset_uid,
+        magnet_link=request.magnet_link,
+        dataset_source=request.dataset_source,
+        image_source=request.image_source,
+        image_publisher=request.image_publisher,
     )
     verdict = (
         models.SubtaskOfferVerdict.ACCEPTED
@@ -79,13 +95,20 @@ async def offer_subtask(
 async def start_subtask(
     request: models.SubtaskCreateRequest,
 ) -> models.SubtaskCreateResponse:
-    subtask = await subtasks_service.start_subtask(
-        subtask_uid=request.subtask_uid,
-        image_tag=request.image_tag,
-        dataset_uid=request.dataset_uid,
-        magent_link=request.magnet_link,
-        params=request.params,
-    )
+    try:
+        subtask = await subtasks_service.start_subtask(
+            subtask_uid=request.subtask_uid,
+            image_tag=request.image_tag,
+            dataset_uid=request.dataset_uid,
+            magent_link=request.magnet_link,
+            dataset_source=request.dataset_source,
+            image_source=request.image_source,
+            params=request.params,
+        )
+    except LookupError as error:
+        raise fastapi.HTTPException(status_code=404, detail=str(error))
+    except ValueError as error:
+        raise fastapi.HTTPException(status_code=409, detail=str(error))
     return models.SubtaskCreateResponse(
         status=web_common.ResponseStatus.SUCCESS,
         subtask=models.Subtask.from_core(subtask),
@@ -96,7 +119,7 @@ async def start_subtask(
 async def get_subtask(
     request: models.GetSubtaskRequest,
 ) -> models.GetSubtaskResponse:
-    subtask = subtasks_service.get_subtask(request.subtask_uid)
+    subtask = await subtasks_service.get_subtask(request.subtask_uid)
     return models.GetSubtaskResponse(
         status=web_common.ResponseStatus.SUCCESS,
         subtask=(
@@ -105,12 +128,30 @@ async def get_subtask(
     )
 
 
+@app.post('/subtask/cancel')
+async def cancel_subtask(
+    request: models.CancelSubtaskRequest,
+) -> models.CancelSubtaskResponse:
+    subtask = await subtasks_service.cancel_subtask(request.subtask_uid)
+    return models.CancelSubtaskResponse(
+        status=web_common.ResponseStatus.SUCCESS,
+        subtask=(
+            models.Subtask.from_core(subtask) if subtask is not None else None
+        ),
+    )
+
+
 @app.post('/subtasks')
-async def get_subtasks() -> models.GetSubtasksResponse:
-    subtasks = subtasks_service.get_subtasks()
+async def get_subtasks(
+    request: models.GetSubtasksRequest = models.GetSubtasksRequest(),
+) -> models.GetSubtasksResponse:
+    subtasks, next_cursor = await subtasks_service.get_subtasks(
+        status=request.status, cursor=request.cursor, limit=request.limit,
+    )
     return models.GetSubtasksResponse(
         status=web_common.ResponseStatus.SUCCESS,
         subtasks=[models.Subtask.from_core(subtask) for subtask in subtasks],
+        next_cursor=next_cursor,
     )
 
 
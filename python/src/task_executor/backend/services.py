@@ -1,13 +1,17 @@
 import asyncio
+import contextlib
 import datetime
 import ipaddress
 import json
 import pathlib
 import threading
 import time
-from typing import Iterable, Optional
+from typing import Optional
 import uuid
 
+import src.common.backend.db as database
+import src.common.backend.metrics as metrics
+import src.common.backend.tracing as tracing
 import src.data_controller.client.client as data_client
 import src.data_controller.models.core as data_models
 import src.env_controller.client.client as env_client
@@ -15,6 +19,7 @@ import src.env_controller.models.core as env_models
 import src.node_controller.backend.network_service as network
 import src.node_controller.backend.services as node_services
 import src.task_executor.backend.repositories as repositories
+import src.task_executor.backend.resources as resources
 import src.task_executor.models.core as models
 
 ENV_CONTROLLER_HOST = '127.0.0.1'
@@ -23,7 +28,27 @@ DATA_CONTROLLER_HOST = '127.0.0.1'
 DATA_CONTROLLER_PORT = 8002
 IMAGE_PULLING_POLLING_DELAY = 0.05
 DATASET_DOWNLOADING_POLLING_DELAY = 0.1
+IMAGE_PUBLISHING_POLLING_DELAY = 0.05
+DATASET_PUBLISHING_POLLING_DELAY = 0.1
 CONTAINER_RUNNING_POLLING_DELAY = 0.05
+OFFER_QUEUE_SIZE = 2
+OFFER_EXPIRATION_DELAY = 60.0
+SUBTASK_TIMEOUT = 3600.0
+IMAGE_PUBLISHING_ERROR_STATUSES = (
+    env_models.ImageStatus.BUILDING_ERROR,
+    env_models.ImageStatus.PUSHING_ERROR,
+)
+FINISHED_STATUSES = (
+    models.SubtaskStatus.SUCCESS,
+    models.SubtaskStatus.ERROR,
+    models.SubtaskStatus.TIMEOUT,
+    models.SubtaskStatus.CANCELLED,
+)
+CONTAINER_STATUSES = {
+    env_models.SubtaskStatus.SUCCESS: models.SubtaskStatus.SUCCESS,
+    env_models.SubtaskStatus.TIMEOUT: models.SubtaskStatus.TIMEOUT,
+    env_models.SubtaskStatus.CANCELLED: models.SubtaskStatus.CANCELLED,
+}
 
 
 class SubtaskService:
@@ -31,7 +56,9 @@ class SubtaskService:
         self,
         subtask_repository: repositories.SubtaskRepository,
     ):
-        self.subtask_repository = subtask_repository
+        self.subtask_repository = database.AsyncRepository(
+            subtask_repository,
+        )
         self.env_controller_client = env_client.EnvControllerClient()
         self.env_controller_client.set_server(
             ipv4_address=ipaddress.IPv4Address(ENV_CONTROLLER_HOST),
@@ -42,21 +69,61 @@ class SubtaskService:
             ipv4_address=ipaddress.IPv4Address(DATA_CONTROLLER_HOST),
             port=DATA_CONTROLLER_PORT,
         )
+        self.preparations: dict[
+            uuid.UUID, tuple[str, uuid.UUID, asyncio.Task]
+        ] = {}
+        config = self._read_config()
+        budget = resources.get_node_resources(config)
+        self.subtask_resources = resources.get_subtask_resources(
+            budget, config,
+        )
+        self.resources = resources.ResourcePool(
+            budget, queue_size=OFFER_QUEUE_SIZE,
+        )
+        self.offer_expirations: dict[uuid.UUID, asyncio.TimerHandle] = {}
+        self.runs: dict[uuid.UUID, asyncio.Task] = {}
 
-    def consider_subtask_offer(
+    async def consider_subtask_offer(
         self,
         creator_uid: uuid.UUID,
         subtask_uid: uuid.UUID,
+        image_tag: Optional[str] = None,
+        dataset_uid: Optional[uuid.UUID] = None,
+        magnet_link: Optional[str] = None,
+        dataset_source: Optional[str] = None,
+        image_source: Optional[str] = None,
+        image_publisher: Optional[str] = None,
     ) -> bool:
+        if not self.resources.offer(subtask_uid, self.subtask_resources):
+            print(f'subtask {subtask_uid} offer is declined, node is full')
+            return False
+        self._update_queue_depth()
+        self.offer_expirations[subtask_uid] = (
+            asyncio.get_running_loop().call_later(
+                OFFER_EXPIRATION_DELAY,
+                lambda: asyncio.create_task(self._expire_offer(subtask_uid)),
+            )
+        )
         subtask = models.Subtask(
             subtask_uid=subtask_uid,
             creator_uid=creator_uid,
-            dataset_uid=None,
+            dataset_uid=dataset_uid,
             status=models.SubtaskStatus.WAITING_PARAMS,
             created_at=None,
             finished_at=None,
         )
-        self.subtask_repository.create_entity(subtask)
+        await self.subtask_repository.create_entity(subtask)
+        metrics.QUEUE_DEPTH.labels('task_executor', 'offered_subtasks').inc()
+        if image_tag is not None and dataset_uid is not None:
+            print(f'preparing resources of offered subtask {subtask_uid}')
+            self.preparations[subtask_uid] = (
+                image_tag,
+                dataset_uid,
+                self._prepare_resources(
+                    image_tag, dataset_uid, magnet_link, dataset_source,
+                    image_source, image_publisher,
+                ),
+            )
         return True
 
     async def start_subtask(
@@ -64,40 +131,253 @@ class SubtaskService:
         subtask_uid: uuid.UUID,
         image_tag: str,
         dataset_uid: uuid.UUID,
-        magent_link: str,
+        magent_link: Optional[str],
         params: dict,
+        dataset_source: Optional[str] = None,
+        image_source: Optional[str] = None,
     ) -> models.Subtask:
-        subtask = self.subtask_repository.get_entity(subtask_uid=subtask_uid)
-        await self.data_controller_client.download_dataset(
-            dataset_uid=dataset_uid, magnet_link=magent_link,
+        subtask = await self.subtask_repository.get_entity(
+            subtask_uid=subtask_uid,
         )
-        await self.env_controller_client.pull_image(image_tag=image_tag)
+        if subtask is None:
+            raise LookupError(f'subtask {subtask_uid} has not been offered')
+        expiration = self.offer_expirations.pop(subtask_uid, None)
+        if expiration is None:
+            raise ValueError(
+                f'subtask {subtask_uid} offer is no longer held, '
+                f'it is {subtask.status.value}'
+            )
+        expiration.cancel()
+        metrics.QUEUE_DEPTH.labels('task_executor', 'offered_subtasks').dec()
+        preparation = self._take_preparation(
+            subtask_uid, image_tag, dataset_uid,
+        )
+        if preparation is None:
+            preparation = self._prepare_resources(
+                image_tag, dataset_uid, magent_link, dataset_source,
+                image_source,
+            )
+        subtask.dataset_uid = dataset_uid
         subtask.status = models.SubtaskStatus.CREATING
-        self.subtask_repository.update_entity(subtask)
-        asyncio.create_task(
+        await self.subtask_repository.update_entity(subtask)
+        self.runs[subtask_uid] = asyncio.create_task(
             self._start_subtask(
                 subtask_uid=subtask_uid,
                 image_tag=image_tag,
                 dataset_uid=dataset_uid,
                 params=params,
+                preparation=preparation,
             ),
         )
         return subtask
 
-    async def _start_subtask(
+    async def cancel_subtask(
+        self, subtask_uid: uuid.UUID,
+    ) -> Optional[models.Subtask]:
+        subtask = await self.subtask_repository.get_entity(subtask_uid)
+        if subtask is None or subtask.status in FINISHED_STATUSES:
+            return subtask
+        print(f'cancelling subtask {subtask_uid}')
+        run = self.runs.get(subtask_uid)
+        if run is not None:
+            run.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await run
+        elif await self._withdraw_offer(subtask_uid):
+            await self._finish_subtask(
+                subtask_uid, models.SubtaskStatus.CANCELLED,
+            )
+        return await self.subtask_repository.get_entity(subtask_uid)
+
+    async def _expire_offer(self, subtask_uid: uuid.UUID):
+        if await self._withdraw_offer(subtask_uid):
+            print(f'subtask {subtask_uid} offer has expired')
+            await self._finish_subtask(
+                subtask_uid, models.SubtaskStatus.ERROR,
+            )
+
+    async def _withdraw_offer(self, subtask_uid: uuid.UUID) -> bool:
+        expiration = self.offer_expirations.pop(subtask_uid, None)
+        if expiration is None:
+            return False
+        expiration.cancel()
+        metrics.QUEUE_DEPTH.labels('task_executor', 'offered_subtasks').dec()
+        if subtask_uid in self.preparations:
+            _, dataset_uid, preparation = self.preparations.pop(subtask_uid)
+            preparation.cancel()
+            await self.data_controller_client.unpin_dataset(dataset_uid)
+        await self.resources.release(subtask_uid)
+        self._update_queue_depth()
+        return True
+
+    async def _finish_subtask(
+        self, subtask_uid: uuid.UUID, status: models.SubtaskStatus,
+    ):
+        subtask = await self.subtask_repository.get_entity(
+            subtask_uid=subtask_uid,
+        )
+        subtask.status = status
+        subtask.finished_at = datetime.datetime.now()
+        await self.subtask_repository.update_entity(subtask)
+
+    def _update_queue_depth(self):
+        metrics.QUEUE_DEPTH.labels('task_executor', 'queued_subtasks').set(
+            len(self.resources.queued),
+        )
+
+    def _take_preparation(
+        self, subtask_uid: uuid.UUID, image_tag: str, dataset_uid: uuid.UUID,
+    ) -> Optional[asyncio.Task]:
+        if subtask_uid not in self.preparations:
+            return None
+        offered_image_tag, offered_dataset_uid, preparation = (
+            self.preparations.pop(subtask_uid)
+        )
+        if (
+            offered_image_tag == image_tag and
+            offered_dataset_uid == dataset_uid
+        ):
+            return preparation
+        print(f'subtask {subtask_uid} resources differ from the offer')
+        preparation.cancel()
+        asyncio.create_task(
+            self.data_controller_client.unpin_dataset(offered_dataset_uid),
+        )
+        return None
+
+    def _prepare_resources(
         self,
-        subtask_uid: uuid.UUID,
         image_tag: str,
         dataset_uid: uuid.UUID,
-        params: dict,
+        magnet_link: Optional[str],
+        dataset_source: Optional[str],
+        image_source: Optional[str],
+        image_publisher: Optional[str] = None,
+    ) -> asyncio.Task:
+        return asyncio.create_task(
+            self._prepare(
+                image_tag, dataset_uid, magnet_link, dataset_source,
+                image_source, image_publisher,
+            ),
+        )
+
+    async def _prepare(
+        self,
+        image_tag: str,
+        dataset_uid: uuid.UUID,
+        magnet_link: Optional[str],
+        dataset_source: Optional[str],
+        image_source: Optional[str],
+        image_publisher: Optional[str],
+    ):
+        with tracing.start_span('resources_preparation'):
+            await asyncio.gather(
+                self._prepare_image(image_tag, image_source, image_publisher),
+                self._prepare_dataset(
+                    dataset_uid, magnet_link, dataset_source,
+                ),
+            )
+
+    async def _prepare_image(
+        self,
+        image_tag: str,
+        image_source: Optional[str],
+        image_publisher: Optional[str],
     ):
-        subtask = self.subtask_repository.get_entity(subtask_uid=subtask_uid)
+        if image_publisher is not None:
+            print(f'waiting publishing image {image_tag}...')
+            with tracing.start_span('image_publishing', image_tag=image_tag):
+                await self._wait_image_publishing(image_tag, image_publisher)
+        await self.env_controller_client.pull_image(
+            image_tag=image_tag, source_url=image_source,
+        )
         print(f'waiting pulling image {image_tag}...')
-        await self._wait_image_pulling(image_tag=image_tag)
+        with tracing.start_span('image_pulling', image_tag=image_tag):
+            await self._wait_image_pulling(image_tag=image_tag)
         print(f'image {image_tag} has been pulled')
+
+    async def _prepare_dataset(
+        self,
+        dataset_uid: uuid.UUID,
+        magnet_link: Optional[str],
+        dataset_source: Optional[str],
+    ):
+        if magnet_link is None and dataset_source is not None:
+            print(f'waiting publishing dataset {dataset_uid}...')
+            with tracing.start_span(
+                'dataset_publishing', dataset_uid=str(dataset_uid),
+            ):
+                magnet_link = await self._wait_dataset_publishing(
+                    dataset_uid, dataset_source,
+                )
+        await self.data_controller_client.download_dataset(
+            dataset_uid=dataset_uid,
+            magnet_link=magnet_link,
+            source_url=dataset_source,
+            pin=True,
+        )
         print(f'waiting downloading dataset {dataset_uid}...')
-        await self._wait_dataset_downloading(dataset_uid=dataset_uid)
+        with tracing.start_span(
+            'dataset_downloading', dataset_uid=str(dataset_uid),
+        ):
+            await self._wait_dataset_downloading(dataset_uid=dataset_uid)
         print(f'dataset {dataset_uid} has been downloaded')
+
+    async def _start_subtask(
+        self,
+        subtask_uid: uuid.UUID,
+        image_tag: str,
+        dataset_uid: uuid.UUID,
+        params: dict,
+        preparation: asyncio.Task,
+    ):
+        in_flight = metrics.SUBTASKS_IN_FLIGHT.labels('task_executor')
+        in_flight.inc()
+        try:
+            with tracing.start_span('subtask', subtask_uid=str(subtask_uid)):
+                await self._run_subtask(
+                    subtask_uid=subtask_uid,
+                    image_tag=image_tag,
+                    dataset_uid=dataset_uid,
+                    params=params,
+                    preparation=preparation,
+                )
+        except asyncio.CancelledError:
+            print(f'subtask {subtask_uid} has been cancelled')
+            await self.env_controller_client.cancel_container(subtask_uid)
+            await self._finish_subtask(
+                subtask_uid, models.SubtaskStatus.CANCELLED,
+            )
+            raise
+        except Exception as error:
+            print(f'subtask {subtask_uid} has failed: {error!r}')
+            await self._finish_subtask(
+                subtask_uid, models.SubtaskStatus.ERROR,
+            )
+        finally:
+            self.runs.pop(subtask_uid, None)
+            in_flight.dec()
+            await self.resources.release(subtask_uid)
+            self._update_queue_depth()
+            await self.data_controller_client.unpin_dataset(dataset_uid)
+
+    async def _run_subtask(
+        self,
+        subtask_uid: uuid.UUID,
+        image_tag: str,
+        dataset_uid: uuid.UUID,
+        params: dict,
+        preparation: asyncio.Task,
+    ):
+        subtask = await self.subtask_repository.get_entity(
+            subtask_uid=subtask_uid,
+        )
+        print(f'waiting resources of subtask {subtask_uid}...')
+        with tracing.start_span('resources_waiting'):
+            await preparation
+        with tracing.start_span('capacity_waiting'):
+            await self.resources.acquire(subtask_uid)
+        self._update_queue_depth()
         dataset = await self.data_controller_client.get_dataset(dataset_uid)
         dataset_paths = [
             file for file in dataset.path.rglob('*') if file.is_file()
@@ -108,31 +388,49 @@ class SubtaskService:
         config_path.parent.mkdir(parents=True, exist_ok=True)
         config_path.write_text(json.dumps(params))
         print(f'start running container of subtask {subtask_uid}...')
-        await self.env_controller_client.run_container(
-            subtask_uid=subtask_uid,
-            image_tag=image_tag,
-            input_files=[*dataset_paths, config_path],
-        )
+        with tracing.start_span('container_starting'):
+            await self.env_controller_client.run_container(
+                subtask_uid=subtask_uid,
+                image_tag=image_tag,
+                input_files=[*dataset_paths, config_path],
+                cpus=self.subtask_resources.cpus,
+                memory=self.subtask_resources.memory,
+                timeout=SUBTASK_TIMEOUT,
+            )
         print(f'container of subtask {subtask_uid} has been started')
         subtask.status = models.SubtaskStatus.RUNNING
         subtask.created_at = datetime.datetime.now()
-        self.subtask_repository.update_entity(subtask)
+        await self.subtask_repository.update_entity(subtask)
         print(f'waiting container running of subtask {subtask_uid}...')
-        await self._wait_container_running(subtask_uid=subtask_uid)
-        print(f'container of subtask {subtask_uid} has been finished')
-        subtask.status = models.SubtaskStatus.SUCCESS
+        with tracing.start_span('container_running'):
+            status = await self._wait_container_running(
+                subtask_uid=subtask_uid,
+            )
+        print(
+            f'container of subtask {subtask_uid} has been finished: '
+            f'{status.value}'
+        )
+        subtask.status = CONTAINER_STATUSES.get(
+            status, models.SubtaskStatus.ERROR,
+        )
         subtask.finished_at = datetime.datetime.now()
-        self.subtask_repository.update_entity(subtask)
+        await self.subtask_repository.update_entity(subtask)
 
-    def get_subtask(
+    async def get_subtask(
         self, subtask_uid: uuid.UUID
     ) -> Optional[models.Subtask]:
-        subtask = self.subtask_repository.get_entity(subtask_uid)
+        subtask = await self.subtask_repository.get_entity(subtask_uid)
         return subtask
 
-    def get_subtasks(self) -> Iterable[models.Subtask]:
-        subtasks = self.subtask_repository.get_entities()
-        return subtasks
+    async def get_subtasks(
+        self,
+        status: Optional[models.SubtaskStatus],
+        cursor: Optional[int],
+        limit: int,
+    ) -> tuple[list[models.Subtask], Optional[int]]:
+        return await self.subtask_repository.get_page(
+            status=status, cursor=cursor, limit=limit,
+        )
 
     async def get_subtask_result(
         self, subtask_uid: uuid.UUID,
@@ -145,6 +443,33 @@ class SubtaskService:
         result = json.loads(result_path.read_text())
         return result
 
+    @staticmethod
+    async def _wait_image_publishing(image_tag: str, image_publisher: str):
+        client = env_client.EnvControllerClient().set_server_url(
+            image_publisher,
+        )
+        status = await client.get_push_image_status(image_tag=image_tag)
+        while status != env_models.ImageStatus.PUSHED:
+            if status in IMAGE_PUBLISHING_ERROR_STATUSES:
+                raise RuntimeError(f'image {image_tag} publishing failed')
+            await asyncio.sleep(IMAGE_PUBLISHING_POLLING_DELAY)
+            status = await client.get_push_image_status(image_tag=image_tag)
+
+    @staticmethod
+    async def _wait_dataset_publishing(
+        dataset_uid: uuid.UUID, dataset_source: str,
+    ) -> Optional[str]:
+        client = data_client.DataControllerClient().set_server_url(
+            dataset_source,
+        )
+        dataset = await client.get_dataset(dataset_uid=dataset_uid)
+        while dataset.status != data_models.DatasetStatus.AVAILABLE:
+            if dataset.status == data_models.DatasetStatus.ERROR:
+                raise RuntimeError(f'dataset {dataset_uid} publishing failed')
+            await asyncio.sleep(DATASET_PUBLISHING_POLLING_DELAY)
+            dataset = await client.get_dataset(dataset_uid=dataset_uid)
+        return dataset.magnet_link
+
     async def _wait_image_pulling(
         self, image_tag: str,
     ):
@@ -152,6 +477,8 @@ class SubtaskService:
             image_tag=image_tag,
         )
         while status != env_models.ImageStatus.PULLED:
+            if status == env_models.ImageStatus.PULLING_ERROR:
+                raise RuntimeError(f'image {image_tag} pulling failed')
             await asyncio.sleep(IMAGE_PULLING_POLLING_DELAY)
             status = await self.env_controller_client.get_pull_image_status(
                 image_tag=image_tag,
@@ -164,6 +491,8 @@ class SubtaskService:
             dataset_uid=dataset_uid,
         )
         while status.status != data_models.DatasetStatus.AVAILABLE:
+            if status.status == data_models.DatasetStatus.ERROR:
+                raise RuntimeError(f'dataset {dataset_uid} download failed')
             await asyncio.sleep(DATASET_DOWNLOADING_POLLING_DELAY)
             status = await self.data_controller_client.get_dataset(
                 dataset_uid=dataset_uid,
@@ -171,7 +500,7 @@ class SubtaskService:
 
     async def _wait_container_running(
         self, subtask_uid: uuid.UUID,
-    ):
+    ) -> env_models.SubtaskStatus:
         status = await self.env_controller_client.get_container_status(
             subtask_uid=subtask_uid
         )
@@ -180,6 +509,12 @@ class SubtaskService:
             status = await self.env_controller_client.get_container_status(
                 subtask_uid=subtask_uid
             )
+        return status
+
+    def _read_config(self) -> dict:
+        if not self.config_path.exists():
+            return {}
+        return json.loads(self.config_path.read_text())
 
     @property
     def config_path(self) -> pathlib.Path:
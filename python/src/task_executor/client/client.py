@@ -10,14 +10,31 @@ import src.task_executor.models.web as web
 
 class TaskExecutorClient(client_base.ClientBase):
     async def offer_subtask(
-        self, creator_uid: uuid.UUID, subtask_uid: uuid.UUID,
+        self,
+        creator_uid: uuid.UUID,
+        subtask_uid: uuid.UUID,
+        image_tag: Optional[str] = None,
+        dataset_uid: Optional[uuid.UUID] = None,
+        magnet_link: Optional[str] = None,
+        dataset_source: Optional[str] = None,
+        image_source: Optional[str] = None,
+        image_publisher: Optional[str] = None,
     ) -> bool:
         url = self.get_server_url('/subtask/offer')
         request_body = web.SubtaskOfferRequest(
-            creator_uid=creator_uid, subtask_uid=subtask_uid,
+            creator_uid=creator_uid,
+            subtask_uid=subtask_uid,
+            image_tag=image_tag,
+            dataset_uid=dataset_uid,
+            magnet_link=magnet_link,
+            dataset_source=dataset_source,
+            image_source=image_source,
+            image_publisher=image_publisher,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.SubtaskOfferResponse.model_validate(json)
         return response_body.verdict == web.SubtaskOfferVerdict.ACCEPTED
@@ -27,8 +44,10 @@ class TaskExecutorClient(client_base.ClientBase):
         subtask_uid: uuid.UUID,
         image_tag: str,
         dataset_uid: uuid.UUID,
-        magnet_link: str,
+        magnet_link: Optional[str],
         params: dict,
+        dataset_source: Optional[str] = None,
+        image_source: Optional[str] = None,
     ) -> Optional[models.Subtask]:
         url = self.get_server_url('/subtask/start')
         request_body = web.SubtaskCreateRequest(
@@ -36,10 +55,14 @@ class TaskExecutorClient(client_base.ClientBase):
             image_tag=image_tag,
             dataset_uid=dataset_uid,
             magnet_link=magnet_link,
+            dataset_source=dataset_source,
+            image_source=image_source,
             params=params,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.SubtaskCreateResponse.model_validate(json)
         return response_body.subtask
@@ -52,18 +75,45 @@ class TaskExecutorClient(client_base.ClientBase):
             subtask_uid=subtask_uid,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.GetSubtaskResponse.model_validate(json)
         return response_body.subtask
 
-    async def get_subtasks(self) -> list[models.Subtask]:
+    async def cancel_subtask(
+        self, subtask_uid: uuid.UUID,
+    ) -> Optional[models.Subtask]:
+        url = self.get_server_url('/subtask/cancel')
+        request_body = web.CancelSubtaskRequest(
+            subtask_uid=subtask_uid,
+        ).model_dump(mode='json')
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
+                json = await response.json()
+        response_body = web.CancelSubtaskResponse.model_validate(json)
+        return response_body.subtask
+
+    async def get_subtasks(
+        self,
+        status: Optional[models.SubtaskStatus] = None,
+        cursor: Optional[int] = None,
+        limit: int = 100,
+    ) -> tuple[list[models.Subtask], Optional[int]]:
         url = self.get_server_url('/subtasks')
+        request_body = web.GetSubtasksRequest(
+            status=status, cursor=cursor, limit=limit,
+        ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json={}) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.GetSubtasksResponse.model_validate(json)
-        return response_body.subtasks
+        return response_body.subtasks, response_body.next_cursor
 
     async def get_subtask_result(
         self, subtask_uid: uuid.UUID,
@@ -73,7 +123,9 @@ class TaskExecutorClient(client_base.ClientBase):
             subtask_uid=subtask_uid,
         ).model_dump(mode='json')
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=request_body) as response:
+            async with session.post(
+                url, json=request_body, headers=self.get_headers(),
+            ) as response:
                 json = await response.json()
         response_body = web.GetSubtaskResultResponse.model_validate(json)
         return response_body.result
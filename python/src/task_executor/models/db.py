@@ -21,8 +21,10 @@ class Subtask(Base):
     )
     creator_uid: orm.Mapped[str] = orm.mapped_column(sql.String(36))
     dataset_uid: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(36))
-    status: orm.Mapped[str] = orm.mapped_column(sql.String(64))
-    created_at: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(23))
+    status: orm.Mapped[str] = orm.mapped_column(sql.String(64), index=True)
+    created_at: orm.Mapped[Optional[str]] = orm.mapped_column(
+        sql.String(23), index=True,
+    )
     finished_at: orm.Mapped[Optional[str]] = orm.mapped_column(sql.String(23))
 
     @staticmethod
@@ -52,11 +54,7 @@ class Subtask(Base):
                 uuid.UUID(str(self.dataset_uid))
                 if self.dataset_uid is not None else None
             ),
-            status=[
-                elem
-                for elem in core.SubtaskStatus
-                if elem.value == self.status
-            ][0],
+            status=core.SubtaskStatus(self.status),
             created_at=(
                 datetime.datetime.fromisoformat(str(self.created_at))
                 if self.created_at is not None else None
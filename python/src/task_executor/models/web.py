@@ -43,6 +43,14 @@ class Subtask(pydantic.BaseModel):
 class SubtaskOfferRequest(pydantic.BaseModel):
     creator_uid: pydantic.UUID4
     subtask_uid: pydantic.UUID4
+    image_tag: Optional[str] = None
+    dataset_uid: Optional[pydantic.UUID4] = None
+    magnet_link: Optional[str] = pydantic.Field(
+        default=None, pattern=MAGNET_LINK_REGEX,
+    )
+    dataset_source: Optional[str] = None
+    image_source: Optional[str] = None
+    image_publisher: Optional[str] = None
 
 
 class SubtaskOfferVerdict(enum.Enum):
@@ -58,7 +66,11 @@ class SubtaskCreateRequest(pydantic.BaseModel):
     subtask_uid: pydantic.UUID4
     image_tag: str
     dataset_uid: pydantic.UUID4
-    magnet_link: str = pydantic.Field(pattern=MAGNET_LINK_REGEX)
+    magnet_link: Optional[str] = pydantic.Field(
+        default=None, pattern=MAGNET_LINK_REGEX,
+    )
+    dataset_source: Optional[str] = None
+    image_source: Optional[str] = None
     params: dict
 
 
@@ -74,8 +86,23 @@ class GetSubtaskResponse(common_web.BaseResponse):
     subtask: Optional[Subtask]
 
 
+class CancelSubtaskRequest(pydantic.BaseModel):
+    subtask_uid: uuid.UUID
+
+
+class CancelSubtaskResponse(common_web.BaseResponse):
+    subtask: Optional[Subtask]
+
+
+class GetSubtasksRequest(pydantic.BaseModel):
+    status: Optional[core.SubtaskStatus] = None
+    cursor: Optional[int] = None
+    limit: int = pydantic.Field(default=100, ge=1, le=1000)
+
+
 class GetSubtasksResponse(common_web.BaseResponse):
     subtasks: list[Subtask]
+    next_cursor: Optional[int] = None
 
 
 class GetSubtaskResultRequest(pydantic.BaseModel):
@@ -0,0 +1,71 @@
+import asyncio
+import uuid
+
+import pytest
+
+import src.task_executor.backend.resources as resources
+
+GIB = 1024 ** 3
+BUDGET = resources.Resources(cpus=4, memory=8 * GIB)
+SUBTASK = resources.Resources(cpus=2, memory=2 * GIB)
+
+
+def test_offers_are_packed_queued_and_declined():
+    pool = resources.ResourcePool(BUDGET, queue_size=1)
+    uids = [uuid.uuid4() for _ in range(4)]
+    verdicts = [pool.offer(uid, SUBTASK) for uid in uids]
+    assert verdicts == [True, True, True, False]
+    assert list(pool.reserved) == uids[:2]
+    assert list(pool.queued) == uids[2:3]
+    assert not pool.offer(
+        uuid.uuid4(), resources.Resources(cpus=8, memory=GIB),
+    )
+
+
+def test_queued_subtask_starts_when_capacity_is_released():
+    pool = resources.ResourcePool(BUDGET, queue_size=2)
+    running = [uuid.uuid4(), uuid.uuid4()]
+    queued = [uuid.uuid4(), uuid.uuid4()]
+    for uid in running + queued:
+        assert pool.offer(uid, SUBTASK)
+
+    async def main() -> list[uuid.UUID]:
+        started = []
+
+        async def start(uid: uuid.UUID):
+            await pool.acquire(uid)
+            started.append(uid)
+
+        tasks = [asyncio.create_task(start(uid)) for uid in reversed(queued)]
+        await asyncio.sleep(0.01)
+        assert not started
+        await pool.release(running[0])
+        await asyncio.sleep(0.01)
+        assert started == queued[:1]
+        await pool.release(running[1])
+        await asyncio.gather(*tasks)
+        return started
+
+    assert asyncio.run(main()) == queued
+    assert not pool.queued
+
+
+def test_only_offered_subtasks_acquire_resources():
+    pool = resources.ResourcePool(BUDGET, queue_size=1)
+    with pytest.raises(LookupError):
+        asyncio.run(pool.acquire(uuid.uuid4()))
+    assert not pool.queued
+
+
+def test_subtask_demand_is_configured_per_node():
+    small = resources.Resources(cpus=1, memory=GIB)
+    assert resources.get_subtask_resources(small) == small
+    config = {
+        'resources': {'cpus': 8, 'memory': 16 * GIB},
+        'subtask_resources': {'cpus': 2, 'memory': 4 * GIB},
+    }
+    budget = resources.get_node_resources(config)
+    assert budget == resources.Resources(cpus=8, memory=16 * GIB)
+    assert resources.get_subtask_resources(budget, config) == (
+        resources.Resources(cpus=2, memory=4 * GIB)
+    )
@@ -0,0 +1,49 @@
+import asyncio
+import pathlib
+import uuid
+
+import pytest
+
+import src.common.backend.db as database
+import src.task_executor.backend.repositories as repositories
+import src.task_executor.backend.services as services
+import src.task_executor.models.core as core
+import src.task_executor.models.db as db_models
+
+
+def test_subtask_is_started_only_from_a_held_offer(tmp_path: pathlib.Path):
+    subtask_service = services.SubtaskService(
+        repositories.SubtaskRepository(
+            database.DB(
+                db_name=str(tmp_path / 'subtasks.sqlite'),
+                base=db_models.Base,
+            )
+        )
+    )
+    subtask_uid = uuid.uuid4()
+
+    async def start(uid: uuid.UUID):
+        await subtask_service.start_subtask(
+            subtask_uid=uid,
+            image_tag='image',
+            dataset_uid=uuid.uuid4(),
+            magent_link=None,
+            params={},
+        )
+
+    async def main():
+        with pytest.raises(LookupError):
+            await start(uuid.uuid4())
+        assert await subtask_service.consider_subtask_offer(
+            creator_uid=uuid.uuid4(), subtask_uid=subtask_uid,
+        )
+        await subtask_service._expire_offer(subtask_uid)
+        with pytest.raises(ValueError):
+            await start(subtask_uid)
+
+    asyncio.run(main())
+    subtask = subtask_service.subtask_repository.repository.get_entity(
+        subtask_uid,
+    )
+    assert subtask.status == core.SubtaskStatus.ERROR
+    assert not subtask_service.resources.reserved